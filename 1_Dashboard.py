@@ -1,14 +1,19 @@
 import streamlit as st
-from controllers.auth_manager import is_authenticated, show_login
+from controllers.auth_manager import is_authenticated, logout, show_login
 #from controllers.auth_controller import AuthController
 import pandas as pd
 import plotly.express as px
 from datetime import date, timedelta, datetime
 from controllers.expense_controller import ExpenseController
 from controllers.category_controller import CategoryController
+from controllers.report_controller import ReportController
 import locale
 import warnings
 from repositories.database_repository import DataManager
+from utils.cache import versioned_cache
+from utils.money import format_brl
+from utils.sections import SectionRegistry
+from utils.timing import show_timings, timed, track_interaction
 
 #from repositories.user_repository import UserRepository
 
@@ -36,65 +41,12 @@ warnings.simplefilter("ignore", category=FutureWarning)
 locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
 
 
-def expand_installments(row):
-    """
-    Expande parcelas para cada mês com base na data inicial e no número de parcelas.
-    Inicia no mês subsequente ao mes da compra.
-    Ex: se compra realizada em 01/12/2024 em duas parcelas de 100,00.
-    Serão mostradas nos meses 01/25 e 02/25
-    """
-    installments = []
-    if row['Parcelas'] > 0:  # Se for um pagamento parcelado
-        date_start = row['Data']
-        date_end = row['Última parcela']
-
-        # Gerar todas as parcelas com base em 'Data' e 'Última parcela'
-        dates_installments = pd.date_range(start=date_start, end=date_end, freq='MS')  # Frequência mensal, começa sempre no 1º do mes seguinte
-        value_installment = row['Valor']  # Valor de cada parcela
-        for date_installment in dates_installments:
-            installments.append({'Mes': date_installment, 'Tipo': 'Crédito', 'Valor': value_installment})
-    else:
-        # Adicionar despesa à vista como uma única entrada
-        installments.append({'Mes': row['Data'], 'Tipo': 'À Vista', 'Valor': row['Valor']})
-    return installments
-
-def expand_installments_v2(row):
-    """
-    Expande parcelas para cada mês com base na data inicial e no número de parcelas,
-    garantindo que a primeira parcela seja registrada no mesmo mês da data inicial.
-    """
-    installments = []
-    if row['Parcelas'] > 0:  # Se for pagamento parcelado
-        date_start = row['Data']
-        num_installments = row['Parcelas']
-        value_installment = row['Valor']  # Valor de cada parcela
-
-        # Gerar todas as parcelas começando do mês da data inicial
-        for i in range(num_installments):
-            installment_date = date_start + pd.DateOffset(months=i) #pega primeira parcela
-            installments.append({'Mes': installment_date, 'Tipo': 'Crédito', 'Valor': value_installment})
-    else:
-        # Adicionar despesa à vista como uma única entrada
-        installments.append({'Mes': row['Data'], 'Tipo': 'À Vista', 'Valor': row['Valor']})
-    return installments
-
-#colocar em um arquivo util.py, pois usa em mais arquivos
-def format_brl(value):
-    return f"R${value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-@st.cache_data
-def get_expense():
-    # Obtém os dados
+@versioned_cache("expense")
+def get_expense_count():
     expense_controller = ExpenseController()
-    expense_df = expense_controller.get_expenses()
+    return expense_controller.count_expenses()
 
-    if not isinstance(expense_df, pd.DataFrame):
-        # Se não for um DataFrame, cria um DataFrame vazio
-        expense_df = pd.DataFrame()
-
-    return expense_df
-
-@st.cache_data
+@versioned_cache("category")
 def get_category():
     category_controller = CategoryController()
     category_df = category_controller.get_categories()
@@ -105,63 +57,77 @@ def get_category():
 
     return category_df
 
-@st.cache_data
-def get_filtered_data(expense_df, category_df):
+@versioned_cache("expense", "type", "category", "payment")
+def prepare_expense_dashboard(data_inicio, data_fim, exibir_prazo=True):
     """
-    Filtra e formata o DataFrame consolidado entre despesas e categorias.
+    Etapa única de preparação dos dados do dashboard de despesas.
+
+    Busca no banco, via consultas agregadas (ver `ReportRepository`), todos os agregados
+    usados pelos gráficos: apenas as linhas agrupadas trafegam, nunca as despesas. A chave
+    do cache é apenas a versão dos dados e os filtros.
+
+    Args:
+        data_inicio, data_fim (date): Período selecionado.
+        exibir_prazo (bool): Se False, considera apenas os pagamentos à vista.
+
+    Returns:
+        dict: DataFrames agregados
+            'mes_pagamento': Mes x Tipo (À Vista/Crédito) -> Valor
+            'mes_tipo': Mes x Tipo (tipo de despesa) -> Valor
+            'categoria_pagamento': Categoria x Tipo de Pagamento -> Valor
+            'dia_tipo': Data x Tipo (tipo de despesa) -> Valor
+            'evolucao_credito': Mes -> Valor de todas as parcelas das compras a crédito
+                com alguma parcela no período
     """
-    # Combina despesas com categorias
-    merged_df = pd.merge(
-        expense_df, 
-        category_df, 
-        left_on='type_category_id', 
-        right_on='cat_id', 
-        how='left', 
-        suffixes=('', '_category')
+    report_controller = ReportController()
+    cash_only = not exibir_prazo
+
+    def aggregate(df, columns, date_column=None):
+        # Garante as colunas (inclusive quando a consulta falha) e converte as datas
+        df = df.rename(columns=columns).reindex(columns=list(columns.values()))
+        if date_column:
+            df[date_column] = pd.to_datetime(df[date_column])
+        return df
+
+    mes_pagamento = aggregate(
+        report_controller.get_monthly_by_payment_kind(data_inicio, data_fim, cash_only),
+        {'month': 'Mes', 'payment_kind': 'Tipo', 'total': 'Valor'}, 'Mes'
+    )
+    mes_tipo = aggregate(
+        report_controller.get_monthly_by_type(data_inicio, data_fim, cash_only),
+        {'month': 'Mes', 'type_name': 'Tipo', 'total': 'Valor'}, 'Mes'
+    )
+    categoria_pagamento = aggregate(
+        report_controller.get_by_category_payment_kind(data_inicio, data_fim, cash_only),
+        {'cat_name': 'Categoria', 'payment_kind': 'Tipo de Pagamento', 'total': 'Valor'}
+    )
+    dia_tipo = aggregate(
+        report_controller.get_daily_by_type(data_inicio, data_fim, cash_only),
+        {'day': 'Data', 'type_name': 'Tipo', 'total': 'Valor'}, 'Data'
+    )
+
+    # Todas as parcelas das compras a crédito com parcela no período, sem filtro de mês
+    evolucao_credito = aggregate(
+        report_controller.get_credit_installments_by_month(data_inicio, data_fim) if exibir_prazo else pd.DataFrame(),
+        {'month': 'Mes', 'total': 'Valor'}, 'Mes'
     )
 
-    # Seleciona e renomeia colunas
-    merged_df = merged_df[[
-        'exp_date', 'exp_value', 'exp_description', 'exp_number_of_installments', 
-        'exp_final_date_of_installment', 'exp_value_total_installment', 
-        'cat_name', 'type_name', 'pay_name'
-    ]].rename(columns={
-        'exp_date': 'Data', 
-        'exp_value': 'Valor', 
-        'exp_description': 'Descrição Despesa',
-        'exp_number_of_installments': 'Parcelas',
-        'exp_final_date_of_installment': 'Última parcela',
-        'exp_value_total_installment': 'Valor total das parcelas',
-        'cat_name': 'Categoria', 
-        'type_name': 'Tipo',
-        'pay_name': 'Pagamento'
-    })
-
-    # Converte colunas de data
-    merged_df['Data'] = pd.to_datetime(merged_df['Data'])
-    merged_df['Última parcela'] = pd.to_datetime(merged_df['Última parcela'])
-
-    return merged_df
-
-@st.cache_data
-def chart_installment_evolution_v2(df_filtrado):
+    return {
+        'mes_pagamento': mes_pagamento,
+        'mes_tipo': mes_tipo,
+        'categoria_pagamento': categoria_pagamento,
+        'dia_tipo': dia_tipo,
+        'evolucao_credito': evolucao_credito,
+    }
+
+def chart_installment_evolution_v2(montante_mensal):
     """
     Gera um gráfico de linha mostrando a evolução das parcelas por mês,
     considerando todas as parcelas a partir da data de registro
     até a última parcela, sem aplicar filtros de data.
+    Recebe o agregado 'evolucao_credito' de `prepare_expense_dashboard`.
     """
-
-    # Garantir que 'Parcelas' seja numérico
-    df_filtrado['Parcelas'] = pd.to_numeric(df_filtrado['Parcelas'], errors='coerce').fillna(0).astype(int)
-    df_credito = df_filtrado[df_filtrado['Parcelas'] > 0]
-
-    # Expandir as parcelas usando a função expand_installments
-    parcelas_expandidas = []
-    for _, row in df_credito.iterrows():
-        parcelas_expandidas.extend(expand_installments_v2(row))
-
-    # Criar DataFrame consolidado das parcelas
-    if not parcelas_expandidas:
+    if montante_mensal.empty:
         # Se não houver parcelas, criar um gráfico vazio
         fig = px.line(
             title='Evolução das Parcelas por Mês - V2',
@@ -173,16 +139,8 @@ def chart_installment_evolution_v2(df_filtrado):
         )
         return fig
 
-    df_parcelas = pd.DataFrame(parcelas_expandidas)
-
-    # Agrupar os valores por mês
-    montante_mensal = (
-        df_parcelas.groupby(df_parcelas['Mes'].dt.to_period("M"))['Valor'].sum().reset_index()
-    )
-    montante_mensal['Mes'] = montante_mensal['Mes'].dt.to_timestamp()
-
     # Adicionar colunas formatadas para os tooltips
-    montante_mensal['Valor Formatado'] = montante_mensal['Valor'].apply(format_brl)
+    montante_mensal['Valor Formatado'] = montante_mensal['Valor'].map(format_brl)
     montante_mensal['Data Formatada'] = montante_mensal['Mes'].dt.strftime('%b de %Y').str.capitalize()
 
     # Gerar o gráfico de linha
@@ -220,55 +178,14 @@ def chart_installment_evolution_v2(df_filtrado):
 
     return fig
 
-@st.cache_data
-def generate_pie_chart_category_v2(df, data_inicio, data_fim):
+def generate_pie_chart_category_v2(grouped_df):
     """
     Gera um gráfico de pizza para custos por categoria,
     distinguindo pagamentos à vista e a prazo,
     com tooltip detalhado incluindo valores de Crédito e À Vista.
-    Aplica lógica de expansão de parcelas e filtro por data.
+    Recebe o agregado 'categoria_pagamento' de `prepare_expense_dashboard`.
     """
-    # Expandir as parcelas de cada despesa
-    parcelas_expandidas = []
-    for _, row in df.iterrows():
-        parcelas = expand_installments_v2(row)
-        for parcela in parcelas:
-            parcela['Categoria'] = row.get('Categoria', None)  # Propaga a categoria original
-            parcela['Tipo de Pagamento'] = row.get('Tipo de Pagamento', None)  # Propaga o tipo de pagamento (Crédito ou À Vista)
-        parcelas_expandidas.extend(parcelas)
-
-    # Criar DataFrame consolidado das parcelas
-    df_expansion = pd.DataFrame(parcelas_expandidas)
-
-    # Garantir que as colunas necessárias existem no DataFrame
-    required_columns = ['Mes', 'Tipo de Pagamento', 'Valor', 'Categoria']
-    missing_columns = [col for col in required_columns if col not in df_expansion.columns]
-    if missing_columns:
-        raise ValueError(f"As seguintes colunas estão ausentes no DataFrame expandido: {missing_columns}")
-
-    # Garantir que a coluna 'Mes' esteja no formato datetime
-    df_expansion['Mes'] = pd.to_datetime(df_expansion['Mes'], errors='coerce').dt.to_period('M').dt.to_timestamp()
-
-    # Filtrar o DataFrame com base nas datas selecionadas
-    df_filtered = df_expansion[
-        (df_expansion['Mes'] >= pd.to_datetime(data_inicio)) &
-        (df_expansion['Mes'] <= pd.to_datetime(data_fim))
-    ]
-
-    # Garantir que não há valores nulos nas colunas essenciais
-    df_filtered = df_filtered.dropna(subset=['Categoria', 'Tipo de Pagamento', 'Valor'])
-
-    # Calcular o valor ajustado para cada entrada
-    df_filtered["Valor Ajustado"] = df_filtered.apply(
-        lambda row: row["Valor"] if row["Tipo de Pagamento"] == "Crédito" else row["Valor"], axis=1
-    )
-
-    # Agrupar por Categoria e Tipo de Pagamento
-    grouped_df = (
-        df_filtered
-        .groupby(["Categoria", "Tipo de Pagamento"], as_index=False)["Valor Ajustado"]
-        .sum()
-    )
+    grouped_df = grouped_df.rename(columns={"Valor": "Valor Ajustado"})
 
     # Calcular os totais por Categoria
     total_df = grouped_df.groupby("Categoria", as_index=False)["Valor Ajustado"].sum()
@@ -285,9 +202,9 @@ def generate_pie_chart_category_v2(df, data_inicio, data_fim):
 
     # Combinar os dados totais com os valores detalhados
     final_df = total_df.merge(pivot_df, on="Categoria", how="left")
-    final_df["Valor Formatado"] = final_df["Valor Total"].apply(format_brl)
-    final_df["À Vista Formatado"] = final_df["À Vista"].apply(format_brl)
-    final_df["Crédito Formatado"] = final_df["Crédito"].apply(format_brl)
+    final_df["Valor Formatado"] = final_df["Valor Total"].map(format_brl)
+    final_df["À Vista Formatado"] = final_df["À Vista"].map(format_brl)
+    final_df["Crédito Formatado"] = final_df["Crédito"].map(format_brl)
     final_df["Porcentagem"] = (final_df["Valor Total"] / final_df["Valor Total"].sum()) * 100
 
     # Criar gráfico de pizza
@@ -317,83 +234,29 @@ def generate_pie_chart_category_v2(df, data_inicio, data_fim):
 
     return fig
 
-@st.cache_data
-def generate_grouped_bar_chart_by_month_type_v2(df, data_inicio, data_fim):
+def generate_grouped_bar_chart_by_month_type_v2(grouped_df):
     """
     Gera um gráfico de barras agrupadas para representar despesas agrupadas por Mês (formato: Out 2024) e Tipo,
     removendo categorias ausentes e ajustando o alinhamento das barras para meses específicos.
     
     Args:
-        df (pd.DataFrame): DataFrame contendo as colunas necessárias.
-        data_inicio (str): Data inicial no formato 'YYYY-MM-DD'.
-        data_fim (str): Data final no formato 'YYYY-MM-DD'.
+        grouped_df (pd.DataFrame): Agregado 'mes_tipo' de `prepare_expense_dashboard`.
     
     Returns:
         fig: Objeto Plotly Figure.
     """
-    # Expandir parcelas usando expand_installments
-    parcelas_expandidas = []
-    for _, row in df.iterrows():
-        parcelas = expand_installments_v2(row)
-        for parcela in parcelas:
-            parcela['Tipo'] = row.get('Tipo', None)  # Propagar o tipo de despesa
-            parcela['Tipo de Pagamento'] = row.get('Tipo de Pagamento', None)  # Propagar o tipo de pagamento
-        parcelas_expandidas.extend(parcelas)
-
-    # Criar DataFrame consolidado das parcelas
-    df_expansion = pd.DataFrame(parcelas_expandidas)
-
-    # Garantir que as colunas necessárias existem no DataFrame expandido
-    required_columns = ['Mes', 'Tipo', 'Valor', 'Tipo de Pagamento']
-    missing_columns = [col for col in required_columns if col not in df_expansion.columns]
-    if missing_columns:
-        raise ValueError(f"As seguintes colunas estão ausentes no DataFrame expandido: {missing_columns}")
-
-    # Garantir que a coluna 'Mes' esteja no formato datetime
-    df_expansion['Mes'] = pd.to_datetime(df_expansion['Mes'], errors='coerce').dt.to_period('M').dt.to_timestamp()
-
-    # Filtrar o DataFrame com base nas datas selecionadas
-    df_filtered = df_expansion[
-        (df_expansion['Mes'] >= pd.to_datetime(data_inicio)) &
-        (df_expansion['Mes'] <= pd.to_datetime(data_fim))
-    ]
-
-    # Garantir que não há valores nulos nas colunas essenciais
-    df_filtered = df_filtered.dropna(subset=['Tipo', 'Mes', 'Valor'])
-
-    # Calcular o valor ajustado (todos os valores serão somados, independentemente do tipo de pagamento)
-    df_filtered["Valor Ajustado"] = df_filtered["Valor"]
-
-    # Adicionar coluna com o formato de mês no padrão brasileiro (Ex.: "Out 2024")
-    df_filtered["Mês Formatado"] = df_filtered["Mes"].dt.strftime('%b %Y').str.capitalize()
-
-    # Agrupar os dados por mês formatado e tipo
-    grouped_df = (
-        df_filtered
-        .groupby(["Mês Formatado", "Tipo"], as_index=False)["Valor Ajustado"]
-        .sum()
-    )
-
-    # Remover as categorias com valor ajustado igual a zero
-    grouped_df = grouped_df[grouped_df["Valor Ajustado"] > 0]
-
     # Garantir que os meses estão ordenados corretamente
-    meses_ordenados = (
-        pd.to_datetime(grouped_df["Mês Formatado"], format='%b %Y', errors='coerce')
-        .drop_duplicates()
-        .sort_values()
-    )
-    categorias_ordenadas = meses_ordenados.dt.strftime('%b %Y').str.capitalize().tolist()
+    grouped_df = grouped_df.sort_values(["Mes", "Tipo"]).rename(columns={"Valor": "Valor Ajustado"})
 
-    # Garantir que o DataFrame esteja ordenado pelas colunas corretamente
+    # Adicionar coluna com o formato de mês no padrão brasileiro (Ex.: "Out 2024")
+    grouped_df["Mês Formatado"] = grouped_df["Mes"].dt.strftime('%b %Y').str.capitalize()
     grouped_df["Mês Formatado"] = pd.Categorical(
         grouped_df["Mês Formatado"],
-        categories=categorias_ordenadas,
+        categories=grouped_df["Mês Formatado"].unique(),
         ordered=True
     )
-    grouped_df = grouped_df.sort_values("Mês Formatado")
 
-    grouped_df['Valor Formatado'] = grouped_df['Valor Ajustado'].apply(format_brl)
+    grouped_df['Valor Formatado'] = grouped_df['Valor Ajustado'].map(format_brl)
 
 
     # Criar o gráfico de barras agrupadas
@@ -454,35 +317,17 @@ def generate_grouped_bar_chart_by_month_type_v2(df, data_inicio, data_fim):
 
     return fig
 
-@st.cache_data
-def generate_stacked_bar_chart_v3(df, data_inicio, data_fim):
+def generate_stacked_bar_chart_v3(grouped_df):
     """
     Gera o gráfico de barras empilhadas com base nas despesas, exibindo as parcelas
     dentro do intervalo de datas informado.
+    Recebe o agregado 'mes_pagamento' de `prepare_expense_dashboard`.
     """
-    # Expandir as parcelas de cada despesa
-    expanded_installments = []
-    for _, row in df.iterrows():
-        expanded_installments.extend(expand_installments_v2(row))
-
-    # Criar DataFrame consolidado
-    df_expansion = pd.DataFrame(expanded_installments)
-
-    # Garantir que a coluna 'Mes' esteja no formato datetime
-    df_expansion['Mes'] = pd.to_datetime(df_expansion['Mes']).dt.to_period('M').dt.to_timestamp()
-
-    # Filtrar o DataFrame com base nas datas selecionadas
-    df_expansion_filtered = df_expansion[
-        (df_expansion['Mes'] >= pd.to_datetime(data_inicio)) & 
-        (df_expansion['Mes'] <= pd.to_datetime(data_fim))
-    ]
-
-    # Agrupar por mês e tipo de pagamento
-    grouped_df = df_expansion_filtered.groupby(['Mes', 'Tipo'])['Valor'].sum().reset_index()
+    grouped_df = grouped_df.copy()
 
     # Formatar valores e datas para exibição
     grouped_df['Mes Formatado'] = grouped_df['Mes'].dt.strftime('%b %Y').str.capitalize()
-    grouped_df['Valor Formatado'] = grouped_df['Valor'].apply(format_brl)
+    grouped_df['Valor Formatado'] = grouped_df['Valor'].map(format_brl)
 
     # Criar o gráfico de barras empilhadas
     fig = px.bar(
@@ -540,23 +385,14 @@ def generate_stacked_bar_chart_v3(df, data_inicio, data_fim):
 
     return fig
 
-@st.cache_data
-def generate_grouped_bar_chart_by_day_type(df, data_inicio, data_fim):
-    # Garantindo que a coluna 'Data' esteja no formato datetime
-    df["Data"] = pd.to_datetime(df["Data"])
-    df["Dia"] = df["Data"].dt.strftime("%d/%m/%Y")  # Criar uma coluna para exibição no formato brasileiro
-
-    # Filtrar o DataFrame com base nas datas de início e fim fornecidas
-    df_filtered = df[(df["Data"] >= pd.to_datetime(data_inicio)) & 
-                    (df["Data"] <= pd.to_datetime(data_fim))]
-
-    # Agrupando os dados por 'Data' e 'Tipo', somando os valores
-    grouped_df = df_filtered.groupby(['Data', 'Tipo'], as_index=False)['Valor'].sum()
+def generate_grouped_bar_chart_by_day_type(grouped_df):
+    """
+    Gera um gráfico de barras agrupadas com as despesas por Tipo e Dia.
+    Recebe o agregado 'dia_tipo' de `prepare_expense_dashboard`, já ordenado por data.
+    """
+    grouped_df = grouped_df.copy()
     grouped_df['Dia'] = grouped_df['Data'].dt.strftime("%d/%m/%Y")  # Adiciona a coluna para exibição
-    grouped_df['Valor Formatado'] = grouped_df['Valor'].apply(format_brl)
-
-    # Ordenando o DataFrame pelas datas
-    grouped_df = grouped_df.sort_values('Data')  # Ordena cronologicamente pelas datas
+    grouped_df['Valor Formatado'] = grouped_df['Valor'].map(format_brl)
 
     # Criando o gráfico de barras agrupadas
     fig = px.bar(
@@ -595,9 +431,32 @@ def generate_grouped_bar_chart_by_day_type(df, data_inicio, data_fim):
 
     return fig
 
-def manager_expense():
-    expense_df = get_expense()
-    if expense_df.empty:
+@versioned_cache("expense", "type", "category", "payment")
+def build_expense_charts(data_inicio, data_fim, exibir_prazo=True):
+    """Monta as figuras do dashboard de despesas a partir dos agregados de `prepare_expense_dashboard`."""
+    dados = prepare_expense_dashboard(data_inicio, data_fim, exibir_prazo)
+    return {
+        'installment_evolution_chart_v2': chart_installment_evolution_v2(dados['evolucao_credito']),
+        'pie_chart_category_v2': generate_pie_chart_category_v2(dados['categoria_pagamento']),
+        'grouped_bar_chart_by_month_type_v2': generate_grouped_bar_chart_by_month_type_v2(dados['mes_tipo']),
+        'stacked_bar_chart_v3': generate_stacked_bar_chart_v3(dados['mes_pagamento']),
+        'grouped_bar_chart_by_day_type': generate_grouped_bar_chart_by_day_type(dados['dia_tipo']),
+    }
+
+def load_expense_section():
+    """
+    Loader da seção Despesas: exibe os filtros e retorna as figuras do período, ou None se
+    faltar cadastro (após exibir o aviso).
+
+    A seção roda em um fragmento (ver `view_dashboard`): alterar um filtro reexecuta apenas
+    este loader e o renderer, não a inicialização do banco nem a autenticação.
+    """
+    # Os reruns do fragmento não passam por main(): confere a sessão (barato, com o principal
+    # em cache) e, se ela acabou (logout, revogação), recarrega a página para exibir o login
+    if not is_authenticated():
+        st.rerun()
+
+    if get_expense_count() == 0:
         st.info('''
                     Nenhuma ***despesa*** cadastrada.\n\n
                     Clique no botão abaixo para ser redirecionado a página de ***Despesas***.
@@ -606,7 +465,7 @@ def manager_expense():
             submit_button = st.form_submit_button(label="Ok", use_container_width=True)
             if submit_button:                        
                 st.switch_page("pages/2_Despesas.py")   
-            return 
+            return None
 
     category_df = get_category()
     if category_df.empty:
@@ -618,44 +477,29 @@ def manager_expense():
             submit_button = st.form_submit_button(label="Ok", use_container_width=True)
             if submit_button:                        
                 st.switch_page("pages/5_Categorias.py")   
-            return 
-
-    # Filtra os dados
-    df_expense_final = get_filtered_data(expense_df, category_df)
+            return None
 
     # Configura os filtros de data
     st.title("Dashboard de Despesas")
-    data_inicio = st.date_input("Data Início:", date.today() - timedelta(days=365), format="DD/MM/YYYY")
-    data_fim = st.date_input("Data Fim", date.today(), format="DD/MM/YYYY")
-
-    # Filtra despesas por intervalo de datas
-    df_filtrado = df_expense_final[
-        (df_expense_final['Data'] >= pd.to_datetime(data_inicio)) &
-        (df_expense_final['Data'] <= pd.to_datetime(data_fim))
-    ].copy()
-
-    # Adiciona coluna para tipo de pagamento (À vista ou Crédito)
-    df_filtrado['Tipo de Pagamento'] = df_filtrado['Parcelas'].apply(
-        lambda x: 'Crédito' if x > 0 else 'À Vista'
-    )
+    data_inicio = st.date_input("Data Início:", date.today() - timedelta(days=365), format="DD/MM/YYYY",
+                                key='expense_data_inicio', on_change=track_interaction, args=("Data Início",))
+    data_fim = st.date_input("Data Fim", date.today(), format="DD/MM/YYYY",
+                             key='expense_data_fim', on_change=track_interaction, args=("Data Fim",))
 
     # Checkbox para filtrar apenas despesas à vista
-    if not st.checkbox("Exibir pagamentos a prazo", value=True):
-        df_filtrado = df_filtrado[df_filtrado['Tipo de Pagamento'] == 'À Vista']
-
-    # Gera gráficos
-    installment_evolution_chart_v2 = chart_installment_evolution_v2(df_filtrado)
-    pie_chart_category_v2 = generate_pie_chart_category_v2(df_filtrado, data_inicio, data_fim)
-    grouped_bar_chart_by_month_type_v2 = generate_grouped_bar_chart_by_month_type_v2(df_filtrado, data_inicio, data_fim)
-    stacked_bar_chart_v3 = generate_stacked_bar_chart_v3(df_filtrado, data_inicio, data_fim)
-    grouped_bar_chart_by_day_type = generate_grouped_bar_chart_by_day_type(df_filtrado, data_inicio, data_fim)
-
-    # Exibe os gráficos
-    st.plotly_chart(stacked_bar_chart_v3, use_container_width=True)
-    st.plotly_chart(grouped_bar_chart_by_month_type_v2, use_container_width=True)
-    st.plotly_chart(grouped_bar_chart_by_day_type, use_container_width=True)
-    st.plotly_chart(pie_chart_category_v2, use_container_width=True)
-    st.plotly_chart(installment_evolution_chart_v2, use_container_width=True)
+    exibir_prazo = st.checkbox("Exibir pagamentos a prazo", value=True,
+                               key='expense_exibir_prazo', on_change=track_interaction, args=("Exibir a prazo",))
+
+    # Gera gráficos (cache pela versão dos dados e pelos filtros)
+    return build_expense_charts(data_inicio, data_fim, exibir_prazo)
+
+def render_expense_section(graficos):
+    """Renderer da seção Despesas: exibe as figuras de `load_expense_section`."""
+    st.plotly_chart(graficos['stacked_bar_chart_v3'], use_container_width=True)
+    st.plotly_chart(graficos['grouped_bar_chart_by_month_type_v2'], use_container_width=True)
+    st.plotly_chart(graficos['grouped_bar_chart_by_day_type'], use_container_width=True)
+    st.plotly_chart(graficos['pie_chart_category_v2'], use_container_width=True)
+    st.plotly_chart(graficos['installment_evolution_chart_v2'], use_container_width=True)
     # col1, col2 = st.columns(2)
     # with col1:
     #     st.plotly_chart(pie_chart_category_v2, use_container_width=True)
@@ -663,11 +507,9 @@ def manager_expense():
     #     st.plotly_chart(installment_evolution_chart_v2, use_container_width=True)
 
 def main():
-    # Inicializar banco de dados
+    # Inicializar banco de dados (uma vez por processo; nos demais reruns não acessa o banco)
     try:
-        print("Inicializando o banco de dados...")
-        DataManager()
-        print("Banco de dados configurado com sucesso.")
+        DataManager.bootstrap()
     except Exception as e:
         print(f"Erro durante a inicialização do banco de dados: {e}")
         return
@@ -676,7 +518,8 @@ def main():
         show_login()
         return  # Impede que o restante da página seja carregado
     
-    st.sidebar.button("Sair", on_click=lambda: st.session_state.pop('auth_token', None), use_container_width=True, type="primary")
+    st.sidebar.button("Sair", on_click=logout, use_container_width=True, type="primary")
+    show_timings()
 
 
     # @st.cache_data
@@ -1997,108 +1840,117 @@ def main():
 
 
     def view_dashboard():
-        # Criação das abas
-        general, expenses, incomes, investments = st.tabs(["Geral", "Despesas", "Receitas", "Investimentos"])
-        
-        with general:
+        # Seções do dashboard: diferente de st.tabs, só a seção selecionada busca e calcula
+        # os seus dados a cada rerun (ver SectionRegistry)
+        sections = SectionRegistry("dashboard_section")
+
+        @sections.register("Geral")
+        def view_general():
             st.header("Dash geral")
-        with expenses:
-            manager_expense()
-            # expense_df = get_expense()
-            # if expense_df.empty:
-            #     st.info('''
-            #                 Nenhuma ***despesa*** cadastrada.\n\n
-            #                 Clique no botão abaixo para ser redirecionado a página de ***Despesas***.
-            #                 ''')
-            #     with st.form(key='dash_expense_form', border=False):
-            #         submit_button = st.form_submit_button(label="Ok", use_container_width=True)
-            #         if submit_button:                        
-            #             st.switch_page("pages/2_Despesas.py")   
-            #         return 
-
-            # category_df = get_category()
-            # if category_df.empty:
-            #     st.info('''
-            #             Nenhuma ***categoria*** cadastrada.\n\n
-            #             Clique no botão abaixo para ser redirecionado a página de ***Categorias***.
-            #             ''')
-            #     with st.form(key='dash_category_form', border=False):
-            #         submit_button = st.form_submit_button(label="Ok", use_container_width=True)
-            #         if submit_button:                        
-            #             st.switch_page("pages/5_Categorias.py")   
-            #         return 
-
-            # # Filtra os dados
-            # df_expense_final = get_filtered_data(expense_df, category_df)
-
-            # # Configura os filtros de data
-            # st.title("Dashboard de Despesas")
-            # data_inicio = st.date_input("Data Início:", date.today() - timedelta(days=365), format="DD/MM/YYYY")
-            # data_fim = st.date_input("Data Fim", date.today(), format="DD/MM/YYYY")
-
-            # # Filtra despesas por intervalo de datas
-            # df_filtrado = df_expense_final[
-            #     (df_expense_final['Data'] >= pd.to_datetime(data_inicio)) &
-            #     (df_expense_final['Data'] <= pd.to_datetime(data_fim))
-            # ].copy()
-
-            # # Adiciona coluna para tipo de pagamento (À vista ou Crédito)
-            # df_filtrado['Tipo de Pagamento'] = df_filtrado['Parcelas'].apply(
-            #     lambda x: 'Crédito' if x > 0 else 'À Vista'
-            # )
-
-            # # Checkbox para filtrar apenas despesas à vista
-            # if not st.checkbox("Exibir pagamentos a prazo", value=True):
-            #     df_filtrado = df_filtrado[df_filtrado['Tipo de Pagamento'] == 'À Vista']
-
-            # # Gera gráficos
-            # #stacked_bar_chart = generate_stacked_bar_chart(df_filtrado)
-            # #installment_evolution_chart = chart_installment_evolution(df_filtrado)
-            # installment_evolution_chart_v2 = chart_installment_evolution_v2(df_filtrado)
-            # #stacked_bar_chart_category = generate_stacked_bar_chart_category(df_filtrado)
-            # #stacked_bar_chart_with_month = generate_stacked_bar_chart_with_month(df_filtrado)
-            # #pie_chart_category = generate_pie_chart_category(df_filtrado)
-            # pie_chart_category_v2 = generate_pie_chart_category_v2(df_filtrado, data_inicio, data_fim)
-            # stacked_bar_chart_type = generate_stacked_bar_chart_type(df_filtrado)
-            # #grouped_bar_chart_by_month_type = generate_grouped_bar_chart_by_month_type(df_filtrado)
-            # grouped_bar_chart_by_month_type_v2 = generate_grouped_bar_chart_by_month_type_v2(df_filtrado, data_inicio, data_fim)
-            # #stacked_bar_chart_v1 = generate_stacked_bar_chart_v1(df_filtrado)
-            # #stacked_bar_chart_v2 = generate_stacked_bar_chart_v2(df_filtrado)
-            # stacked_bar_chart_v3 = generate_stacked_bar_chart_v3(df_filtrado, data_inicio, data_fim)
-            # grouped_bar_chart_by_day_type = generate_grouped_bar_chart_by_day_type(df_filtrado, data_inicio, data_fim)
-
-
-            # # Exibe os gráficos
-            # # st.plotly_chart(stacked_bar_chart, use_container_width=True)
-            # # st.plotly_chart(stacked_bar_chart_v1, use_container_width=True)
-            # # st.plotly_chart(stacked_bar_chart_v2, use_container_width=True)
-            # st.plotly_chart(stacked_bar_chart_v3, use_container_width=True)
-
-            # col1, col2 = st.columns(2)
-            # with col1:
-            #     st.plotly_chart(installment_evolution_chart_v2, use_container_width=True)
-            # with col2:
-            #     st.plotly_chart(pie_chart_category_v2, use_container_width=True)
-            
-            
-            # #st.plotly_chart(pie_chart_category_v2, use_container_width=True)
-            # #st.plotly_chart(stacked_bar_chart_category, use_container_width=True)
-            # #st.plotly_chart(stacked_bar_chart_with_month, use_container_width=True)
-            # st.plotly_chart(grouped_bar_chart_by_month_type_v2, use_container_width=True)
-            # #st.plotly_chart(grouped_bar_chart_by_month_type, use_container_width=True)
-            # #st.plotly_chart(stacked_bar_chart_type, use_container_width=True)
-            # st.plotly_chart(grouped_bar_chart_by_day_type, use_container_width=True)
-
-        with incomes:
+
+        # Em fragmento: os filtros de período reexecutam só a seção de despesas
+        sections.register("Despesas", loader=load_expense_section, fragment=True)(render_expense_section)
+        # expense_df = get_expense()
+        # if expense_df.empty:
+        #     st.info('''
+        #                 Nenhuma ***despesa*** cadastrada.\n\n
+        #                 Clique no botão abaixo para ser redirecionado a página de ***Despesas***.
+        #                 ''')
+        #     with st.form(key='dash_expense_form', border=False):
+        #         submit_button = st.form_submit_button(label="Ok", use_container_width=True)
+        #         if submit_button:                        
+        #             st.switch_page("pages/2_Despesas.py")   
+        #         return 
+
+        # category_df = get_category()
+        # if category_df.empty:
+        #     st.info('''
+        #             Nenhuma ***categoria*** cadastrada.\n\n
+        #             Clique no botão abaixo para ser redirecionado a página de ***Categorias***.
+        #             ''')
+        #     with st.form(key='dash_category_form', border=False):
+        #         submit_button = st.form_submit_button(label="Ok", use_container_width=True)
+        #         if submit_button:                        
+        #             st.switch_page("pages/5_Categorias.py")   
+        #         return 
+
+        # # Filtra os dados
+        # df_expense_final = get_filtered_data(expense_df, category_df)
+
+        # # Configura os filtros de data
+        # st.title("Dashboard de Despesas")
+        # data_inicio = st.date_input("Data Início:", date.today() - timedelta(days=365), format="DD/MM/YYYY")
+        # data_fim = st.date_input("Data Fim", date.today(), format="DD/MM/YYYY")
+
+        # # Filtra despesas por intervalo de datas
+        # df_filtrado = df_expense_final[
+        #     (df_expense_final['Data'] >= pd.to_datetime(data_inicio)) &
+        #     (df_expense_final['Data'] <= pd.to_datetime(data_fim))
+        # ].copy()
+
+        # # Adiciona coluna para tipo de pagamento (À vista ou Crédito)
+        # df_filtrado['Tipo de Pagamento'] = df_filtrado['Parcelas'].apply(
+        #     lambda x: 'Crédito' if x > 0 else 'À Vista'
+        # )
+
+        # # Checkbox para filtrar apenas despesas à vista
+        # if not st.checkbox("Exibir pagamentos a prazo", value=True):
+        #     df_filtrado = df_filtrado[df_filtrado['Tipo de Pagamento'] == 'À Vista']
+
+        # # Gera gráficos
+        # #stacked_bar_chart = generate_stacked_bar_chart(df_filtrado)
+        # #installment_evolution_chart = chart_installment_evolution(df_filtrado)
+        # installment_evolution_chart_v2 = chart_installment_evolution_v2(df_filtrado)
+        # #stacked_bar_chart_category = generate_stacked_bar_chart_category(df_filtrado)
+        # #stacked_bar_chart_with_month = generate_stacked_bar_chart_with_month(df_filtrado)
+        # #pie_chart_category = generate_pie_chart_category(df_filtrado)
+        # pie_chart_category_v2 = generate_pie_chart_category_v2(df_filtrado, data_inicio, data_fim)
+        # stacked_bar_chart_type = generate_stacked_bar_chart_type(df_filtrado)
+        # #grouped_bar_chart_by_month_type = generate_grouped_bar_chart_by_month_type(df_filtrado)
+        # grouped_bar_chart_by_month_type_v2 = generate_grouped_bar_chart_by_month_type_v2(df_filtrado, data_inicio, data_fim)
+        # #stacked_bar_chart_v1 = generate_stacked_bar_chart_v1(df_filtrado)
+        # #stacked_bar_chart_v2 = generate_stacked_bar_chart_v2(df_filtrado)
+        # stacked_bar_chart_v3 = generate_stacked_bar_chart_v3(df_filtrado, data_inicio, data_fim)
+        # grouped_bar_chart_by_day_type = generate_grouped_bar_chart_by_day_type(df_filtrado, data_inicio, data_fim)
+
+
+        # # Exibe os gráficos
+        # # st.plotly_chart(stacked_bar_chart, use_container_width=True)
+        # # st.plotly_chart(stacked_bar_chart_v1, use_container_width=True)
+        # # st.plotly_chart(stacked_bar_chart_v2, use_container_width=True)
+        # st.plotly_chart(stacked_bar_chart_v3, use_container_width=True)
+
+        # col1, col2 = st.columns(2)
+        # with col1:
+        #     st.plotly_chart(installment_evolution_chart_v2, use_container_width=True)
+        # with col2:
+        #     st.plotly_chart(pie_chart_category_v2, use_container_width=True)
+        
+        
+        # #st.plotly_chart(pie_chart_category_v2, use_container_width=True)
+        # #st.plotly_chart(stacked_bar_chart_category, use_container_width=True)
+        # #st.plotly_chart(stacked_bar_chart_with_month, use_container_width=True)
+        # st.plotly_chart(grouped_bar_chart_by_month_type_v2, use_container_width=True)
+        # #st.plotly_chart(grouped_bar_chart_by_month_type, use_container_width=True)
+        # #st.plotly_chart(stacked_bar_chart_type, use_container_width=True)
+        # st.plotly_chart(grouped_bar_chart_by_day_type, use_container_width=True)
+
+        @sections.register("Receitas")
+        def view_incomes():
             st.header('Dash Receitas')
-        with investments:
+
+        @sections.register("Investimentos")
+        def view_investments():
             st.header('Dash Investimento')
 
+        sections.render()
+
     view_dashboard()
 
 
 if __name__ == "__main__":
-    main()
+    with timed("Dashboard"):
+        main()
 
 
 st.sidebar.markdown("Desenvolvido por [Evaldo](https://www.linkedin.com/in/evaldodeoliveira/)")
\ No newline at end of file
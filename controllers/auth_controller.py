@@ -1,5 +1,10 @@
 import jwt
-from datetime import datetime, timedelta, timezone
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from controllers.login_throttle import LoginThrottle
 from repositories.user_repository import UserRepository
 from models.user import User
 
@@ -7,19 +12,125 @@ from models.user import User
 SECRET_KEY = "sua_chave_secreta"
 
 class AuthController:
+    # Validade de cada token. Sessões ativas recebem um token novo antes de expirar (ver
+    # `refresh_jwt`), até completar MAX_SESSION desde o login.
+    TOKEN_TTL = timedelta(hours=1)
+    #TOKEN_TTL = timedelta(minutes=5)
+    MAX_SESSION = timedelta(hours=12)
+    # Faltando menos que isso para expirar, o token é verificado de novo e renovado
+    REFRESH_WINDOW = timedelta(minutes=15)
+
+    # Tokens revogados (jti -> exp) e, por usuário, o instante antes do qual os tokens emitidos
+    # são recusados. Os tokens só existem no session_state do servidor e morrem com o processo,
+    # então a lista em memória basta; cada entrada sai quando o token expiraria.
+    _revoked = {}
+    _revoked_users = {}
+    _revoked_lock = threading.Lock()
+
+    # Tentativas de login na janela, por nome de usuário e por cliente (ver `LoginThrottle`)
+    _username_throttle = LoginThrottle(max_attempts=5, window=timedelta(minutes=15))
+    _client_throttle = LoginThrottle(max_attempts=20, window=timedelta(minutes=15))
+
+    # O bcrypt roda num pool pequeno, fora da thread do script: uma rajada de logins ocupa no
+    # máximo LOGIN_WORKERS núcleos, e além de LOGIN_MAX_PENDING verificações (em execução ou
+    # na fila) as novas esperam até LOGIN_TIMEOUT segundos e então são recusadas.
+    LOGIN_WORKERS = 2
+    LOGIN_MAX_PENDING = 8
+    LOGIN_TIMEOUT = 10.0
+    # Resultado de `login` quando o pool está saturado: a senha não chegou a ser verificada
+    BUSY = object()
+    _login_executor = None
+    _login_slots = threading.BoundedSemaphore(LOGIN_MAX_PENDING)
+    _login_lock = threading.Lock()
+
     @staticmethod
-    def login(username, password):
+    def login(username, password, client=None):
+        """
+        Autentica o usuário e retorna um token, None (credenciais inválidas) ou `BUSY`.
+
+        Antes do bcrypt, a tentativa é registrada nos limites por usuário e por `client`
+        (ex.: IP); se algum estiver esgotado, retorna None sem verificar a senha (ver
+        `login_retry_after`). Se o pool de login estiver saturado, retorna `BUSY` e a tentativa
+        não conta nos limites. Um login aceito zera o limite do usuário e regrava o hash se
+        ele foi gerado com custo menor que `User.BCRYPT_ROUNDS`.
+        """
+        if client and AuthController._client_throttle.hit(client):
+            return None
+        if AuthController._username_throttle.hit(username):
+            return None
+
         user = UserRepository.get_user_by_username(username)
-        if user and User.verify_password(password, user.password_hash):
-            return AuthController.create_jwt(user.user_id)
-        return None
+        if user:
+            valid = AuthController._run_in_pool(User.verify_password, password, user.password_hash)
+        else:
+            # Usuário inexistente paga o mesmo bcrypt, para não ser distinguível pelo tempo
+            valid = AuthController._run_in_pool(User.verify_dummy, password)
+        if valid is AuthController.BUSY:
+            AuthController._username_throttle.undo(username)
+            if client:
+                AuthController._client_throttle.undo(client)
+            return AuthController.BUSY
+        if not valid:
+            return None
+
+        AuthController._username_throttle.reset(username)
+        if client:
+            AuthController._client_throttle.undo(client)
+        if User.needs_rehash(user.password_hash):
+            AuthController._rehash_password(user, password)
+        return AuthController.create_jwt(user.user_id)
+
+    @staticmethod
+    def login_retry_after(username, client=None):
+        """Segundos até `username`/`client` poderem tentar login de novo (0 se liberados)."""
+        wait = AuthController._username_throttle.retry_after(username)
+        if client:
+            wait = max(wait, AuthController._client_throttle.retry_after(client))
+        return wait
 
     @staticmethod
-    def create_jwt(user_id):
+    def _rehash_password(user, password):
+        password_hash = AuthController._run_in_pool(User.hash_password, password)
+        if password_hash is AuthController.BUSY:
+            return
+        try:
+            UserRepository.update_password_hash(user.user_id, password_hash)
+        except Exception as e:
+            # O login continua valendo; o hash é regravado numa próxima vez
+            print(f"Erro ao atualizar o hash da senha: {e}")
+
+    @classmethod
+    def _run_in_pool(cls, func, *args):
+        """Executa `func(*args)` no pool de login e retorna o resultado (`BUSY` se não houver vaga)."""
+        if not cls._login_slots.acquire(timeout=cls.LOGIN_TIMEOUT):
+            return cls.BUSY
+        try:
+            if cls._login_executor is None:
+                with cls._login_lock:
+                    if cls._login_executor is None:
+                        cls._login_executor = ThreadPoolExecutor(
+                            max_workers=cls.LOGIN_WORKERS, thread_name_prefix="login"
+                        )
+            return cls._login_executor.submit(func, *args).result()
+        finally:
+            cls._login_slots.release()
+
+    @staticmethod
+    def create_jwt(user_id, auth_time=None):
+        """
+        Emite um token para `user_id`, com id único (jti) para revogação.
+
+        Args:
+            auth_time (float): Instante do login (timestamp). Mantido nas renovações, para
+                limitar a duração total da sessão; por padrão, agora.
+        """
+        now = time.time()
         payload = {
             "user_id": user_id,
-            "exp": datetime.now(timezone.utc) + timedelta(hours=1)  # Expira em 1 hora
-            #"exp": datetime.now(timezone.utc) + timedelta(minutes=5)  # Expira em 1 minuto
+            "jti": uuid.uuid4().hex,
+            "iat": now,
+            "auth_time": now if auth_time is None else auth_time,
+            "exp": now + AuthController.TOKEN_TTL.total_seconds()
         }
         return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
 
@@ -27,8 +138,58 @@ class AuthController:
     def verify_jwt(token):
         try:
             decoded = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-            return decoded  # Retorna informações do usuário
         except jwt.ExpiredSignatureError:
             return None  # Token expirado
         except jwt.InvalidTokenError:
             return None  # Token inválido
+        if AuthController.is_revoked(decoded):
+            return None
+        return decoded  # Retorna informações do usuário
+
+    @staticmethod
+    def refresh_jwt(token):
+        """
+        Renovação deslizante: verifica `token` e, se válido, emite um novo para o mesmo usuário
+        e revoga o anterior. Retorna None se o token for inválido, expirado, revogado ou se a
+        sessão já tiver passado de MAX_SESSION.
+        """
+        payload = AuthController.verify_jwt(token)
+        if not payload:
+            return None
+        auth_time = payload.get("auth_time", payload.get("iat", 0))
+        if time.time() - auth_time > AuthController.MAX_SESSION.total_seconds():
+            return None
+
+        new_token = AuthController.create_jwt(payload["user_id"], auth_time)
+        AuthController.revoke(payload)
+        return new_token
+
+    @classmethod
+    def revoke(cls, payload):
+        """Revoga o token de `payload` (decodificado) até a sua expiração."""
+        now = time.time()
+        with cls._revoked_lock:
+            # Descarta as entradas de tokens que já expiraram
+            for jti in [jti for jti, exp in cls._revoked.items() if exp < now]:
+                del cls._revoked[jti]
+            if payload.get("jti"):
+                cls._revoked[payload["jti"]] = payload.get("exp", now)
+
+    @classmethod
+    def revoke_user(cls, user_id):
+        """Logout forçado: recusa todos os tokens de `user_id` emitidos até agora."""
+        now = time.time()
+        with cls._revoked_lock:
+            # Depois de MAX_SESSION, todo token emitido antes da revogação já expirou
+            horizon = now - cls.MAX_SESSION.total_seconds()
+            for revoked_user in [user for user, revoked_at in cls._revoked_users.items() if revoked_at < horizon]:
+                del cls._revoked_users[revoked_user]
+            cls._revoked_users[user_id] = now
+
+    @classmethod
+    def is_revoked(cls, payload):
+        """Indica se o token (já decodificado) foi revogado, sem verificar a assinatura."""
+        if payload.get("jti") in cls._revoked:
+            return True
+        revoked_at = cls._revoked_users.get(payload.get("user_id"))
+        return revoked_at is not None and payload.get("iat", 0) <= revoked_at
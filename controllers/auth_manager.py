@@ -1,6 +1,62 @@
+import os
+import time
+
 import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from controllers.auth_controller import AuthController
 
+# Usuário autenticado da sessão: o token e as informações já verificadas dele
+PRINCIPAL_KEY = 'auth_principal'
+
+# Quantidade de proxies reversos confiáveis na frente do app (variável de ambiente
+# FC_TRUSTED_PROXY_HOPS), que acrescentam o IP do cliente ao X-Forwarded-For. Sem proxy (0),
+# esses cabeçalhos são ignorados: qualquer cliente pode enviá-los com o IP que quiser.
+TRUSTED_PROXY_HOPS = int(os.environ.get("FC_TRUSTED_PROXY_HOPS", "0"))
+
+
+def _principal(token, payload):
+    return {
+        'token': token,
+        'user_id': payload['user_id'],
+        'jti': payload.get('jti'),
+        'iat': payload.get('iat', 0),
+        'exp': payload['exp'],
+    }
+
+def _verified_principal(token):
+    """
+    Retorna o usuário da sessão, verificando a assinatura do token apenas quando necessário.
+
+    Nos reruns comuns, usa o principal guardado no session_state (só a lista de revogação é
+    consultada). O token é decodificado e verificado no primeiro uso (ex.: logo após o login)
+    e, faltando menos de `AuthController.REFRESH_WINDOW` para expirar, é trocado por um novo
+    (renovação deslizante), para que sessões longas não caiam no login no meio da análise.
+    Depois de `AuthController.MAX_SESSION`, a renovação é recusada e a sessão termina quando
+    o token atual expirar.
+    """
+    principal = st.session_state.get(PRINCIPAL_KEY)
+    if principal is None or principal['token'] != token:
+        payload = AuthController.verify_jwt(token)
+        if not payload:
+            return None
+        principal = _principal(token, payload)
+    elif AuthController.is_revoked(principal):
+        return None
+
+    now = time.time()
+    if principal['exp'] - now < AuthController.REFRESH_WINDOW.total_seconds():
+        new_token = AuthController.refresh_jwt(token)
+        if new_token:
+            principal = _principal(new_token, AuthController.verify_jwt(new_token))
+            st.session_state['auth_token'] = new_token
+        elif principal['exp'] <= now:
+            return None
+        # Sem renovação (sessão no limite de MAX_SESSION), o token atual vale até expirar
+
+    st.session_state[PRINCIPAL_KEY] = principal
+    return principal
+
 def is_authenticated():
     """Valida o token JWT e gerencia redirecionamento para login."""
     token = st.session_state.get('auth_token')
@@ -8,14 +64,53 @@ def is_authenticated():
         st.warning("Você precisa fazer login para acessar esta página.")
         return False
 
-    user_data = AuthController.verify_jwt(token)
-    if not user_data:
+    if not _verified_principal(token):
         st.error("Sessão expirada. Faça login novamente.")
         st.session_state.pop('auth_token', None)
+        st.session_state.pop(PRINCIPAL_KEY, None)
         return False
 
     return True
 
+def logout():
+    """Encerra a sessão e revoga o token, que deixa de valer mesmo se reaproveitado."""
+    token = st.session_state.pop('auth_token', None)
+    principal = st.session_state.pop(PRINCIPAL_KEY, None)
+    if principal is not None:
+        AuthController.revoke(principal)
+    elif token:
+        payload = AuthController.verify_jwt(token)
+        if payload:
+            AuthController.revoke(payload)
+
+def _peer_ip(ctx):
+    """Endereço da conexão WebSocket da sessão (o do proxy, se houver um), ou None."""
+    try:
+        return Runtime.instance().get_client(ctx.session_id).request.remote_ip
+    except Exception:
+        return None
+
+def _client_id():
+    """
+    Identifica o cliente para o limite de tentativas de login.
+
+    Os cabeçalhos X-Forwarded-For/X-Real-Ip só são considerados com TRUSTED_PROXY_HOPS > 0:
+    do X-Forwarded-For, vale a entrada acrescentada pelo proxy confiável mais externo (as
+    anteriores vêm do próprio cliente). Sem proxy configurado, usa o IP da conexão e, na
+    falta dele, a sessão do navegador.
+    """
+    ctx = get_script_run_ctx()
+    if TRUSTED_PROXY_HOPS > 0:
+        headers = st.context.headers
+        forwarded = [ip.strip() for ip in headers.get('X-Forwarded-For', '').split(',') if ip.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+        if headers.get('X-Real-Ip'):
+            return headers['X-Real-Ip'].strip()
+    if ctx is None:
+        return None
+    return _peer_ip(ctx) or ctx.session_id
+
 def show_login():
     """Exibe o formulário de login."""
     st.title("Login")
@@ -23,8 +118,16 @@ def show_login():
     password = st.text_input("Senha", type="password")
 
     if st.button("Entrar"):
-        token = AuthController.login(username, password)
-        if token:
+        client = _client_id()
+        wait = AuthController.login_retry_after(username, client)
+        if wait:
+            st.error(f"Muitas tentativas de login. Tente novamente em até {int(wait) // 60 + 1} min.")
+            return
+
+        token = AuthController.login(username, password, client)
+        if token is AuthController.BUSY:
+            st.warning("Servidor ocupado. Tente novamente em alguns segundos.")
+        elif token:
             st.session_state['auth_token'] = token
             st.rerun()
         else:
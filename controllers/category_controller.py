@@ -6,8 +6,8 @@ class CategoryController:
         #self.repo = DataRepository()
         self.repo = CategoryRepository()
 
-    def get_categories(self):
-        return self.repo.load_categories()
+    def get_categories(self, columns=None):
+        return self.repo.load_categories(columns)
 
     def add_category(self, cat_type, cat_name, cat_description):
         return self.repo.save_category(cat_type, cat_name, cat_description)
@@ -8,9 +8,32 @@ class ExpenseController:
         #self.repo = DataRepository()
         self.repo = ExpenseRepository()
 
-    def get_expenses(self):
-        return self.repo.load_expenses()
-    
+    def get_expenses(self, **filters):
+        return self.repo.load_expenses(**filters)
+
+    def iter_expenses(self, chunk_size=10000, as_frames=True, **filters):
+        return self.repo.iter_expenses(chunk_size, as_frames, **filters)
+
+    def export_expenses_csv(self, file, chunk_size=10000, **filters):
+        """
+        Grava as despesas em CSV (caminho ou arquivo aberto) bloco a bloco, com memória
+        limitada a um bloco. Retorna a quantidade de linhas gravadas.
+        """
+        total = 0
+        for chunk in self.repo.iter_expenses(chunk_size, True, **filters):
+            chunk.to_csv(file, mode='a' if total else 'w', header=not total, index=False, date_format='%Y-%m-%d')
+            total += len(chunk)
+        return total
+
+    def get_expenses_page(self, page_size=50, key=None, direction="older", **filters):
+        return self.repo.load_expenses_page(page_size, key, direction, **filters)
+
+    def search_expenses(self, text, limit=20, columns=None):
+        return self.repo.search_expenses(text, limit, columns)
+
+    def count_expenses(self, search=None):
+        return self.repo.count_expenses(search)
+
     def add_expense(self, expense: Expense):
         # Valida se o objeto Expense foi completamente preenchido
         if not expense.is_complete():
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import deque
+
+
+class LoginThrottle:
+    """
+    Limite de tentativas de login por chave (nome de usuário ou cliente), em janela deslizante.
+
+    Cada tentativa é registrada *antes* da verificação da senha e só é descartada se o login
+    der certo, de modo que uma rajada de tentativas simultâneas também esbarra no limite sem
+    chegar ao bcrypt. Esgotado o limite, a chave fica bloqueada até a tentativa mais antiga
+    sair da janela.
+    """
+
+    # Acima disso, as chaves sem tentativas na janela são descartadas a cada registro
+    MAX_KEYS = 10000
+
+    def __init__(self, max_attempts, window):
+        """
+        Args:
+            max_attempts (int): Tentativas permitidas dentro da janela.
+            window (timedelta): Tamanho da janela deslizante.
+        """
+        self.max_attempts = max_attempts
+        self.window = window.total_seconds()
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+            return None
+        return attempts
+
+    def _prune(self, now):
+        for key in list(self._attempts):
+            self._recent(key, now)
+
+    def retry_after(self, key):
+        """Segundos até a chave poder tentar de novo (0 se não estiver bloqueada)."""
+        now = time.time()
+        with self._lock:
+            attempts = self._recent(key, now)
+            if attempts is None or len(attempts) < self.max_attempts:
+                return 0
+            return attempts[0] + self.window - now
+
+    def hit(self, key):
+        """
+        Registra uma tentativa para `key`.
+
+        Returns:
+            float: 0 se a tentativa foi registrada; senão, os segundos de espera restantes
+                (a tentativa é recusada e não conta).
+        """
+        now = time.time()
+        with self._lock:
+            attempts = self._recent(key, now)
+            if attempts is not None and len(attempts) >= self.max_attempts:
+                return attempts[0] + self.window - now
+            if attempts is None:
+                if len(self._attempts) >= self.MAX_KEYS:
+                    self._prune(now)
+                attempts = self._attempts[key] = deque()
+            attempts.append(now)
+            return 0
+
+    def undo(self, key):
+        """Descarta a tentativa mais recente de `key` (que não deve contar, ex.: login aceito)."""
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts:
+                attempts.pop()
+                if not attempts:
+                    del self._attempts[key]
+
+    def reset(self, key):
+        """Zera as tentativas de `key`."""
+        with self._lock:
+            self._attempts.pop(key, None)
@@ -6,8 +6,8 @@ class PaymentController:
         #self.repo = DataRepository()
         self.repo = PaymentRepository()
 
-    def get_payments(self):
-        return self.repo.load_payments()
+    def get_payments(self, columns=None):
+        return self.repo.load_payments(columns)
 
     def add_payment(self, pay_name, pay_description):
         return self.repo.save_payment(pay_name, pay_description)
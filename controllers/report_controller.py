@@ -0,0 +1,21 @@
+from repositories.report_repository import ReportRepository
+
+
+class ReportController:
+    def __init__(self):
+        self.repo = ReportRepository()
+
+    def get_monthly_by_payment_kind(self, data_inicio, data_fim, cash_only=False):
+        return self.repo.monthly_by_payment_kind(data_inicio, data_fim, cash_only)
+
+    def get_monthly_by_type(self, data_inicio, data_fim, cash_only=False):
+        return self.repo.monthly_by_type(data_inicio, data_fim, cash_only)
+
+    def get_by_category_payment_kind(self, data_inicio, data_fim, cash_only=False):
+        return self.repo.by_category_payment_kind(data_inicio, data_fim, cash_only)
+
+    def get_daily_by_type(self, data_inicio, data_fim, cash_only=False):
+        return self.repo.daily_by_type(data_inicio, data_fim, cash_only)
+
+    def get_credit_installments_by_month(self, data_inicio, data_fim):
+        return self.repo.credit_installments_by_month(data_inicio, data_fim)
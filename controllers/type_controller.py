@@ -6,8 +6,8 @@ class TypeController:
         #self.repo = DataRepository()
         self.repo = TypeRepository()
 
-    def get_types(self):
-        return self.repo.load_types()
+    def get_types(self, columns=None):
+        return self.repo.load_types(columns)
 
     def add_type(self, type_type, type_name, type_description, type_cat_id):
         return self.repo.save_type(type_type, type_name, type_description, type_cat_id)
@@ -1,4 +1,6 @@
-# 
+from utils.money import from_cents, to_cents
+
+
 class Expense:
     def __init__(self, exp_id: int = None, exp_date: str = None, exp_value: float = None, exp_description: str = None,
                  exp_type_id: int = None, exp_pay_id: int = None, exp_number_of_installments: int = 0,
@@ -13,6 +15,24 @@ class Expense:
         self.exp_final_date_of_installment = exp_final_date_of_installment
         self.exp_value_total_installments = exp_value_total_installments
 
+    # Os valores são guardados em centavos inteiros (como no banco); exp_value e
+    # exp_value_total_installments são vistas em reais, convertidas na leitura e na escrita
+    @property
+    def exp_value(self):
+        return from_cents(self.exp_value_cents)
+
+    @exp_value.setter
+    def exp_value(self, value):
+        self.exp_value_cents = to_cents(value)
+
+    @property
+    def exp_value_total_installments(self):
+        return from_cents(self.exp_value_total_installments_cents)
+
+    @exp_value_total_installments.setter
+    def exp_value_total_installments(self, value):
+        self.exp_value_total_installments_cents = to_cents(value)
+
     def __repr__(self):
         return (f"Expense(id={self.exp_id}, date='{self.exp_date}', value={self.exp_value}, "
                 f"description='{self.exp_description}', type_id={self.exp_type_id}, "
@@ -1,18 +1,62 @@
-from passlib.hash import bcrypt
+import os
+import secrets
+
+import bcrypt
 
 class User:
+    # Fator de custo do bcrypt (variável de ambiente FC_BCRYPT_ROUNDS). Senhas guardadas com
+    # custo menor são regravadas no próximo login aceito (ver `AuthController.login`).
+    BCRYPT_ROUNDS = int(os.environ.get("FC_BCRYPT_ROUNDS", "12"))
+
+    # Hash de uma senha aleatória, usado por `verify_dummy` (gerado no primeiro uso)
+    _dummy_hash = None
+
     def __init__(self, username, password_hash, user_id=None):
         self.user_id = user_id
         self.username = username
         self.password_hash = password_hash
 
     @staticmethod
-    def hash_password(password):
-        return bcrypt.hash(password)
+    def _encode(password):
+        # O bcrypt só considera os 72 primeiros bytes; versões novas do pacote recusam senhas
+        # maiores em vez de truncá-las, o que invalidaria hashes já gravados
+        return password.encode('utf-8')[:72]
+
+    @staticmethod
+    def hash_password(password, rounds=None):
+        """Gera o hash bcrypt da senha; `rounds` é o fator de custo (padrão: BCRYPT_ROUNDS)."""
+        salt = bcrypt.gensalt(rounds or User.BCRYPT_ROUNDS)
+        return bcrypt.hashpw(User._encode(password), salt).decode('utf-8')
 
     @staticmethod
     def verify_password(password, password_hash):
-        return bcrypt.verify(password, password_hash)
+        try:
+            return bcrypt.checkpw(User._encode(password), password_hash.encode('utf-8'))
+        except ValueError:
+            return False  # Hash inválido
+
+    @staticmethod
+    def verify_dummy(password):
+        """
+        Verifica `password` contra um hash descartável com o custo BCRYPT_ROUNDS e retorna
+        False. Usado para nomes de usuário inexistentes: a recusa leva o mesmo tempo de uma
+        senha errada e não revela quais nomes existem.
+        """
+        if User._dummy_hash is None:
+            User._dummy_hash = User.hash_password(secrets.token_urlsafe(16))
+        User.verify_password(password, User._dummy_hash)
+        return False
+
+    @staticmethod
+    def needs_rehash(password_hash, rounds=None):
+        """
+        Indica se o hash foi gerado com custo menor que `rounds` ($2b$<custo>$...). Hashes de
+        custo maior são mantidos: reduzir BCRYPT_ROUNDS não enfraquece senhas já gravadas.
+        """
+        try:
+            return int(password_hash.split('$')[2]) < (rounds or User.BCRYPT_ROUNDS)
+        except (AttributeError, IndexError, ValueError):
+            return True
 
     def __repr__(self):
         return f"User(id={self.user_id}, name='{self.username}')"
\ No newline at end of file
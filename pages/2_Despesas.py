@@ -1,5 +1,5 @@
 import streamlit as st
-from controllers.auth_manager import is_authenticated, show_login
+from controllers.auth_manager import is_authenticated, logout, show_login
 #from controllers.auth_middleware import is_authenticated
 from controllers.category_controller import CategoryController
 from controllers.type_controller import TypeController
@@ -7,8 +7,8 @@ from controllers.expense_controller import ExpenseController
 from controllers.payment_controller import PaymentController
 from models.expense import Expense
 import numpy as np
-from datetime import timedelta, datetime
-import pandas as pd
+from datetime import timedelta
+from utils.money import format_brl, from_cents, parse_brl, to_cents
 
 st.set_page_config(
     page_title="Despesas",
@@ -26,7 +26,7 @@ def main():
     if not is_authenticated():
         show_login()
         return  # Impede que o restante da página seja carregado
-    st.sidebar.button("Sair", on_click=lambda: st.session_state.pop('auth_token', None), use_container_width=True, type="primary")
+    st.sidebar.button("Sair", on_click=logout, use_container_width=True, type="primary")
 
 
     def format_to_float(br_value):
@@ -38,9 +38,7 @@ def main():
             st.warning("O campo de valor não pode estar em branco.")
             return None
         try:
-            # Remover "R$", pontos e substituir vírgula por ponto
-            br_value = br_value.replace("R$", "").replace(".", "").replace(",", ".").strip()
-            value = float(br_value)
+            value = parse_brl(br_value)
             if value < 0:
                 st.warning("O valor não pode ser negativo.")
                 return None
@@ -49,12 +47,74 @@ def main():
             st.warning("Por favor, insira um valor válido.")
             return None
 
-    def float_to_brazilian_currency(value):
+    columns = ["exp_id","exp_date", "type_name", "exp_description", "pay_name", "exp_value", "exp_number_of_installments", 
+            "exp_value_total_installment", "exp_final_date_of_installment"]
+
+    # Quantidade máxima de despesas listadas pela busca dos diálogos de alteração e exclusão
+    SELECT_SEARCH_LIMIT = 50
+
+    def prepare_expenses(expenses_df):
+        """Renomeia as colunas das despesas para exibição e formata os valores em reais."""
+        expenses_df_renamed = expenses_df.reindex(columns=columns).rename(
+            columns={
+                "exp_date":"Data",
+                "exp_value": "Valor",
+                "exp_description": "Descrição",
+                "type_name": "Tipo",
+                "pay_name": "Pagamento",
+                "exp_number_of_installments": "Quantidade de parcelas",
+                "exp_value_total_installment": "Valor total das parcelas",
+                "exp_final_date_of_installment": "Última parcela"
+                }
+        )
+        expenses_df_renamed['Valor'] = expenses_df_renamed['Valor'].map(format_brl)
+        expenses_df_renamed['Valor total das parcelas'] = expenses_df_renamed['Valor total das parcelas'].map(format_brl)
+        return expenses_df_renamed
+
+    def select_expense(config):
         """
-        Converte um float para uma string em formato monetário brasileiro.
-        Exemplo: 1234.56 -> 'R$ 1.234,56'
+        Seleção da despesa nos diálogos de alteração e exclusão. Sem busca, lista apenas as
+        despesas da página exibida; com busca, as mais relevantes de todo o histórico (índice
+        FTS5), para alcançar despesas de outras páginas. Retorna a linha escolhida ou None.
         """
-        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        search = st.text_input("Buscar despesa:", placeholder="Descrição (vazio: despesas da página atual)")
+        if search.strip():
+            expenses_df = prepare_expenses(
+                config['controller'].search_expenses(search, limit=SELECT_SEARCH_LIMIT, columns=columns)
+            )
+            if len(expenses_df) == SELECT_SEARCH_LIMIT:
+                st.caption(f"Exibindo as {SELECT_SEARCH_LIMIT} despesas mais relevantes. Refine a busca se necessário.")
+        else:
+            expenses_df = config['expenses_df_renamed']
+            st.caption("Exibindo as despesas da página atual. Use a busca para encontrar as demais.")
+
+        if expenses_df.empty:
+            st.warning("Nenhuma despesa encontrada.")
+            return None
+
+        # Create a unique identifier combining description, date, and value
+        expenses_df = expenses_df.assign(Identifier=expenses_df.apply(
+            lambda row: f"{row['Descrição']} - {row['Data'].strftime('%d/%m/%Y')} - {row['Valor']}", axis=1
+        ))
+
+        # Sort and add a placeholder option
+        expenses = np.sort(expenses_df['Identifier'].unique())
+        expenses = np.insert(expenses, 0, "Selecione a despesa")
+
+        # Display the select box with unique identifiers
+        expense_selected = st.selectbox("Despesa", expenses, index=0)
+        if expense_selected == "Selecione a despesa":
+            st.warning("Por favor, selecione uma despesa válida.")
+            return None
+
+        # Find the exact entry by matching the identifier
+        expense_data = expenses_df[expenses_df['Identifier'] == expense_selected]
+        if expense_data.empty:
+            st.error("Despesa não encontrada.")
+            return None
+
+        # Use the first matched row if there are still duplicates
+        return expense_data.iloc[0]
 
     # @st.cache_data
     # def get_expense():
@@ -118,9 +178,7 @@ def main():
                         exp_description=str(description)
                     )
                     if config['controller'].add_expense(objExpense):
-                        st.session_state.update({'expense_updated': True, 'expense_in_memorie': True})
-                        st.cache_data.clear()  # Limpa todos os caches   
-                        st.cache_resource()                                      
+                        st.session_state['expense_updated'] = True
                         st.rerun()                
                 else:
                     st.warning('Campo "Descrição" obrigatório!')
@@ -136,7 +194,8 @@ def main():
                 if description:
                     #exp_final_date_of_installments = date + timedelta(days=30 * (number_of_installments - 1))
                     exp_final_date_of_installments = date + timedelta(days=30 * number_of_installments)
-                    exp_value_total_installments = value * number_of_installments
+                    # Total em centavos: exatamente n vezes a parcela, sem erro de float
+                    exp_value_total_installments = from_cents(to_cents(value) * int(number_of_installments))
                     objExpense = Expense(
                         exp_type_id=type_id,
                         exp_date=date.strftime("%Y-%m-%d"),
@@ -148,9 +207,7 @@ def main():
                         exp_value_total_installments=exp_value_total_installments
                     )
                     if config['controller'].add_expense(objExpense):
-                        st.session_state.update({'expense_updated': True, 'expense_in_memorie': True})
-                        st.cache_data.clear()  # Limpa todos os caches   
-                        st.cache_resource()                         
+                        st.session_state['expense_updated'] = True
                         st.rerun()                
                 else:
                     st.warning('Campo "Descrição" obrigatório!')
@@ -159,49 +216,41 @@ def main():
     def read(config):
         #implementar filtros por:
         #data, tipo de pagamento, tipo de despesa, range de valor...
-        expenses = sorted(config['expenses_df_renamed']['Descrição'].unique())
-        expense = st.multiselect("Despesa", expenses, placeholder='')
+        # Busca no índice FTS5: cada palavra vale como prefixo ("merc" encontra "Mercado")
+        search = st.text_input("Buscar na descrição", value=st.session_state['expense_search'], placeholder='Ex.: merc')
 
-        mask = (
-            config['expenses_df_renamed']['Descrição'].isin(expense)
-        )
+        if search.strip():
+            matches_df = config['controller'].search_expenses(
+                search, limit=10, columns=["exp_date", "exp_description", "exp_value"]
+            )
+            if matches_df.empty:
+                st.caption("Nenhuma despesa encontrada.")
+            else:
+                st.caption(f"{config['controller'].count_expenses(search)} despesa(s) encontrada(s). Mais relevantes:")
+                matches_df['exp_value'] = matches_df['exp_value'].map(format_brl)
+                st.dataframe(
+                    matches_df.rename(columns={"exp_date": "Data", "exp_description": "Descrição", "exp_value": "Valor"}),
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={"Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY")}
+                )
 
-        df_filtred = config['expenses_df_renamed'][mask]
         col1, col2, col3 = st.columns(3)
         if col2.button("Filtrar", use_container_width=True):        
-            if expense:
+            if search.strip():
                 st.session_state['expense_updated'] = True
-                st.session_state['expense'] = df_filtred       
+                st.session_state['expense_search'] = search.strip()
+                st.session_state['expense_page'] = {'key': None, 'direction': 'older'}
                 st.rerun()
             else:
-                st.warning('Escolha ao menos uma despesa!')
+                st.warning('Informe ao menos uma palavra!')
 
     @st.dialog("Alterar despesa", width="large")     
     def update(config):
-        # Create a unique identifier combining description, date, and value
-        config['expenses_df_renamed']['Identifier'] = config['expenses_df_renamed'].apply(
-            lambda row: f"{row['Descrição']} - {pd.to_datetime(row['Data']).strftime('%d/%m/%Y')} - {row['Valor']}", axis=1
-        )
-
-        # Sort and add a placeholder option
-        expenses = np.sort(config['expenses_df_renamed']['Identifier'].unique())
-        expenses = np.insert(expenses, 0, "Selecione a despesa")
-
-        # Display the select box with unique identifiers
-        expense_selected = st.selectbox("Despesa", expenses, index=0)
-        if expense_selected == "Selecione a despesa":
-            st.warning("Por favor, selecione uma despesa válida.")
+        expense_data = select_expense(config)
+        if expense_data is None:
             return
 
-        # Find the exact entry by matching the identifier
-        expense_data = config['expenses_df_renamed'][config['expenses_df_renamed']['Identifier'] == expense_selected]
-        if expense_data.empty:
-            st.error("Despesa não encontrada.")
-            return
-
-        # Use the first matched row if there are still duplicates
-        expense_data = expense_data.iloc[0]
-
         def get_payment_selection():
             payments = np.sort(config['payments_df']['pay_name'].unique())
             payments = np.insert(payments, 0, expense_data["Pagamento"])
@@ -238,7 +287,7 @@ def main():
 
         col1, col2, col3 = st.columns(3)
 
-        obj_date = datetime.strptime(expense_data['Data'], "%Y-%m-%d").date()
+        obj_date = expense_data['Data'].date()
         obj_date = col1.date_input("Data:", value=obj_date, format="DD/MM/YYYY")
 
         description = st.text_input("Descrição:", value=expense_data["Descrição"])
@@ -253,7 +302,8 @@ def main():
             if st.button("Alterar", use_container_width=True, type="primary"):  
                 if description:
                     exp_final_date_of_installments = obj_date + timedelta(days=30 * (number_of_installments - 1))
-                    exp_value_total_installments = value * number_of_installments
+                    # Total em centavos: exatamente n vezes a parcela, sem erro de float
+                    exp_value_total_installments = from_cents(to_cents(value) * int(number_of_installments))
                     objExpense = Expense(
                         exp_id=expense_data['exp_id'],
                         exp_type_id=type_id,
@@ -266,9 +316,7 @@ def main():
                         exp_value_total_installments=exp_value_total_installments
                     )
                     if config['controller'].update_expense(objExpense):
-                        st.session_state.update({'expense_updated': True, 'expense_in_memorie': True})
-                        st.cache_data.clear()  # Limpa todos os caches   
-                        st.cache_resource()                                 
+                        st.session_state['expense_updated'] = True
                         st.rerun()                
                 else:
                     st.warning('Campo "Descrição" obrigatório!')
@@ -289,38 +337,16 @@ def main():
                         exp_description=str(description)
                     )
                     if config['controller'].update_expense(objExpense):
-                        st.session_state.update({'expense_updated': True, 'expense_in_memorie': True}) 
-                        st.cache_data.clear()  # Limpa todos os caches   
-                        st.cache_resource()                                
+                        st.session_state['expense_updated'] = True
                         st.rerun()                
                 else:
                     st.warning('Campo "Descrição" obrigatório!')
             
     @st.dialog("Excluir despesa", width="large")     
     def delete(config):
-        # Create a unique identifier combining description, date, and value
-        config['expenses_df_renamed']['Identifier'] = config['expenses_df_renamed'].apply(
-            lambda row: f"{row['Descrição']} - {pd.to_datetime(row['Data']).strftime('%d/%m/%Y')} - {row['Valor']}", axis=1
-        )
-
-        # Sort and add a placeholder option
-        expenses = np.sort(config['expenses_df_renamed']['Identifier'].unique())
-        expenses = np.insert(expenses, 0, "Selecione a despesa")
-
-        # Display the select box with unique identifiers
-        expense_selected = st.selectbox("Despesa", expenses, index=0)
-        if expense_selected == "Selecione a despesa":
-            st.warning("Por favor, selecione uma despesa válida.")
+        expense_data = select_expense(config)
+        if expense_data is None:
             return
-
-        # Find the exact entry by matching the identifier
-        expense_data = config['expenses_df_renamed'][config['expenses_df_renamed']['Identifier'] == expense_selected]
-        if expense_data.empty:
-            st.error("Despesa não encontrada.")
-            return
-
-        # Use the first matched row if there are still duplicates
-        expense_data = expense_data.iloc[0]
             
         st.text_input("Pagamento:", value=expense_data["Pagamento"], disabled=True)
 
@@ -328,7 +354,7 @@ def main():
 
         col1, col2, col3 = st.columns(3)
 
-        obj_date = datetime.strptime(expense_data['Data'], "%Y-%m-%d").date()
+        obj_date = expense_data['Data'].date()
         obj_date = col1.date_input("Data:", value=obj_date, format="DD/MM/YYYY", disabled=True)
 
         st.text_input("Descrição:", value=expense_data["Descrição"], disabled=True)
@@ -362,11 +388,7 @@ def main():
                     st.session_state.confirm_delete_expense = False  # Resetar o estado de confirmação
                     result = config['controller'].delete_expense(expense_data['exp_id'])            
                     if result:
-                        st.session_state.update({'expense_updated': True, 'expense_in_memorie': True})
-                        st.cache_data.clear()  # Limpa todos os caches   
-                        st.cache_resource()                         
-                        #st.session_state['expense_updated'] = True
-                        #st.session_state['expense_in_memorie'] = True        
+                        st.session_state['expense_updated'] = True
                         st.rerun()
             
             with col2:
@@ -418,32 +440,48 @@ def main():
                     st.switch_page("pages/7_Pagamentos.py")
                 return   
 
-        columns = ["exp_id","exp_date", "type_name", "exp_description", "pay_name", "exp_value", "exp_number_of_installments", 
-                "exp_value_total_installment", "exp_final_date_of_installment"]
-        
         controller = ExpenseController()
-        expenses_df = controller.get_expenses()
 
-        #expenses_df = get_expense()
+        # Paginação keyset sobre (exp_date, exp_id): a página atual é identificada pela chave de
+        # referência e pela direção (ver ExpenseRepository.load_expenses_page)
+        if 'expense_page' not in st.session_state:
+            st.session_state['expense_page'] = {'key': None, 'direction': 'older'}
+        if 'expense_search' not in st.session_state:
+            st.session_state['expense_search'] = ""
+
+        def go_to(key=None, direction='older'):
+            st.session_state['expense_page'] = {'key': key, 'direction': direction}
+
+        def go_to_date():
+            jump_date = st.session_state['expense_jump_date']
+            go_to((jump_date.isoformat(), None) if jump_date else None)
 
         try:
-            expenses_df_renamed = expenses_df[columns].rename(
-                columns={
-                    "exp_date":"Data",
-                    "exp_value": "Valor",
-                    "exp_description": "Descrição",
-                    "type_name": "Tipo",
-                    "pay_name": "Pagamento",
-                    "exp_number_of_installments": "Quantidade de parcelas",
-                    "exp_value_total_installment": "Valor total das parcelas",
-                    "exp_final_date_of_installment": "Última parcela"
-                    }
-            ).sort_values(by="Data", ascending=False)
             st.subheader("Despesas")
 
-            # Aplicando a formatação nas colunas 'Valor, 'Valor da parcela' e Parcelada
-            expenses_df_renamed['Valor'] = expenses_df_renamed['Valor'].apply(float_to_brazilian_currency)
-            expenses_df_renamed['Valor total das parcelas'] = expenses_df_renamed['Valor total das parcelas'].apply(float_to_brazilian_currency)
+            total_expenses = controller.count_expenses()
+            filtered_expenses = controller.count_expenses(st.session_state['expense_search'])
+
+            col1, col2 = st.columns(2)
+            page_size = col1.selectbox("Despesas por página:", [25, 50, 100, 200], index=1, key='expense_page_size',
+                                       on_change=go_to)
+            col2.date_input("Ir para a data:", value=None, format="DD/MM/YYYY", key='expense_jump_date',
+                            on_change=go_to_date)
+
+            expenses_df, has_newer, has_older = controller.get_expenses_page(
+                page_size,
+                st.session_state['expense_page']['key'],
+                st.session_state['expense_page']['direction'],
+                columns=columns,
+                search=st.session_state['expense_search']
+            )
+            # Página vazia após exclusões: volta para a primeira página
+            if expenses_df.empty and filtered_expenses > 0 and st.session_state['expense_page']['key'] is not None:
+                go_to()
+                st.rerun()
+
+            # Formatação dos valores apenas da página exibida
+            expenses_df_renamed = prepare_expenses(expenses_df)
 
             config = {
                     'controller': controller,
@@ -452,7 +490,7 @@ def main():
                     'types_df': types_df
                     }
             col1, col2, col3, col4 = st.columns(4)
-            if not expenses_df.empty:
+            if total_expenses > 0:
                 try:
                     if col1.button("Incluir despesa", use_container_width=True):
                         create(config)
@@ -476,49 +514,20 @@ def main():
                         delete(config)
                 except Exception as e:
                     st.error(f"Erro ao acessar o dataframe: {e}")   
-            
-            #F5 and read()
-            if 'expense' not in st.session_state:
-                st.session_state['expense'] = expenses_df_renamed
 
             if 'expense_updated' not in st.session_state:
                 st.session_state['expense_updated'] = False
 
-            #Atualiza a tela se Categoria foi excluída ou alterada
-            if 'page_expense_category_updated' not in st.session_state:
-                st.session_state['page_expense_category_updated'] = False
-            if st.session_state['page_expense_category_updated']:
-                st.session_state['expense'] = expenses_df_renamed
-                st.session_state['page_expense_category_updated'] = False
-
-            #Atualiza a tela se Tipo foi excluído ou alterado
-            if 'page_expense_type_updated' not in st.session_state:
-                st.session_state['page_expense_type_updated'] = False
-            if st.session_state['page_expense_type_updated']:
-                st.session_state['expense'] = expenses_df_renamed
-                st.session_state['page_expense_type_updated'] = False
-            
-            #Atualiza tela se Pagamento foi excluído ou alterado
-            if 'page_expense_payment_updated' not in st.session_state:
-                st.session_state['page_expense_payment_updated'] = False
-            if st.session_state['page_expense_payment_updated']:
-                st.session_state['expense'] = expenses_df_renamed
-                st.session_state['page_expense_payment_updated'] = False
-
-            #Atualiza a tela se Despesa foi inserida, alterada ou excluida
+            #Atualiza a tela se Despesa foi inserida, alterada, excluida ou filtrada
             if st.session_state['expense_updated']:        
                 st.success("Operação realizada com sucesso!")
                 st.session_state['expense_updated'] = False        
-                if 'expense_in_memorie' not in st.session_state:
-                    st.session_state['expense_in_memorie'] = False
-                if st.session_state['expense_in_memorie']:
-                    st.session_state['expense'] = expenses_df_renamed
-                    st.session_state['expense_in_memorie'] = False
-            if st.session_state["expense"].empty:
+
+            if expenses_df_renamed.empty:
                 st.write("Nenhum dado disponível.")
             else:        
                 st.dataframe(
-                    st.session_state['expense'], 
+                    expenses_df_renamed, 
                     hide_index=True, 
                     use_container_width=True, 
                     column_config={
@@ -530,9 +539,23 @@ def main():
                         "Quantidade de parcelas": st.column_config.TextColumn("Quantidade de parcelas")
                     }
                 )
-            
+
+                # Navegação: chaves da primeira e da última linha da página
+                first_key = (expenses_df['exp_date'].iloc[0].date().isoformat(), int(expenses_df['exp_id'].iloc[0]))
+                last_key = (expenses_df['exp_date'].iloc[-1].date().isoformat(), int(expenses_df['exp_id'].iloc[-1]))
+                col1, col2, col3 = st.columns([1, 2, 1])
+                col1.button("Anterior", use_container_width=True, disabled=not has_newer,
+                            on_click=go_to, args=(first_key, 'newer'))
+                col2.caption(
+                    f"{len(expenses_df_renamed)} de {filtered_expenses} despesas"
+                    + (f" com “{st.session_state['expense_search']}” (de {total_expenses})" if st.session_state['expense_search'] else "")
+                )
+                col3.button("Próxima", use_container_width=True, disabled=not has_older,
+                            on_click=go_to, args=(last_key, 'older'))
+
             if st.button("Recarregar", use_container_width=True):
-                st.session_state['expense'] = expenses_df_renamed        
+                st.session_state['expense_search'] = ""
+                go_to()
                 st.rerun() 
         except Exception as e:
             print("Error",e)
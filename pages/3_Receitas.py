@@ -1,5 +1,5 @@
 import streamlit as st
-from controllers.auth_manager import is_authenticated, show_login
+from controllers.auth_manager import is_authenticated, logout, show_login
 import locale
 import warnings
 
@@ -21,7 +21,7 @@ def main():
     if not is_authenticated():
         show_login()
         return  # Impede que o restante da página seja carregado
-    st.sidebar.button("Sair", on_click=lambda: st.session_state.pop('auth_token', None),use_container_width=True, type="primary")
+    st.sidebar.button("Sair", on_click=logout, use_container_width=True, type="primary")
     st.title("Receitas")
     st.write("Bem-vindo! Aqui você pode gerenciar seus investimentos.")
 
@@ -1,5 +1,5 @@
 import streamlit as st
-from controllers.auth_manager import is_authenticated, show_login
+from controllers.auth_manager import is_authenticated, logout, show_login
 #from controllers.auth_middleware import is_authenticated
 import numpy as np
 from controllers.category_controller import CategoryController
@@ -21,7 +21,7 @@ def main():
     if not is_authenticated():
         show_login()
         return  # Impede que o restante da página seja carregado
-    st.sidebar.button("Sair", on_click=lambda: st.session_state.pop('auth_token', None), use_container_width=True, type="primary")
+    st.sidebar.button("Sair", on_click=logout, use_container_width=True, type="primary")
 
     def menu(config):
         col1, col2, col3, col4 = st.columns(4)
@@ -67,8 +67,6 @@ def main():
                     # st.session_state[categories_updated] = True
                     # categories_in_memorie = config['type'] + '_categories_in_memorie'
                     # st.session_state[categories_in_memorie] = True
-                    st.cache_data.clear()  # Limpa todos os caches   
-                    st.cache_resource()                                                                     
                     st.rerun()                
             else:
                 st.warning('Campo "Nome" obrigatório!')
@@ -165,8 +163,6 @@ def main():
 
                         # category_deleted = config['type'] + '_category_deleted'
                         # st.session_state[category_deleted] = True       
-                        st.cache_data.clear()  # Limpa todos os caches   
-                        st.cache_resource()                                
                         st.rerun()  # Recarrega a página para refletir as mudanças 
             
             with col2:
@@ -230,8 +226,6 @@ def main():
                     
                     # categories_in_memorie = config['type'] + '_categories_in_memorie'
                     # st.session_state[categories_in_memorie] = True  
-                    st.cache_data.clear()  # Limpa todos os caches   
-                    st.cache_resource()                 
                     st.rerun()  # Recarrega a página para refletir as mudanças
 
     def category_view():    
@@ -275,7 +269,6 @@ def main():
                 if st.session_state['expense_category_updated']:       
                     st.success("Operação realizada com sucesso!")
                     st.session_state['expense_category_updated'] = False 
-                    st.session_state['page_expense_category_updated'] = True #Controle de atualização na tela de Despesas
                     st.session_state['page_type_category_expense_updated'] = True #Controle de atualização na tela de Tipos/Despesas      
                     if 'expense_category_in_memorie' not in st.session_state:
                         st.session_state['expense_category_in_memorie'] = False
@@ -1,5 +1,5 @@
 import streamlit as st
-from controllers.auth_manager import is_authenticated, show_login
+from controllers.auth_manager import is_authenticated, logout, show_login
 #from controllers.auth_middleware import is_authenticated
 import numpy as np
 from controllers.type_controller import TypeController
@@ -21,7 +21,7 @@ def main():
     if not is_authenticated():
         show_login()
         return  # Impede que o restante da página seja carregado
-    st.sidebar.button("Sair", on_click=lambda: st.session_state.pop('auth_token', None), use_container_width=True, type="primary")
+    st.sidebar.button("Sair", on_click=logout, use_container_width=True, type="primary")
 
     def menu(config):
             col1, col2, col3, col4 = st.columns(4)
@@ -89,8 +89,6 @@ def main():
                     # st.session_state[types_updated] = True
                     # types_in_memorie = config['type'] + '_types_in_memorie'
                     # st.session_state[types_in_memorie] = True
-                    st.cache_data.clear()  # Limpa todos os caches   
-                    st.cache_resource()                                  
                     st.rerun()                
             else:
                 st.warning('Campo "Nome" obrigatório!')
@@ -199,8 +197,6 @@ def main():
                     # st.session_state[types_updated] = True
                     # types_in_memorie = config['type'] + '_types_in_memorie'
                     # st.session_state[types_in_memorie] = True
-                    st.cache_data.clear()  # Limpa todos os caches   
-                    st.cache_resource()           
                     st.rerun()  # Recarrega a página para refletir as mudanças
 
     @st.dialog("Excluir tipo")
@@ -264,8 +260,6 @@ def main():
 
                         # type_deleted = config['type'] + '_type_deleted' #Usado onde?
                         # st.session_state[type_deleted] = True     
-                        st.cache_data.clear()  # Limpa todos os caches   
-                        st.cache_resource()     
                         st.rerun()  # Recarrega a página para refletir as mudanças 
             
             with col2:
@@ -370,7 +364,6 @@ def main():
                     if st.session_state['expense_type_updated']: 
                         st.success("Operação realizada com sucesso!")
                         st.session_state['expense_type_updated'] = False
-                        st.session_state['page_expense_type_updated'] = True #Controle de atualização na tela de Despesas        
                         if 'expense_type_in_memorie' not in st.session_state:
                             st.session_state['expense_type_in_memorie'] = False
                         if st.session_state['expense_type_in_memorie']:
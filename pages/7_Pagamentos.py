@@ -1,5 +1,5 @@
 import streamlit as st
-from controllers.auth_manager import is_authenticated, show_login
+from controllers.auth_manager import is_authenticated, logout, show_login
 #from controllers.auth_middleware import is_authenticated
 import numpy as np
 from controllers.payment_controller import PaymentController
@@ -20,7 +20,7 @@ def main():
     if not is_authenticated():
         show_login()
         return  # Impede que o restante da página seja carregado
-    st.sidebar.button("Sair", on_click=lambda: st.session_state.pop('auth_token', None), use_container_width=True, type="primary")
+    st.sidebar.button("Sair", on_click=logout, use_container_width=True, type="primary")
 
         
     @st.dialog("Cadastrar pagamento")
@@ -36,8 +36,6 @@ def main():
                 if result: 
                     st.session_state['payment_updated'] = True
                     st.session_state['payment_in_memorie'] = True    
-                    st.cache_data.clear()  # Limpa todos os caches   
-                    st.cache_resource()                              
                     st.rerun()                
             else:
                 st.warning('Campo "Nome" obrigatório!')
@@ -96,8 +94,6 @@ def main():
                     st.session_state['expense_payment_updated'] = True #usado tela Despesas
                     st.session_state['payment_updated'] = True
                     st.session_state['payment_in_memorie'] = True  
-                    st.cache_data.clear()  # Limpa todos os caches   
-                    st.cache_resource()                 
                     st.rerun()
 
     @st.dialog("Excluir pagamento")
@@ -145,8 +141,6 @@ def main():
                         st.session_state['expense_payment_deleted'] = True #Page Despesas                        
                         st.session_state['payment_updated'] = True
                         st.session_state['payment_in_memorie'] = True   
-                        st.cache_data.clear()  # Limpa todos os caches   
-                        st.cache_resource()        
                         st.rerun() 
             
             with col2:
@@ -206,7 +200,6 @@ def main():
             if st.session_state['payment_updated']:        
                 st.success("Operação realizada com sucesso!")
                 st.session_state['payment_updated'] = False
-                st.session_state['page_expense_payment_updated'] = True #Controle de atualização na tela de Despesas       
                 if 'payment_in_memorie' not in st.session_state:
                     st.session_state['payment_in_memorie'] = False
                 if st.session_state['payment_in_memorie']:
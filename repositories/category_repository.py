@@ -1,19 +1,22 @@
+import sqlite3
 from repositories.database_repository import DataManager
 import pandas as pd
 import streamlit as st
 
 class CategoryRepository:
     @staticmethod
-    def load_categories():
+    def load_categories(columns=None):
+        """
+        Carrega as categorias. `columns` restringe a projeção a colunas cat_*; os tipos
+        retornados são compactos (ver `DataManager.read_dataframe`).
+        """
         try:
-            conn = DataManager.get_connection()
-            
-            query = "SELECT * FROM category;"
-            payments_df = pd.read_sql_query(query, conn)
-            
-            conn.close()
-            
-            return payments_df
+            with DataManager.connection() as conn:
+                select = ", ".join(DataManager.qualify_columns(columns, {'cat_': 'c'})) if columns else "*"
+                query = f"SELECT {select} FROM category c;"
+                payments_df = DataManager.read_dataframe(conn, query)
+
+                return payments_df
         except Exception as e:
             st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
             return pd.DataFrame()
@@ -21,77 +24,72 @@ class CategoryRepository:
     @staticmethod
     def save_category(cat_type, cat_name, cat_description):
         try:
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute('''
-                           INSERT INTO category (cat_type, cat_name, cat_description)
-                           VALUES (?, ?, ?);
-                           ''', 
-                            (cat_type, cat_name, cat_description)
-            )
+                cursor.execute('''
+                               INSERT INTO category (cat_type, cat_name, cat_description)
+                               VALUES (?, ?, ?);
+                               ''', 
+                                (cat_type, cat_name, cat_description)
+                )
             
-            conn.commit()
-            return True
+                DataManager.bump_table_version(cursor, "category")
+                conn.commit()
+                return True
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 st.error(f"Erro: A categoria '{cat_name}' já existe.")
             else:
                 st.error(f"Ocorreu um erro ao salvar a categoria: {e}")
             return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
     
     @staticmethod
     def update_category(category_id, new_name, new_description):
         try:
             category_id = int(category_id)
 
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute(
-                '''
-                UPDATE category SET cat_name = ?, cat_description = ?
-                WHERE cat_id = ?;
-                ''',
-                (new_name, new_description, category_id)
-            )
+                cursor.execute(
+                    '''
+                    UPDATE category SET cat_name = ?, cat_description = ?
+                    WHERE cat_id = ?;
+                    ''',
+                    (new_name, new_description, category_id)
+                )
             
-            conn.commit()
-            return True
+                DataManager.bump_table_version(cursor, "category")
+                conn.commit()
+                return True
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 st.error(f"Erro: A categoria '{new_name}' já existe.")
             else:
                 st.error(f"Ocorreu um erro ao atualizar os dados: {e}")
             return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
 
     @staticmethod
     def delete_category(category_id):
         try:
             category_id = int(category_id)
 
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("PRAGMA foreign_keys = ON;")
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute(
-                '''
-                DELETE FROM category
-                WHERE cat_id = ?; 
-                ''', 
-                (category_id,)
-            )
+                cursor.execute(
+                    '''
+                    DELETE FROM category
+                    WHERE cat_id = ?; 
+                    ''', 
+                    (category_id,)
+                )
             
-            conn.commit()
-            return True
-        except conn.IntegrityError as e:
+                DataManager.bump_table_version(cursor, "category", cascade=True)
+                conn.commit()
+                return True
+        except sqlite3.IntegrityError as e:
             if "FOREIGN KEY constraint failed" in str(e):
                 st.error(
                     f"Erro: Não é possível deletar a categoria com ID {category_id} "
@@ -102,7 +100,4 @@ class CategoryRepository:
             return False
         except Exception as e:
             st.error(f"Ocorreu um erro inesperado ao deletar: {e}")
-            return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
\ No newline at end of file
+            return False
\ No newline at end of file
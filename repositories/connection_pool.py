@@ -0,0 +1,134 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de conexões SQLite de longa duração.
+
+    As conexões são criadas sob demanda (até `max_size`), já com os PRAGMAs aplicados,
+    e devolvidas ao pool ao final de cada uso. Uma transação deixada aberta é desfeita
+    na devolução, para que a próxima sessão receba a conexão limpa.
+    """
+
+    def __init__(self, db_path, max_size=5, pragmas=None, timeout=10.0):
+        """
+        Args:
+            db_path (str): Caminho do banco de dados SQLite.
+            max_size (int): Quantidade máxima de conexões abertas ao mesmo tempo.
+            pragmas (dict): PRAGMAs aplicados a cada conexão nova (nome -> valor).
+            timeout (float): Segundos de espera por uma conexão livre e por locks do SQLite
+                (repassado ao `sqlite3.connect`, que o aplica como busy timeout).
+
+        Raises:
+            ValueError: Se `pragmas` tiver `busy_timeout`, que substituiria `timeout` em silêncio.
+        """
+        if pragmas and "busy_timeout" in pragmas:
+            raise ValueError("Use o parâmetro timeout do pool em vez do PRAGMA busy_timeout.")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.pragmas = dict(pragmas or {})
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=max_size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value};")
+        return conn
+
+    def _acquire(self):
+        if self._closed:
+            raise RuntimeError("O pool de conexões foi encerrado.")
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.max_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self._create_connection()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError("Nenhuma conexão livre no pool.")
+
+        if not self._is_healthy(conn):
+            self._discard(conn)
+            return self._acquire()
+        return conn
+
+    def _release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        if self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put_nowait(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @contextmanager
+    def connection(self):
+        """
+        Empresta uma conexão do pool.
+
+        Uso:
+            with pool.connection() as conn:
+                conn.execute(...)
+                conn.commit()
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def health_check(self):
+        """Retorna True se o pool consegue entregar uma conexão que responde a consultas."""
+        try:
+            with self.connection() as conn:
+                return self._is_healthy(conn)
+        except Exception:
+            return False
+
+    def close(self):
+        """Encerra o pool, fechando as conexões livres. As emprestadas são fechadas na devolução."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
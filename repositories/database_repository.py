@@ -1,11 +1,74 @@
+import atexit
+import logging
 import sqlite3
+import textwrap
+import threading
 from datetime import datetime, timedelta
 import random
-import bcrypt
+import pandas as pd
+from repositories.connection_pool import ConnectionPool
+from repositories.migration_runner import MigrationRunner
+from models.user import User
+
+logger = logging.getLogger(__name__)
 
 class DataManager:
     DB_PATH = './data/financial_control.db'
-    def __init__(self, db_path=DB_PATH, populate_if_empty=False, development_mode=False):
+
+    # Pool de conexões compartilhado pelo processo (criado no primeiro uso)
+    POOL_SIZE = 5
+
+    # Segundos de espera por um lock do SQLite (o busy timeout de cada conexão) e por uma
+    # conexão livre no pool
+    TIMEOUT = 5.0
+
+    # PRAGMAs aplicados a toda conexão. Para outro perfil, altere o dicionário antes
+    # do primeiro acesso ao banco (ex.: DataManager.PRAGMAS["synchronous"] = "FULL").
+    # Com WAL, leitores não bloqueiam o escritor (e vice-versa); NORMAL é seguro em WAL
+    # e evita um fsync por transação.
+    PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "cache_size": -16000,       # em KiB (valor negativo): ~16 MB de cache de páginas
+        "mmap_size": 268435456,     # 256 MB de leitura via memory-map
+        "temp_store": "MEMORY",
+    }
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    # Bancos (DB_PATH) já verificados por `bootstrap` neste processo
+    _bootstrapped = set()
+    _bootstrap_lock = threading.Lock()
+
+    # Para cada tabela com contador de versão (ver `bump_table_version`), as tabelas cujas
+    # linhas são apagadas em cascata junto com as dela
+    CASCADES = {
+        "category": ["type"],
+        "type": ["expense", "income", "investment"],
+        "payment": ["expense"],
+    }
+
+    # Tipos compactos das colunas lidas pelos repositórios (ver `read_dataframe`). Centavos
+    # são int64 (int32 estoura em ~21 milhões de reais); valores em reais continuam float64,
+    # pois float32 perde centavos a partir de ~100 mil.
+    COLUMN_DTYPES = {
+        "exp_id": "int32", "exp_type_id": "int32", "exp_pay_id": "int32",
+        "exp_number_of_installments": "int32",
+        "exp_value_cents": "int64", "exp_value_total_installment_cents": "int64",
+        "exp_date": "datetime64[ns]", "exp_final_date_of_installment": "datetime64[ns]",
+        "type_id": "int32", "type_category_id": "int32",
+        "type_type": "category", "type_name": "category",
+        "cat_id": "int32", "cat_type": "category", "cat_name": "category",
+        "pay_id": "int32", "pay_name": "category",
+    }
+
+    # Limites da quantidade de despesas fictícias geradas em modo de desenvolvimento
+    MIN_FICTITIOUS_ROWS = 10_000
+    MAX_FICTITIOUS_ROWS = 10_000_000
+
+    def __init__(self, db_path=DB_PATH, populate_if_empty=False, development_mode=False,
+                 fictitious_rows=MIN_FICTITIOUS_ROWS, seed=None):
         """
         Inicializa a conexão com o banco de dados, cria as tabelas e popula se necessário.
 
@@ -13,41 +76,101 @@ class DataManager:
             db_path (str): Caminho do banco de dados SQLite.
             populate_if_empty (bool): Popula o banco de dados se estiver vazio.
             development_mode (bool): Indica se o banco deve ser configurado com dados de teste.
+            fictitious_rows (int): Quantidade de despesas fictícias geradas em modo de desenvolvimento.
+            seed (int): Semente dos dados fictícios, para gerar sempre o mesmo banco.
         """
         self.db_path = db_path
         self.development_mode = development_mode
+        self.fictitious_rows = fictitious_rows
+        self.seed = seed
         self._initialize_database()
         if populate_if_empty:
             self._populate_database_if_empty()
 
+    @classmethod
+    def bootstrap(cls):
+        """
+        Prepara o banco uma única vez por processo, para ser chamado a cada execução das páginas.
+
+        Na primeira chamada, compara a versão gravada no banco (PRAGMA user_version, número da
+        última migração aplicada) com a última migração disponível, e só executa a
+        inicialização completa (migrações pendentes e usuário padrão) se o banco estiver
+        desatualizado. O resultado fica guardado no processo: as chamadas seguintes retornam
+        sem acessar o banco.
+
+        Returns:
+            bool: True se a inicialização completa foi executada nesta chamada.
+        """
+        if cls.DB_PATH in cls._bootstrapped:
+            return False
+
+        with cls._bootstrap_lock:
+            if cls.DB_PATH in cls._bootstrapped:
+                return False
+
+            latest = MigrationRunner().latest_version
+            with cls.connection() as conn:
+                version = conn.execute("PRAGMA user_version;").fetchone()[0]
+            initialized = version < latest
+            if initialized:
+                logger.info("Inicializando o banco de dados (esquema %s -> %s)...", version, latest)
+                cls()
+                logger.info("Banco de dados configurado com sucesso.")
+            cls._bootstrapped.add(cls.DB_PATH)
+            return initialized
+
     @staticmethod
     def get_connection():
-        """Retorna uma conexão com o banco de dados."""
-        return sqlite3.connect(DataManager.DB_PATH)
+        """Retorna uma conexão avulsa com o banco de dados. Prefira `DataManager.connection()`."""
+        conn = sqlite3.connect(DataManager.DB_PATH, timeout=DataManager.TIMEOUT)
+        for name, value in DataManager.PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value};")
+        return conn
+
+    @classmethod
+    def get_pool(cls):
+        """Retorna o pool de conexões do processo, criando-o no primeiro uso."""
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = ConnectionPool(
+                        cls.DB_PATH, max_size=cls.POOL_SIZE, pragmas=cls.PRAGMAS, timeout=cls.TIMEOUT
+                    )
+                    atexit.register(cls.close_pool)
+        return cls._pool
+
+    @classmethod
+    def connection(cls):
+        """
+        Empresta uma conexão do pool, com os PRAGMAs já aplicados.
+
+        Uso:
+            with DataManager.connection() as conn:
+                ...
+        """
+        return cls.get_pool().connection()
+
+    @classmethod
+    def close_pool(cls):
+        """Fecha todas as conexões do pool (chamado automaticamente ao encerrar o processo)."""
+        with cls._pool_lock:
+            if cls._pool is not None:
+                cls._pool.close()
+                cls._pool = None
 
     def _initialize_database(self):
-        """Cria as tabelas no banco de dados, se elas não existirem."""
+        """Aplica as migrações pendentes do esquema (ver `MigrationRunner`) e cria o usuário padrão."""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
+            with self.connection() as conn:
+                MigrationRunner().migrate(conn)
 
-                # Tabelas do banco de dados
-                sql_user = '''
-                    CREATE TABLE IF NOT EXISTS user (
-                        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_username TEXT UNIQUE NOT NULL,
-                        user_password_hash TEXT NOT NULL,
-                        user_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                '''
-                cursor.execute(sql_user)
-                
                 # Insere o usuário padrão apenas se ele não existir
+                cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM user WHERE user_username = 'admin';")
                 if cursor.fetchone()[0] == 0:
                     default_username = "admin"
                     default_password = "master"
-                    hashed_password = bcrypt.hashpw(default_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                    hashed_password = User.hash_password(default_password)
                     cursor.execute(
                         "INSERT INTO user (user_username, user_password_hash) VALUES (?, ?);",
                         (default_username, hashed_password)
@@ -56,92 +179,222 @@ class DataManager:
                 else:
                     print("Usuário padrão já existe.")
 
-                sql_category = '''
-                    CREATE TABLE IF NOT EXISTS category (
-                        cat_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        cat_type TEXT NOT NULL CHECK (cat_type IN ('expense', 'income', 'investment')),
-                        cat_name TEXT NOT NULL,
-                        cat_description TEXT,
-                        UNIQUE (cat_type, cat_name)
-                    );
-                '''
-                cursor.execute(sql_category)
-
-                sql_type = '''
-                    CREATE TABLE IF NOT EXISTS type (
-                        type_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        type_type TEXT NOT NULL CHECK (type_type IN ('expense', 'income', 'investment')),                        
-                        type_name TEXT NOT NULL,
-                        type_description TEXT,
-                        type_category_id INTEGER,
-                        FOREIGN KEY (type_category_id) REFERENCES category(cat_id) ON DELETE CASCADE,
-                        UNIQUE (type_type, type_name)
-                    );
-                '''
-                cursor.execute(sql_type)
-
-                sql_payment = '''
-                    CREATE TABLE IF NOT EXISTS payment (
-                        pay_id INTEGER PRIMARY KEY AUTOINCREMENT,                
-                        pay_name TEXT NOT NULL UNIQUE,
-                        pay_description TEXT                       
-                    );
-                '''
-                cursor.execute(sql_payment)
-
-                sql_expense = '''
-                    CREATE TABLE IF NOT EXISTS expense (
-                        exp_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        exp_date DATE NOT NULL,
-                        exp_value REAL NOT NULL,
-                        exp_description TEXT NOT NULL,
-                        exp_type_id INTEGER,
-                        exp_pay_id INTEGER,
-                        exp_number_of_installments INTEGER DEFAULT 0,
-                        exp_final_date_of_installment DATE,
-                        exp_value_total_installment REAL NOT NULL,
-                        FOREIGN KEY (exp_type_id) REFERENCES type(type_id) ON DELETE CASCADE,
-                        FOREIGN KEY (exp_pay_id) REFERENCES payment(pay_id) ON DELETE CASCADE
-                    );
-                '''
-                cursor.execute(sql_expense)
-
-                sql_income = '''
-                    CREATE TABLE IF NOT EXISTS income (
-                        inc_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        inc_date DATE NOT NULL,
-                        inc_value REAL NOT NULL,
-                        inc_description TEXT NOT NULL,
-                        inc_type_id INTEGER,
-                        FOREIGN KEY (inc_type_id) REFERENCES type(type_id) ON DELETE CASCADE
-                    );
-                '''
-                cursor.execute(sql_income)
-
-                sql_investment = '''
-                    CREATE TABLE IF NOT EXISTS investment (
-                        inv_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        inv_date DATE NOT NULL,
-                        inv_value REAL NOT NULL,
-                        inv_description TEXT NOT NULL,
-                        inv_type_id INTEGER,
-                        inv_return_rate REAL DEFAULT 0.0,
-                        inv_maturity_date DATE,
-                        FOREIGN KEY (inv_type_id) REFERENCES type(type_id) ON DELETE CASCADE
-                    );
-                '''
-                cursor.execute(sql_investment)
-
                 conn.commit()
         except Exception as e:
             raise Exception(f"Erro ao criar as tabelas: {e}")
 
+    @classmethod
+    def dump_schema(cls):
+        """
+        Retorna o esquema atual do banco (tabelas, índices e triggers) como um script SQL, na
+        ordem de criação. Tabelas internas do SQLite e do FTS5 ficam de fora.
+        """
+        with cls.connection() as conn:
+            rows = conn.execute('''
+                SELECT sql FROM sqlite_master
+                WHERE sql IS NOT NULL
+                  AND name NOT LIKE 'sqlite_%'
+                  AND name NOT IN ('expense_fts_data', 'expense_fts_idx', 'expense_fts_docsize', 'expense_fts_config')
+                ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END, rowid;
+            ''').fetchall()
+        statements = []
+        for (sql,) in rows:
+            # Os comandos guardam a indentação do código que os criou; normaliza o corpo
+            # e remove os espaços no fim das linhas
+            first, _, body = sql.partition("\n")
+            body = "\n".join(line.rstrip() for line in textwrap.dedent(body).split("\n"))
+            statements.append(f"{first.rstrip()}\n{body};\n\n" if body else f"{sql};\n\n")
+        return "".join(statements).rstrip() + "\n"
+
+    @staticmethod
+    def qualify_columns(columns, prefixes):
+        """
+        Valida uma projeção e retorna as colunas qualificadas pelo alias da tabela.
+
+        Args:
+            columns (list): Nomes das colunas pedidas.
+            prefixes (dict): Prefixo da coluna -> alias da tabela na consulta (ex.: {'exp_': 'e'}).
+        """
+        qualified = []
+        for column in columns:
+            alias = next((a for prefix, a in prefixes.items() if column.startswith(prefix)), None)
+            if alias is None or not column.replace('_', '').isalnum():
+                raise ValueError(f"Coluna inválida: {column}")
+            qualified.append(f"{alias}.{column}")
+        return qualified
+
+    @classmethod
+    def compact_dataframe(cls, df):
+        """
+        Converte as colunas de `df` para os tipos de `COLUMN_DTYPES`: nomes como `category`,
+        datas como datetime64 e ids/quantidades como int32. Colunas inteiras com nulos
+        permanecem como estão.
+        """
+        for column in df.columns.intersection(list(cls.COLUMN_DTYPES)):
+            dtype = cls.COLUMN_DTYPES[column]
+            if dtype.startswith("datetime"):
+                df[column] = pd.to_datetime(df[column], errors="coerce")
+            elif dtype == "category" or not df[column].isna().any():
+                df[column] = df[column].astype(dtype)
+        return df
+
+    @classmethod
+    def read_dataframe(cls, conn, query, params=()):
+        """Executa `query` e retorna um DataFrame com tipos compactos (ver `compact_dataframe`)."""
+        return cls.compact_dataframe(pd.read_sql_query(query, conn, params=params))
+
+    @staticmethod
+    def sync_expense_installments(cursor, exp_id=None, after_exp_id=None):
+        """
+        Regrava as linhas de `expense_installment` de uma despesa (ou de todas, se `exp_id` for None).
+
+        É a expansão de parcelas compartilhada da aplicação: substitui o `expand_installments_v2`
+        linha a linha do dashboard e a expansão vetorizada em pandas que existiu em
+        utils/installments.py, calculando as parcelas uma vez na escrita em vez de a cada leitura.
+        A equivalência com a regra original está em tests/test_installments.py.
+
+        Cada despesa gera `exp_number_of_installments` linhas (uma para despesas à vista),
+        a primeira no mês da compra. O CROSS JOIN mantém a despesa como laço externo, para que
+        as linhas entrem na ordem de (ins_exp_id, ins_number). Com `after_exp_id`, regrava apenas as despesas de id
+        maior (usado após inserções em lote). Deve ser chamada com o cursor da mesma
+        transação que alterou a tabela `expense`.
+        """
+        if exp_id is not None:
+            where, ledger_where, params = "WHERE e.exp_id = ?", "WHERE ins_exp_id = ?", (int(exp_id),)
+        elif after_exp_id is not None:
+            where, ledger_where, params = "WHERE e.exp_id > ?", "WHERE ins_exp_id > ?", (int(after_exp_id),)
+        else:
+            where, ledger_where, params = "", "", ()
+
+        cursor.execute(f"DELETE FROM expense_installment {ledger_where};", params)
+
+        cursor.execute(
+            f'''
+            WITH RECURSIVE seq(n) AS (
+                SELECT 1
+                UNION ALL
+                SELECT n + 1 FROM seq
+                WHERE n < (SELECT MAX(e.exp_number_of_installments) FROM expense e {where})
+            )
+            INSERT INTO expense_installment (ins_exp_id, ins_number, ins_month, ins_value_cents)
+            SELECT
+                e.exp_id,
+                seq.n,
+                date(e.exp_date, 'start of month', '+' || (seq.n - 1) || ' months'),
+                e.exp_value_cents
+            FROM expense e
+            CROSS JOIN seq ON seq.n <= MAX(COALESCE(e.exp_number_of_installments, 0), 1)
+            {where};
+            ''',
+            params * 2
+        )
+
+    @staticmethod
+    def bump_table_version(cursor, table, cascade=False):
+        """
+        Incrementa a versão de dados de `table` (e, com `cascade`, das tabelas afetadas por
+        exclusões em cascata). Deve ser chamada com o cursor da mesma transação da escrita,
+        para que a nova versão só fique visível junto com os dados.
+        """
+        tables = [table]
+        if cascade:
+            for current in tables:
+                tables += [child for child in DataManager.CASCADES.get(current, []) if child not in tables]
+
+        cursor.execute(
+            f"UPDATE table_version SET tv_version = tv_version + 1 WHERE tv_table IN ({', '.join('?' * len(tables))});",
+            tables
+        )
+
+    @classmethod
+    def get_table_versions(cls, tables):
+        """Retorna uma tupla com a versão de dados atual de cada tabela de `tables`, na mesma ordem."""
+        with cls.connection() as conn:
+            versions = dict(conn.execute("SELECT tv_table, tv_version FROM table_version;").fetchall())
+        return tuple(versions.get(table, 0) for table in tables)
+
+    # Chave dos resumos: período, tipo, categoria (0 = tipo sem categoria), pagamento e
+    # crédito (1 = compra parcelada, 0 = à vista). Expressões sobre a despesa `{e}`.
+    SUMMARY_KEY = (
+        "COALESCE({e}.exp_type_id, 0)",
+        "COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = {e}.exp_type_id), 0)",
+        "COALESCE({e}.exp_pay_id, 0)",
+        "COALESCE({e}.exp_number_of_installments, 0) > 0",
+    )
+
+    @classmethod
+    def _summary_key(cls, e, with_category=True):
+        # Sem a categoria: o tipo já a determina, e ela pode não existir mais (exclusão em cascata)
+        key = cls.SUMMARY_KEY if with_category else cls.SUMMARY_KEY[:1] + cls.SUMMARY_KEY[2:]
+        return ", ".join(expr.format(e=e) for expr in key)
+
+    @staticmethod
+    def rebuild_search_index(cursor):
+        """Reindexa todas as descrições em `expense_fts`, no cursor (e transação) informado."""
+        cursor.execute("INSERT INTO expense_fts (expense_fts) VALUES ('rebuild');")
+
+    @classmethod
+    def _summary_queries(cls):
+        """Consultas que recalculam do zero o conteúdo de `summary_daily` e `summary_monthly`."""
+        daily = f'''
+            SELECT e.exp_date, {cls._summary_key("e")}, SUM(e.exp_value_cents), COUNT(*)
+            FROM expense e
+            GROUP BY 1, 2, 3, 4, 5
+        '''
+        monthly = f'''
+            SELECT i.ins_month, {cls._summary_key("e")}, SUM(i.ins_value_cents), COUNT(*)
+            FROM expense_installment i
+            JOIN expense e ON i.ins_exp_id = e.exp_id
+            GROUP BY 1, 2, 3, 4, 5
+        '''
+        return {"summary_daily": daily, "summary_monthly": monthly}
+
+    @classmethod
+    def rebuild_summaries(cls, cursor):
+        """Recalcula do zero as tabelas de resumo, no cursor (e transação) informado."""
+        for table, query in cls._summary_queries().items():
+            cursor.execute(f"DELETE FROM {table};")
+            cursor.execute(f"INSERT INTO {table} {query};")
+
+    def check_summaries(self):
+        """
+        Compara as tabelas de resumo com um recálculo completo. Os totais são centavos
+        inteiros, então a comparação é exata.
+
+        Returns:
+            list: Divergências (tabela, chave, (total, quantidade) gravados, (total, quantidade)
+            esperados). Lista vazia quando os resumos estão consistentes.
+        """
+        differences = []
+        with self.connection() as conn:
+            for table, query in self._summary_queries().items():
+                stored = {row[:5]: row[5:] for row in conn.execute(f"SELECT * FROM {table};")}
+                expected = {row[:5]: row[5:] for row in conn.execute(query)}
+                for key in stored.keys() | expected.keys():
+                    got, want = stored.get(key), expected.get(key)
+                    if got != want:
+                        differences.append((table, key, got, want))
+        return differences
+
+    def rebuild_expense_installments(self):
+        """Apaga e regenera todo o livro de parcelas a partir da tabela `expense`."""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                self.sync_expense_installments(cursor)
+                self.bump_table_version(cursor, "expense")
+                conn.commit()
+                cursor.execute("SELECT COUNT(*) FROM expense_installment;")
+                return cursor.fetchone()[0]
+        except Exception as e:
+            raise Exception(f"Erro ao regenerar o livro de parcelas: {e}")
+
     def _is_database_empty(self):
         """
         Verifica se as tabelas principais (exceto 'user') estão vazias.
         """
         tables_to_check = ["category", "type", "payment", "expense", "income", "investment"]
-        with self.get_connection() as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             for table_name in tables_to_check:
                 cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
@@ -160,7 +413,7 @@ class DataManager:
     def _populate_database(self):
         """Popula o banco de dados com registros fictícios."""
         try:
-            with self.get_connection() as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
 
                 # Inserir categorias
@@ -192,30 +445,165 @@ class DataManager:
                 ]
                 cursor.executemany("INSERT OR IGNORE INTO payment (pay_name, pay_description) VALUES (?, ?)", payments)
 
-                # Inserir despesas fictícias, receitas e investimentos se `development_mode` estiver ativado
-                if self.development_mode:
-                    self._populate_fictitious_data(cursor)
+                for table in ("category", "type", "payment"):
+                    self.bump_table_version(cursor, table)
 
                 conn.commit()
+
+            # Inserir despesas fictícias se `development_mode` estiver ativado. Roda depois do
+            # commit acima, pois a inserção em lote abre a sua própria transação.
+            if self.development_mode:
+                self._populate_fictitious_data()
         except Exception as e:
             raise Exception(f"Erro ao popular o banco de dados: {e}")
 
-    def _populate_fictitious_data(self, cursor):
-        """Popula o banco de dados com dados fictícios adicionais."""
-        for _ in range(10000):
-            exp_date = datetime.now() - timedelta(days=random.randint(0, 5 * 365))
-            exp_value = round(random.uniform(20, 500), 2)
-            exp_description = random.choice(['Supermercado', 'Gasolina', 'Restaurante', 'Transporte'])
-            exp_type_id = random.randint(1, 2)
-            exp_pay_id = random.randint(1, 4)
-            exp_number_of_installments = random.choice([0, 3, 6, 12])
-            exp_final_date_of_installment = (exp_date + timedelta(days=30 * exp_number_of_installments)).date()
-            exp_value_total_installment = exp_value * (exp_number_of_installments if exp_number_of_installments else 1)
-
-            cursor.execute(
-                "INSERT INTO expense (exp_date, exp_value, exp_description, exp_type_id, exp_pay_id, "
-                "exp_number_of_installments, exp_final_date_of_installment, exp_value_total_installment) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (exp_date.date(), exp_value, exp_description, exp_type_id, exp_pay_id,
-                 exp_number_of_installments, exp_final_date_of_installment, exp_value_total_installment)
+    def _populate_fictitious_data(self, rows=None, seed=None):
+        """
+        Insere despesas fictícias em lote via `ExpenseRepository.bulk_insert_expenses`.
+
+        Args:
+            rows (int): Quantidade de despesas (padrão: `fictitious_rows`). Aceita de 10 mil a 10 milhões.
+            seed (int): Semente do gerador; a mesma semente gera sempre os mesmos dados.
+
+        Returns:
+            int: Quantidade de despesas inseridas.
+        """
+        # Importado aqui: expense_repository importa este módulo
+        from repositories.expense_repository import ExpenseRepository
+
+        rows = self.fictitious_rows if rows is None else int(rows)
+        seed = self.seed if seed is None else seed
+        if not self.MIN_FICTITIOUS_ROWS <= rows <= self.MAX_FICTITIOUS_ROWS:
+            raise ValueError(
+                f"A quantidade de despesas deve estar entre {self.MIN_FICTITIOUS_ROWS} e {self.MAX_FICTITIOUS_ROWS}."
             )
+
+        with self.connection() as conn:
+            type_ids = [r[0] for r in conn.execute("SELECT type_id FROM type WHERE type_type = 'expense' ORDER BY type_id;")]
+            pay_ids = [r[0] for r in conn.execute("SELECT pay_id FROM payment ORDER BY pay_id;")]
+        if not type_ids or not pay_ids:
+            raise Exception("Cadastre ao menos um tipo de despesa e um meio de pagamento antes de gerar dados.")
+
+        inserted = ExpenseRepository.bulk_insert_expenses(
+            self._generate_fictitious_expenses(rows, seed, type_ids, pay_ids)
+        )
+        if inserted is False:
+            raise Exception("Erro ao inserir as despesas fictícias.")
+        return inserted
+
+    @staticmethod
+    def _generate_fictitious_expenses(rows, seed, type_ids, pay_ids, days=5 * 365):
+        """
+        Gera `rows` tuplas de despesa no formato de `bulk_insert_expenses` (valores em
+        centavos), com compras nos últimos `days` dias. As datas são pré-formatadas uma única vez.
+        """
+        rng = random.Random(seed)
+        randrange, choice = rng.randrange, rng.choice
+        descriptions = ['Supermercado', 'Gasolina', 'Restaurante', 'Transporte']
+        installments = [0, 3, 6, 12]
+
+        # dates[k] = hoje - days + k, cobrindo também a data da última parcela (até 360 dias à frente)
+        start = datetime.now().date() - timedelta(days=days)
+        dates = [(start + timedelta(days=k)).isoformat() for k in range(days + 1 + 30 * max(installments))]
+
+        for _ in range(rows):
+            day = randrange(days + 1)
+            value_cents = randrange(2000, 50001)
+            number = choice(installments)
+            yield (
+                dates[day],
+                value_cents,
+                choice(descriptions),
+                choice(type_ids),
+                choice(pay_ids),
+                number,
+                dates[day + 30 * number],
+                value_cents * (number if number else 1),
+            )
+
+    def seed_fictitious_data(self, rows=None, seed=None):
+        """Insere despesas fictícias num banco já existente (ver `_populate_fictitious_data`)."""
+        return self._populate_fictitious_data(rows, seed)
+
+
+if __name__ == "__main__":
+    # Uso:
+    #   python -m repositories.database_repository rebuild-installments
+    #   python -m repositories.database_repository check-summaries
+    #   python -m repositories.database_repository rebuild-search
+    #   python -m repositories.database_repository export-expenses despesas.csv
+    #   python -m repositories.database_repository seed --rows 1000000 --seed 42
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(prog="python -m repositories.database_repository")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="Aplica as migrações pendentes do esquema.")
+    commands.add_parser("migration-status", help="Lista as migrações aplicadas e pendentes.")
+    dump_parser = commands.add_parser("dump-schema", help="Grava o esquema atual como script SQL.")
+    dump_parser.add_argument("path", nargs="?", default="sql/ddl.sql")
+    commands.add_parser("rebuild-installments", help="Regenera o livro de parcelas.")
+    commands.add_parser("check-summaries", help="Compara as tabelas de resumo com um recálculo completo.")
+    commands.add_parser("rebuild-summaries", help="Recalcula as tabelas de resumo.")
+    commands.add_parser("rebuild-search", help="Reindexa as descrições para a busca textual.")
+    export_parser = commands.add_parser("export-expenses", help="Exporta as despesas para CSV em blocos.")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--chunk-size", type=int, default=10000)
+    seed_parser = commands.add_parser("seed", help="Insere despesas fictícias.")
+    seed_parser.add_argument("--rows", type=int, default=DataManager.MIN_FICTITIOUS_ROWS)
+    seed_parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    # Exibe as mensagens das migrações aplicadas (logging) no console
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "migrate":
+        # A construção do DataManager aplica as migrações pendentes
+        DataManager()
+        with DataManager.connection() as conn:
+            print(f"Esquema na versão {conn.execute('PRAGMA user_version;').fetchone()[0]}.")
+    elif args.command == "migration-status":
+        with DataManager.connection() as conn:
+            for migration, state, applied_at in MigrationRunner().status(conn):
+                print(f"{migration}  {state}{f'  {applied_at}' if applied_at else ''}")
+    elif args.command == "dump-schema":
+        DataManager()
+        with open(args.path, "w", encoding="utf-8") as file:
+            file.write(
+                "-- Esquema do banco financial_control, gerado a partir das migrações de sql/migrations com\n"
+                "-- `python -m repositories.database_repository dump-schema`. Não edite: altere o esquema\n"
+                "-- criando uma nova migração.\n\n"
+            )
+            file.write(DataManager.dump_schema())
+        print(f"Esquema gravado em {args.path}.")
+    elif args.command == "rebuild-installments":
+        total = DataManager().rebuild_expense_installments()
+        print(f"Livro de parcelas regenerado: {total} linhas.")
+    elif args.command == "check-summaries":
+        differences = DataManager().check_summaries()
+        for difference in differences[:20]:
+            print(difference)
+        print(f"{len(differences)} divergência(s) nas tabelas de resumo.")
+        raise SystemExit(1 if differences else 0)
+    elif args.command == "rebuild-summaries":
+        manager = DataManager()
+        with manager.connection() as conn:
+            manager.rebuild_summaries(conn.cursor())
+            conn.commit()
+        print("Tabelas de resumo recalculadas.")
+    elif args.command == "rebuild-search":
+        manager = DataManager()
+        with manager.connection() as conn:
+            manager.rebuild_search_index(conn.cursor())
+            conn.commit()
+        print("Índice de busca reindexado.")
+    elif args.command == "export-expenses":
+        # Importado aqui: expense_controller importa este módulo
+        from controllers.expense_controller import ExpenseController
+
+        DataManager()
+        total = ExpenseController().export_expenses_csv(args.path, args.chunk_size)
+        print(f"{total} despesas exportadas para {args.path}.")
+    else:
+        start = time.perf_counter()
+        total = DataManager(populate_if_empty=True).seed_fictitious_data(args.rows, args.seed)
+        print(f"{total} despesas inseridas em {time.perf_counter() - start:.1f}s.")
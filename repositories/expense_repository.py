@@ -1,131 +1,437 @@
+import re
 from repositories.database_repository import DataManager
 from models.expense import Expense
 import pandas as pd
 import streamlit as st
 
 class ExpenseRepository:
+    # Prefixo da coluna -> alias da tabela na consulta de despesas
+    COLUMN_PREFIXES = {'exp_': 'e', 'type_': 't', 'pay_': 'p', 'cat_': 'c'}
+
+    # Valores em reais expostos pelo repositório -> coluna em centavos no banco
+    MONEY_COLUMNS = {
+        'exp_value': 'exp_value_cents',
+        'exp_value_total_installment': 'exp_value_total_installment_cents',
+    }
+
+    # Maior id possível no SQLite: chave de paginação que inclui todas as despesas de uma data
+    MAX_EXP_ID = 2 ** 63 - 1
+
+    @staticmethod
+    def fts_query(text):
+        """
+        Converte o texto digitado numa consulta FTS5: cada palavra vira um prefixo entre aspas
+        ("mer"* encontra "Mercado") e todas precisam ocorrer. A pontuação é descartada, então
+        o texto nunca é interpretado como sintaxe FTS5. Retorna None se não houver palavras.
+        """
+        words = re.findall(r"\w+", str(text or ""))
+        return " ".join(f'"{word}"*' for word in words) or None
+
     @staticmethod
-    def load_expenses():
+    def _select(columns=None):
+        """
+        Projeção das consultas de despesas. Os valores monetários são convertidos de centavos
+        para reais na própria consulta (ver `MONEY_COLUMNS`); sem `columns`, a projeção traz
+        as colunas em centavos e também as convertidas.
+        """
+        money = ExpenseRepository.MONEY_COLUMNS
+        if not columns:
+            converted = ", ".join(f"e.{cents} / 100.0 AS {column}" for column, cents in money.items())
+            return f"e.*, {converted}, t.*, p.*"
+        qualified = DataManager.qualify_columns(columns, ExpenseRepository.COLUMN_PREFIXES)
+        return ", ".join(
+            f"e.{money[column]} / 100.0 AS {column}" if column in money else expression
+            for column, expression in zip(columns, qualified)
+        )
+
+    @staticmethod
+    def _expenses_query(data_inicio=None, data_fim=None, columns=None, type_ids=None, pay_ids=None, cat_ids=None,
+                        search=None, include_overlapping_installments=True,
+                        keyset=None, order="DESC", limit=None):
+        """
+        Monta a consulta de despesas (ver `load_expenses`). Retorna (query, params).
+
+        `keyset` é uma condição extra (sql, params) sobre (e.exp_date, e.exp_id); `order` e
+        `limit` controlam a ordenação por (exp_date, exp_id) e o tamanho do resultado.
+
+        Todas as variações são resolvidas por índices, exceto a consulta sem período, filtros,
+        busca nem chave (todo o histórico), que percorre a tabela na ordem de idx_expense_date.
+        Os planos são verificados em tests/test_query_plans.py.
+        """
+        select = ExpenseRepository._select(columns)
+        join_category = cat_ids or (columns and any(c.startswith('cat_') for c in columns))
+
+        conditions = []
+        params = []
+        if data_inicio is not None or data_fim is not None:
+            inicio = str(data_inicio) if data_inicio is not None else '0001-01-01'
+            fim = str(data_fim) if data_fim is not None else '9999-12-31'
+            if include_overlapping_installments:
+                conditions.append("""
+                    (e.exp_date BETWEEN ? AND ?
+                     OR (e.exp_number_of_installments > 0 AND e.exp_id IN (
+                            SELECT ins_exp_id FROM expense_installment
+                            WHERE ins_month BETWEEN date(?, 'start of month') AND ?)))
+                """)
+                params += [inicio, fim, inicio, fim]
+            else:
+                conditions.append("e.exp_date BETWEEN ? AND ?")
+                params += [inicio, fim]
+
+        for column, ids in (('e.exp_type_id', type_ids), ('e.exp_pay_id', pay_ids), ('t.type_category_id', cat_ids)):
+            if ids:
+                conditions.append(f"{column} IN ({', '.join('?' * len(ids))})")
+                params += [int(i) for i in ids]
+
+        match = ExpenseRepository.fts_query(search)
+        if match:
+            conditions.append("e.exp_id IN (SELECT rowid FROM expense_fts WHERE expense_fts MATCH ?)")
+            params.append(match)
+
+        if keyset:
+            conditions.append(keyset[0])
+            params += list(keyset[1])
+
+        if order not in ("ASC", "DESC"):
+            raise ValueError(f"Ordenação inválida: {order}")
+
+        query = f"""
+            SELECT {select} FROM expense e
+            JOIN type t ON e.exp_type_id = t.type_id
+            JOIN payment p ON e.exp_pay_id = p.pay_id
+            {"LEFT JOIN category c ON t.type_category_id = c.cat_id" if join_category else ""}
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            ORDER BY e.exp_date {order}, e.exp_id {order}
+            {"LIMIT " + str(int(limit)) if limit is not None else ""};
+            """
+        return query, params
+
+    @staticmethod
+    def load_expenses(**filters):
+        """
+        Carrega as despesas aplicando período, projeção e filtros diretamente no SQL.
+
+        Args (todos opcionais):
+            data_inicio, data_fim: Período da data da compra. Sem datas, carrega todo o histórico.
+            columns (list): Colunas de expense (exp_*), type (type_*), payment (pay_*) ou
+                category (cat_*). Sem colunas, retorna expense, type e payment completas.
+                Os tipos retornados são compactos (ver `DataManager.read_dataframe`).
+            type_ids, pay_ids, cat_ids (list): Filtros opcionais por tipo, pagamento e categoria.
+            search (str): Busca textual na descrição (ver `fts_query`).
+            include_overlapping_installments (bool): Mantém as compras parceladas feitas antes
+                do período cujas parcelas caem dentro dele (via livro de parcelas).
+        """
         try:
-            conn = DataManager.get_connection()
-            
-            query = """
-                SELECT * FROM expense e
+            query, params = ExpenseRepository._expenses_query(**filters)
+            with DataManager.connection() as conn:
+                payments_df = DataManager.read_dataframe(conn, query, params)
+
+                return payments_df
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
+            return pd.DataFrame()
+
+    @staticmethod
+    def load_expenses_page(page_size=50, key=None, direction="older", **filters):
+        """
+        Carrega uma página de despesas por paginação keyset sobre (exp_date, exp_id), da mais
+        recente para a mais antiga. O custo independe da posição da página na tabela.
+
+        Args:
+            page_size (int): Quantidade de despesas por página.
+            key (tuple): (exp_date, exp_id) de referência. Com `direction="older"`, a página
+                começa logo após a chave (use a última linha da página atual); com "newer",
+                termina logo antes dela (use a primeira linha). Com exp_id None, a página
+                começa na data informada (inclusive). Sem chave, retorna a página mais recente.
+            direction (str): "older" ou "newer".
+            filters: Mesmos filtros de `load_expenses` (columns deve incluir exp_date e exp_id).
+
+        Returns:
+            tuple: (DataFrame da página, há despesas mais recentes, há despesas mais antigas).
+        """
+        try:
+            if direction not in ("older", "newer"):
+                raise ValueError(f"Direção inválida: {direction}")
+            older = direction == "older"
+
+            keyset = None
+            if key is not None:
+                # Sem exp_id, a chave fica depois de todas as despesas da data (data inclusive)
+                key = (str(key[0]), ExpenseRepository.MAX_EXP_ID if key[1] is None else int(key[1]))
+                keyset = (f"(e.exp_date, e.exp_id) {'<' if older else '>'} (?, ?)", key)
+
+            query, params = ExpenseRepository._expenses_query(
+                keyset=keyset, order="DESC" if older else "ASC", limit=int(page_size) + 1, **filters
+            )
+            with DataManager.connection() as conn:
+                page_df = DataManager.read_dataframe(conn, query, params)
+
+                # Uma linha a mais indica que existe página seguinte na direção percorrida
+                has_more = len(page_df) > page_size
+                page_df = page_df.iloc[:page_size]
+                if not older:
+                    page_df = page_df.iloc[::-1]
+                page_df = page_df.reset_index(drop=True)
+
+                # Na direção oposta, basta saber se existe alguma linha além da página (ou da chave)
+                has_other = False
+                if key is not None:
+                    if page_df.empty:
+                        boundary = (f"(e.exp_date, e.exp_id) {'>=' if older else '<='} (?, ?)", key)
+                    else:
+                        row = page_df.iloc[0 if older else -1]
+                        boundary = (f"(e.exp_date, e.exp_id) {'>' if older else '<'} (?, ?)",
+                                    (str(row['exp_date'].date()), int(row['exp_id'])))
+                    other_filters = {k: v for k, v in filters.items() if k != 'columns'}
+                    other_query, other_params = ExpenseRepository._expenses_query(
+                        columns=['exp_id'], keyset=boundary, limit=1, **other_filters
+                    )
+                    has_other = conn.execute(other_query, other_params).fetchone() is not None
+
+                if older:
+                    return page_df, has_other, has_more
+                return page_df, has_more, has_other
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
+            return pd.DataFrame(), False, False
+
+    @staticmethod
+    def search_expenses(text, limit=20, columns=None):
+        """
+        Busca despesas pela descrição no índice FTS5, das mais relevantes (bm25) para as
+        menos relevantes; empates ficam com as mais recentes primeiro.
+
+        Args:
+            text (str): Palavras buscadas; cada uma vale como prefixo (ver `fts_query`).
+            limit (int): Quantidade máxima de despesas retornadas.
+            columns (list): Projeção, como em `load_expenses`.
+        """
+        try:
+            match = ExpenseRepository.fts_query(text)
+            if match is None:
+                return pd.DataFrame(columns=columns)
+
+            select = ExpenseRepository._select(columns)
+            join_category = columns and any(c.startswith('cat_') for c in columns)
+            query = f"""
+                SELECT {select} FROM expense_fts f
+                JOIN expense e ON e.exp_id = f.rowid
                 JOIN type t ON e.exp_type_id = t.type_id
                 JOIN payment p ON e.exp_pay_id = p.pay_id
-                ORDER BY exp_date DESC;
+                {"LEFT JOIN category c ON t.type_category_id = c.cat_id" if join_category else ""}
+                WHERE expense_fts MATCH ?
+                ORDER BY bm25(expense_fts), e.exp_date DESC, e.exp_id DESC
+                LIMIT ?;
                 """
-            payments_df = pd.read_sql_query(query, conn)
-            
-            conn.close()
-            
-            return payments_df
+            with DataManager.connection() as conn:
+                return DataManager.read_dataframe(conn, query, (match, int(limit)))
         except Exception as e:
             st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
             return pd.DataFrame()
 
+    @staticmethod
+    def iter_expenses(chunk_size=10000, as_frames=True, **filters):
+        """
+        Percorre as despesas em blocos de até `chunk_size` linhas, lidos com `fetchmany`, sem
+        carregar todo o histórico na memória. Aceita os mesmos filtros de `load_expenses`.
+
+        A conexão fica emprestada do pool até o iterador terminar; consuma-o até o fim ou
+        feche-o (`close()`), como acontece ao sair de um `for` com `break`.
+
+        Yields:
+            pd.DataFrame com tipos compactos (ou, com `as_frames=False`, listas de tuplas).
+        """
+        try:
+            query, params = ExpenseRepository._expenses_query(**filters)
+            with DataManager.connection() as conn:
+                cursor = conn.execute(query, params)
+                columns = [description[0] for description in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield DataManager.compact_dataframe(pd.DataFrame.from_records(rows, columns=columns)) if as_frames else rows
+                cursor.close()
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
+
+    @staticmethod
+    def count_expenses(search=None):
+        """Retorna a quantidade de despesas cadastradas (opcionalmente, só as encontradas pela busca `search`)."""
+        try:
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
+                match = ExpenseRepository.fts_query(search)
+                if match:
+                    cursor.execute("SELECT COUNT(*) FROM expense_fts WHERE expense_fts MATCH ?;", (match,))
+                else:
+                    cursor.execute("SELECT COUNT(*) FROM expense;")
+                return cursor.fetchone()[0]
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
+            return 0
+
     @staticmethod
     def save_expense(expense: Expense):
         try:
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute(
-                '''
-                    INSERT INTO expense (
-                        exp_date, 
-                        exp_value, 
-                        exp_description, 
-                        exp_type_id, 
-                        exp_pay_id, 
-                        exp_number_of_installments, 
-                        exp_final_date_of_installment,
-                        exp_value_total_installment
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?);
-                ''', (
-                        expense.exp_date,
-                        float(expense.exp_value),
-                        str(expense.exp_description),
-                        int(expense.exp_type_id),
-                        int(expense.exp_pay_id),
-                        int(expense.exp_number_of_installments),
-                        expense.exp_final_date_of_installment,
-                        float(expense.exp_value_total_installments)
+                cursor.execute(
+                    '''
+                        INSERT INTO expense (
+                            exp_date, 
+                            exp_value_cents, 
+                            exp_description, 
+                            exp_type_id, 
+                            exp_pay_id, 
+                            exp_number_of_installments, 
+                            exp_final_date_of_installment,
+                            exp_value_total_installment_cents
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+                    ''', (
+                            expense.exp_date,
+                            int(expense.exp_value_cents),
+                            str(expense.exp_description),
+                            int(expense.exp_type_id),
+                            int(expense.exp_pay_id),
+                            int(expense.exp_number_of_installments),
+                            expense.exp_final_date_of_installment,
+                            int(expense.exp_value_total_installments_cents)
+                    )
                 )
-            )
+                DataManager.sync_expense_installments(cursor, cursor.lastrowid)
             
-            conn.commit()
-            return True
+                DataManager.bump_table_version(cursor, "expense")
+                conn.commit()
+                return True
         except Exception as e:
             st.error(f"Ocorreu um erro ao salvar o tipo: {e}")
             return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
     
+    @staticmethod
+    def _expense_to_row(expense: Expense):
+        return (
+            expense.exp_date,
+            int(expense.exp_value_cents),
+            str(expense.exp_description),
+            int(expense.exp_type_id),
+            int(expense.exp_pay_id),
+            int(expense.exp_number_of_installments),
+            expense.exp_final_date_of_installment,
+            int(expense.exp_value_total_installments_cents)
+        )
+
+    @staticmethod
+    def bulk_insert_expenses(expenses):
+        """
+        Insere muitas despesas numa única transação, via `executemany`, e gera o livro de
+        parcelas das despesas novas.
+
+        Args:
+            expenses (iterable): Objetos `Expense` ou tuplas na ordem (exp_date, exp_value_cents,
+                exp_description, exp_type_id, exp_pay_id, exp_number_of_installments,
+                exp_final_date_of_installment, exp_value_total_installment_cents), com os
+                valores em centavos inteiros. Pode ser um gerador; as linhas são consumidas
+                sem serem carregadas todas na memória.
+
+        Returns:
+            int: Quantidade de despesas inseridas, ou False em caso de erro.
+        """
+        rows = (
+            ExpenseRepository._expense_to_row(expense) if isinstance(expense, Expense) else expense
+            for expense in expenses
+        )
+        try:
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("SELECT COALESCE(MAX(exp_id), 0) FROM expense;")
+                last_id = cursor.fetchone()[0]
+
+                cursor.executemany(
+                    '''
+                        INSERT INTO expense (
+                            exp_date,
+                            exp_value_cents,
+                            exp_description,
+                            exp_type_id,
+                            exp_pay_id,
+                            exp_number_of_installments,
+                            exp_final_date_of_installment,
+                            exp_value_total_installment_cents
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+                    ''', rows
+                )
+                inserted = cursor.rowcount
+                DataManager.sync_expense_installments(cursor, after_exp_id=last_id)
+
+                DataManager.bump_table_version(cursor, "expense")
+                conn.commit()
+                return inserted
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao salvar as despesas: {e}")
+            return False
+
     @staticmethod
     def update_expense(expense: Expense):
         try:
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute(
-                '''
-                    UPDATE expense 
-                    SET exp_date = ?, 
-                        exp_value = ?, 
-                        exp_description = ?, 
-                        exp_type_id = ?, 
-                        exp_pay_id = ?, 
-                        exp_number_of_installments = ?, 
-                        exp_final_date_of_installment = ?, 
-                        exp_value_total_installment = ?
-                    WHERE exp_id = ?;
-                ''',(
-                        expense.exp_date,
-                        float(expense.exp_value),
-                        str(expense.exp_description),
-                        int(expense.exp_type_id),
-                        int(expense.exp_pay_id),
-                        int(expense.exp_number_of_installments),
-                        expense.exp_final_date_of_installment,
-                        float(expense.exp_value_total_installments),
-                        int(expense.exp_id)
+                cursor.execute(
+                    '''
+                        UPDATE expense 
+                        SET exp_date = ?, 
+                            exp_value_cents = ?, 
+                            exp_description = ?, 
+                            exp_type_id = ?, 
+                            exp_pay_id = ?, 
+                            exp_number_of_installments = ?, 
+                            exp_final_date_of_installment = ?, 
+                            exp_value_total_installment_cents = ?
+                        WHERE exp_id = ?;
+                    ''',(
+                            expense.exp_date,
+                            int(expense.exp_value_cents),
+                            str(expense.exp_description),
+                            int(expense.exp_type_id),
+                            int(expense.exp_pay_id),
+                            int(expense.exp_number_of_installments),
+                            expense.exp_final_date_of_installment,
+                            int(expense.exp_value_total_installments_cents),
+                            int(expense.exp_id)
+                    )
                 )
-            )
+                DataManager.sync_expense_installments(cursor, expense.exp_id)
             
-            conn.commit()
-            return True
+                DataManager.bump_table_version(cursor, "expense")
+                conn.commit()
+                return True
         except Exception as e:
             st.error(f"Ocorreu um erro ao atualizar os dados: {e}")
             return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
 
     @staticmethod
     def delete_expense(exp_id):
         try:
             exp_id = int(exp_id)
 
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("PRAGMA foreign_keys = ON;")
-
-            cursor.execute(
-                '''
-                DELETE FROM expense
-                WHERE exp_id = ?; 
-                ''', 
-                (exp_id,)
-            )
+                cursor.execute("DELETE FROM expense_installment WHERE ins_exp_id = ?;", (exp_id,))
+                cursor.execute(
+                    '''
+                    DELETE FROM expense
+                    WHERE exp_id = ?; 
+                    ''', 
+                    (exp_id,)
+                )
             
-            conn.commit()
-            return True
+                DataManager.bump_table_version(cursor, "expense")
+                conn.commit()
+                return True
         except Exception as e:
             st.error(f"Ocorreu um erro inesperado ao deletar: {e}")
-            return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
\ No newline at end of file
+            return False
\ No newline at end of file
@@ -0,0 +1,209 @@
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+import sqlite3
+import time
+
+# Scripts de migração: sql/migrations na raiz do projeto
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql', 'migrations')
+
+# Mensagens das migrações aplicadas; a CLI do DataManager as exibe no console
+logger = logging.getLogger(__name__)
+
+
+class Migration:
+    """
+    Script de migração numerado, `NNNN_descricao.sql` ou `NNNN_descricao.py`.
+
+    Scripts .sql podem ter vários comandos (inclusive CREATE TRIGGER ... BEGIN ... END;).
+    Scripts .py definem `upgrade(cursor)`, para migrações que dependem do estado do banco; o SQL
+    fica no próprio script, sem importar código da aplicação, e as mensagens vão para o logger
+    do módulo (`migrations.NNNN_descricao`). Com `FOREIGN_KEYS = False` no módulo, a migração roda
+    com as chaves estrangeiras desligadas (necessário para reconstruir uma tabela referenciada)
+    e é validada com `PRAGMA foreign_key_check` antes do commit.
+    """
+
+    FILENAME = re.compile(r'^(\d{4})_(\w+)\.(sql|py)$')
+
+    def __init__(self, path):
+        match = self.FILENAME.match(os.path.basename(path))
+        if not match:
+            raise ValueError(f"Nome de migração inválido: {path}")
+        self.path = path
+        self.version = int(match.group(1))
+        self.name = match.group(2)
+        self.kind = match.group(3)
+        with open(path, 'rb') as file:
+            # Sem \r: o checksum não muda com o fim de linha do checkout
+            self.content = file.read().replace(b'\r\n', b'\n')
+        self.checksum = hashlib.sha256(self.content).hexdigest()
+        self._module = None
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.name}"
+
+    @property
+    def module(self):
+        """Módulo Python da migração (carregado no primeiro acesso)."""
+        if self._module is None:
+            spec = importlib.util.spec_from_file_location(f"migrations.{self}", self.path)
+            self._module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self._module)
+        return self._module
+
+    @property
+    def foreign_keys(self):
+        return self.kind == 'sql' or getattr(self.module, 'FOREIGN_KEYS', True)
+
+    def statements(self):
+        """Divide o script .sql em comandos completos, na ordem do arquivo."""
+        statements, buffer = [], ''
+        for line in self.content.decode('utf-8').splitlines(keepends=True):
+            buffer += line
+            if sqlite3.complete_statement(buffer):
+                statements.append(buffer.strip())
+                buffer = ''
+        if any(line.strip() and not line.strip().startswith('--') for line in buffer.splitlines()):
+            raise ValueError(f"Comando incompleto no fim da migração {self}.")
+        return statements
+
+    def run(self, cursor):
+        if self.kind == 'sql':
+            for statement in self.statements():
+                cursor.execute(statement)
+        else:
+            self.module.upgrade(cursor)
+
+
+class MigrationRunner:
+    """
+    Aplica em ordem as migrações de `sql/migrations` ainda não registradas na tabela
+    `schema_migrations` do banco.
+
+    Cada migração roda na sua própria transação (BEGIN IMMEDIATE), junto com o registro em
+    `schema_migrations` e com `PRAGMA user_version` (número da última migração aplicada, lido
+    por `DataManager.bootstrap`): ou a migração é aplicada por inteiro, ou o banco fica como
+    estava. Com WAL, as leituras continuam durante a migração (inclusive durante a criação de
+    índices); apenas outras escritas esperam o commit.
+
+    As migrações devem ser idempotentes (IF NOT EXISTS, conversões condicionais), para que
+    bancos criados antes desta tabela possam ser registrados aplicando todas desde a primeira.
+    Uma migração já aplicada nunca é alterada: mudanças no esquema entram em uma nova.
+
+    Uso:
+        with DataManager.connection() as conn:
+            MigrationRunner().migrate(conn)
+    """
+
+    def __init__(self, directory=MIGRATIONS_DIR):
+        self.directory = directory
+        self.migrations = self._discover()
+
+    def _discover(self):
+        migrations = sorted(
+            (Migration(os.path.join(self.directory, name)) for name in os.listdir(self.directory)
+             if Migration.FILENAME.match(name)),
+            key=lambda migration: migration.version
+        )
+        versions = [migration.version for migration in migrations]
+        duplicated = sorted({version for version in versions if versions.count(version) > 1})
+        if duplicated:
+            raise ValueError(f"Migrações com o mesmo número: {duplicated}")
+        return migrations
+
+    @property
+    def latest_version(self):
+        """Número da última migração disponível (0 se não houver nenhuma)."""
+        return self.migrations[-1].version if self.migrations else 0
+
+    @staticmethod
+    def _create_table(conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                mig_version INTEGER PRIMARY KEY,
+                mig_name TEXT NOT NULL,
+                mig_checksum TEXT NOT NULL,
+                mig_applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                mig_duration_ms REAL
+            );
+        ''')
+        conn.commit()
+
+    def applied(self, conn):
+        """Retorna {versão: (nome, checksum, data de aplicação)} das migrações já aplicadas."""
+        self._create_table(conn)
+        rows = conn.execute("SELECT mig_version, mig_name, mig_checksum, mig_applied_at FROM schema_migrations;")
+        return {row[0]: row[1:] for row in rows}
+
+    def pending(self, conn):
+        """Migrações disponíveis ainda não aplicadas, em ordem."""
+        applied = self.applied(conn)
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    def status(self, conn):
+        """
+        Situação de cada migração disponível: 'aplicada', 'pendente' ou 'alterada' (o arquivo
+        mudou depois de aplicado).
+
+        Returns:
+            list: Tuplas (migração, situação, data de aplicação ou None).
+        """
+        applied = self.applied(conn)
+        result = []
+        for migration in self.migrations:
+            if migration.version not in applied:
+                result.append((migration, 'pendente', None))
+            else:
+                _, checksum, applied_at = applied[migration.version]
+                result.append((migration, 'aplicada' if checksum == migration.checksum else 'alterada', applied_at))
+        return result
+
+    def migrate(self, conn, target=None):
+        """
+        Aplica as migrações pendentes (até `target`, se informado), uma transação por migração.
+
+        Returns:
+            list: Migrações aplicadas nesta chamada.
+        """
+        for migration, state, _ in self.status(conn):
+            if state == 'alterada':
+                logger.warning("A migração %s foi alterada depois de aplicada.", migration)
+
+        applied = []
+        for migration in self.pending(conn):
+            if target is not None and migration.version > target:
+                break
+            self._apply(conn, migration)
+            applied.append(migration)
+        return applied
+
+    def _apply(self, conn, migration):
+        # PRAGMA foreign_keys não tem efeito dentro de uma transação
+        conn.commit()
+        if not migration.foreign_keys:
+            conn.execute("PRAGMA foreign_keys = OFF;")
+
+        start = time.perf_counter()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE;")
+            migration.run(cursor)
+            if not migration.foreign_keys and cursor.execute("PRAGMA foreign_key_check;").fetchone():
+                raise Exception("a migração deixou registros com chave estrangeira inválida.")
+
+            duration = (time.perf_counter() - start) * 1000
+            cursor.execute(
+                "INSERT INTO schema_migrations (mig_version, mig_name, mig_checksum, mig_duration_ms) VALUES (?, ?, ?, ?);",
+                (migration.version, migration.name, migration.checksum, duration)
+            )
+            cursor.execute(f"PRAGMA user_version = {int(migration.version)};")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Erro na migração {migration}: {e}") from e
+        finally:
+            if not migration.foreign_keys:
+                conn.execute("PRAGMA foreign_keys = ON;")
+        logger.info("Migração %s aplicada em %.0f ms.", migration, duration)
@@ -1,23 +1,24 @@
+import sqlite3
 from repositories.database_repository import DataManager
 import pandas as pd
 import streamlit as st
 
 class PaymentRepository:
     @staticmethod
-    def load_payments():
-        """Carrega os pagamentos do banco de dados como DataFrame."""
+    def load_payments(columns=None):
+        """
+        Carrega os pagamentos do banco de dados como DataFrame. `columns` restringe a projeção
+        a colunas pay_*; os tipos retornados são compactos (ver `DataManager.read_dataframe`).
+        """
         try:
             # Obter conexão do banco de dados
-            conn = DataManager.get_connection()
-            
-            # Executar a consulta SQL
-            query = "SELECT * FROM payment;"
-            payments_df = pd.read_sql_query(query, conn)
-            
-            # Fechar a conexão
-            conn.close()
-            
-            return payments_df
+            with DataManager.connection() as conn:
+                # Executar a consulta SQL
+                select = ", ".join(DataManager.qualify_columns(columns, {'pay_': 'p'})) if columns else "*"
+                query = f"SELECT {select} FROM payment p;"
+                payments_df = DataManager.read_dataframe(conn, query)
+
+                return payments_df
         except Exception as e:
             # Exibir mensagem de erro no Streamlit em caso de falha
             st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
@@ -28,21 +29,23 @@ class PaymentRepository:
         """Adiciona um novo pagamento ao banco de dados."""
         try:
             # Obter conexão com o banco de dados
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
             
-            # Executar a inserção
-            cursor.execute(
-                '''
-                INSERT INTO payment (pay_name, pay_description) 
-                VALUES (?, ?);
-                ''', 
-                (pay_name, pay_description)
-            )
+                # Executar a inserção
+                cursor.execute(
+                    '''
+                    INSERT INTO payment (pay_name, pay_description) 
+                    VALUES (?, ?);
+                    ''', 
+                    (pay_name, pay_description)
+                )
             
-            # Confirmar a transação
-            conn.commit()
-            return True  # Indica sucesso
+                DataManager.bump_table_version(cursor, "payment")
+
+                # Confirmar a transação
+                conn.commit()
+                return True  # Indica sucesso
         except Exception as e:
             # Verificar se o erro é de restrição UNIQUE
             if "UNIQUE constraint failed" in str(e):
@@ -50,10 +53,6 @@ class PaymentRepository:
             else:
                 st.error(f"Ocorreu um erro ao salvar o pagamento: {e}")
             return False  # Indica erro
-        finally:
-            # Garantir que a conexão será fechada
-            if 'conn' in locals() and conn:
-                conn.close()
 
     @staticmethod
     def update_payment(pay_id, new_name, new_description):
@@ -65,22 +64,24 @@ class PaymentRepository:
             pay_id = int(pay_id)
             
             # Obter conexão com o banco de dados
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
             
-            # Executar a atualização
-            cursor.execute(
-                '''
-                UPDATE payment 
-                SET pay_name = ?, pay_description = ? 
-                WHERE pay_id = ?;
-                ''',
-                (new_name, new_description, pay_id)
-            )
+                # Executar a atualização
+                cursor.execute(
+                    '''
+                    UPDATE payment 
+                    SET pay_name = ?, pay_description = ? 
+                    WHERE pay_id = ?;
+                    ''',
+                    (new_name, new_description, pay_id)
+                )
             
-            # Confirmar a transação
-            conn.commit()
-            return True  # Indica sucesso
+                DataManager.bump_table_version(cursor, "payment")
+
+                # Confirmar a transação
+                conn.commit()
+                return True  # Indica sucesso
         except Exception as e:
             # Verificar se o erro é de restrição UNIQUE
             if "UNIQUE constraint failed" in str(e):
@@ -88,10 +89,6 @@ class PaymentRepository:
             else:
                 st.error(f"Ocorreu um erro ao atualizar os dados: {e}")
             return False  # Indica erro
-        finally:
-            # Garantir que a conexão será fechada
-            if 'conn' in locals() and conn:
-                conn.close()
 
     @staticmethod
     def delete_payment(pay_id):
@@ -103,25 +100,24 @@ class PaymentRepository:
             pay_id = int(pay_id)
 
             # Obter conexão com o banco de dados
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
 
-            # Habilitar chaves estrangeiras, se necessário
-            cursor.execute("PRAGMA foreign_keys = ON;")
-
-            # Executar o comando de exclusão
-            cursor.execute(
-                '''
-                DELETE FROM payment 
-                WHERE pay_id = ?;
-                ''', 
-                (pay_id,)
-            )
+                # Executar o comando de exclusão
+                cursor.execute(
+                    '''
+                    DELETE FROM payment 
+                    WHERE pay_id = ?;
+                    ''', 
+                    (pay_id,)
+                )
             
-            # Confirmar a transação
-            conn.commit()
-            return True  # Indica sucesso
-        except conn.IntegrityError as e:
+                DataManager.bump_table_version(cursor, "payment", cascade=True)
+
+                # Confirmar a transação
+                conn.commit()
+                return True  # Indica sucesso
+        except sqlite3.IntegrityError as e:
             # Verifica se o erro é relacionado a falha em chave estrangeira
             if "FOREIGN KEY constraint failed" in str(e):
                 st.error(
@@ -135,8 +131,4 @@ class PaymentRepository:
         except Exception as e:
             # Captura qualquer erro inesperado (não relacionado à integridade)
             st.error(f"Ocorreu um erro inesperado ao deletar: {e}")
-            return False  # Indica erro genérico
-        finally:
-            # Garantir que a conexão será fechada
-            if 'conn' in locals() and conn:
-                conn.close()
\ No newline at end of file
+            return False  # Indica erro genérico
\ No newline at end of file
@@ -0,0 +1,103 @@
+from repositories.database_repository import DataManager
+import pandas as pd
+import streamlit as st
+
+class ReportRepository:
+    """
+    Consultas agregadas (GROUP BY no SQL) usadas pelo dashboard. Retornam apenas as linhas
+    agregadas, nunca o histórico de despesas.
+
+    Os totais por dia e por mês vêm das tabelas de resumo `summary_daily` e `summary_monthly`
+    (mantidas por triggers, ver sql/migrations/0004_summary_tables.py): o custo depende da
+    quantidade de períodos, não da quantidade de despesas. As somas são feitas em centavos
+    inteiros (exatas) e convertidas para reais só no resultado.
+    """
+
+    # Rótulos do tipo de pagamento (coluna 'Tipo' / 'Tipo de Pagamento' dos resultados)
+    CREDIT = 'Crédito'
+    CASH = 'À Vista'
+
+    PAYMENT_KIND = "CASE WHEN s.sm_credit = 1 THEN ? ELSE ? END"
+
+    @staticmethod
+    def _read(query, params):
+        try:
+            with DataManager.connection() as conn:
+                return pd.read_sql_query(query, conn, params=params)
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
+            return pd.DataFrame()
+
+    @staticmethod
+    def _monthly(select, group_by, data_inicio, data_fim, cash_only, extra_params=(), having=""):
+        query = f"""
+            SELECT {select}
+            FROM summary_monthly s
+            JOIN type t ON s.sm_type_id = t.type_id
+            LEFT JOIN category c ON s.sm_cat_id = c.cat_id
+            WHERE s.sm_month BETWEEN date(?, 'start of month') AND ?{" AND s.sm_credit = 0" if cash_only else ""}
+            GROUP BY {group_by}
+            {having}
+            ORDER BY {group_by};
+        """
+        return ReportRepository._read(query, (*extra_params, str(data_inicio), str(data_fim)))
+
+    @staticmethod
+    def monthly_by_payment_kind(data_inicio, data_fim, cash_only=False):
+        """Soma das parcelas por mês e tipo de pagamento. Colunas: month, payment_kind, total."""
+        return ReportRepository._monthly(
+            f"s.sm_month AS month, {ReportRepository.PAYMENT_KIND} AS payment_kind, SUM(s.sm_total_cents) / 100.0 AS total",
+            "month, payment_kind", data_inicio, data_fim, cash_only,
+            extra_params=(ReportRepository.CREDIT, ReportRepository.CASH)
+        )
+
+    @staticmethod
+    def monthly_by_type(data_inicio, data_fim, cash_only=False):
+        """Soma positiva das parcelas por mês e tipo de despesa. Colunas: month, type_name, total."""
+        return ReportRepository._monthly(
+            "s.sm_month AS month, t.type_name, SUM(s.sm_total_cents) / 100.0 AS total",
+            "month, t.type_name", data_inicio, data_fim, cash_only,
+            having="HAVING SUM(s.sm_total_cents) > 0"
+        )
+
+    @staticmethod
+    def by_category_payment_kind(data_inicio, data_fim, cash_only=False):
+        """Soma das parcelas do período por categoria e tipo de pagamento. Colunas: cat_name, payment_kind, total."""
+        return ReportRepository._monthly(
+            f"c.cat_name, {ReportRepository.PAYMENT_KIND} AS payment_kind, SUM(s.sm_total_cents) / 100.0 AS total",
+            "c.cat_name, payment_kind", data_inicio, data_fim, cash_only,
+            extra_params=(ReportRepository.CREDIT, ReportRepository.CASH),
+            having="HAVING c.cat_name IS NOT NULL"
+        )
+
+    @staticmethod
+    def daily_by_type(data_inicio, data_fim, cash_only=False):
+        """Soma das compras feitas no período por dia e tipo de despesa. Colunas: day, type_name, total."""
+        query = f"""
+            SELECT s.sd_day AS day, t.type_name, SUM(s.sd_total_cents) / 100.0 AS total
+            FROM summary_daily s
+            JOIN type t ON s.sd_type_id = t.type_id
+            WHERE s.sd_day BETWEEN ? AND ?{" AND s.sd_credit = 0" if cash_only else ""}
+            GROUP BY day, t.type_name
+            ORDER BY day, t.type_name;
+        """
+        return ReportRepository._read(query, (str(data_inicio), str(data_fim)))
+
+    @staticmethod
+    def credit_installments_by_month(data_inicio, data_fim):
+        """
+        Soma, por mês, de todas as parcelas (sem filtro de mês) das compras a crédito que têm
+        alguma parcela no período. Colunas: month, total.
+        """
+        query = """
+            SELECT i.ins_month AS month, SUM(i.ins_value_cents) / 100.0 AS total
+            FROM expense_installment i
+            JOIN expense e ON i.ins_exp_id = e.exp_id
+            WHERE e.exp_number_of_installments > 0
+              AND e.exp_id IN (
+                  SELECT ins_exp_id FROM expense_installment
+                  WHERE ins_month BETWEEN date(?, 'start of month') AND ?)
+            GROUP BY month
+            ORDER BY month;
+        """
+        return ReportRepository._read(query, (str(data_inicio), str(data_fim)))
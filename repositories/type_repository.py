@@ -1,22 +1,25 @@
+import sqlite3
 from repositories.database_repository import DataManager
 import pandas as pd
 import streamlit as st
 
 class TypeRepository:
     @staticmethod
-    def load_types():
+    def load_types(columns=None):
+        """
+        Carrega os tipos com a sua categoria. `columns` restringe a projeção a colunas
+        type_* e cat_*; os tipos retornados são compactos (ver `DataManager.read_dataframe`).
+        """
         try:
-            conn = DataManager.get_connection()
-            
-            query = """
-                SELECT * FROM type t
-                JOIN category c ON t.type_category_id = c.cat_id;
-                """
-            payments_df = pd.read_sql_query(query, conn)
-            
-            conn.close()
-            
-            return payments_df
+            with DataManager.connection() as conn:
+                select = ", ".join(DataManager.qualify_columns(columns, {'type_': 't', 'cat_': 'c'})) if columns else "*"
+                query = f"""
+                    SELECT {select} FROM type t
+                    JOIN category c ON t.type_category_id = c.cat_id;
+                    """
+                payments_df = DataManager.read_dataframe(conn, query)
+
+                return payments_df
         except Exception as e:
             st.error(f"Ocorreu um erro ao ler os dados: \n\n{e}")
             return pd.DataFrame()
@@ -24,27 +27,25 @@ class TypeRepository:
     @staticmethod
     def save_type(type_type, type_name, type_description, type_category_id):
         try:
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute('''
-                            INSERT INTO type (type_type, type_name, type_description, type_category_id)
-                           VALUES (?, ?, ?, ?);
-                           ''',
-                           (type_type, type_name, type_description, type_category_id)
-            )
+                cursor.execute('''
+                                INSERT INTO type (type_type, type_name, type_description, type_category_id)
+                               VALUES (?, ?, ?, ?);
+                               ''',
+                               (type_type, type_name, type_description, type_category_id)
+                )
             
-            conn.commit()
-            return True
+                DataManager.bump_table_version(cursor, "type")
+                conn.commit()
+                return True
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 st.error(f"Erro: O tipo '{type_name}' já existe.")
             else:
                 st.error(f"Ocorreu um erro ao salvar o tipo: {e}")
             return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
     
     @staticmethod
     def update_type(type_id, type_type, new_name, new_description, type_category_id):
@@ -52,50 +53,47 @@ class TypeRepository:
             type_id = int(type_id)
             type_category_id = int(type_category_id)
             
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute(
-                '''
-                UPDATE type SET type_type = ?, type_name = ?, type_description = ?, type_category_id = ?
-                WHERE type_id = ?;
-                ''',
-                (type_type, new_name, new_description, type_category_id, type_id)
-            )
+                cursor.execute(
+                    '''
+                    UPDATE type SET type_type = ?, type_name = ?, type_description = ?, type_category_id = ?
+                    WHERE type_id = ?;
+                    ''',
+                    (type_type, new_name, new_description, type_category_id, type_id)
+                )
             
-            conn.commit()
-            return True
+                DataManager.bump_table_version(cursor, "type")
+                conn.commit()
+                return True
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 st.error(f"Erro: O tipo '{new_name}' já existe.")
             else:
                 st.error(f"Ocorreu um erro ao atualizar os dados: {e}")
             return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
 
     @staticmethod
     def delete_type(type_id):
         try:
             type_id = int(type_id)
 
-            conn = DataManager.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("PRAGMA foreign_keys = ON;")
+            with DataManager.connection() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute(
-                '''
-                DELETE FROM type
-                WHERE type_id = ?; 
-                ''', 
-                (type_id,)
-            )
+                cursor.execute(
+                    '''
+                    DELETE FROM type
+                    WHERE type_id = ?; 
+                    ''', 
+                    (type_id,)
+                )
             
-            conn.commit()
-            return True
-        except conn.IntegrityError as e:
+                DataManager.bump_table_version(cursor, "type", cascade=True)
+                conn.commit()
+                return True
+        except sqlite3.IntegrityError as e:
             if "FOREIGN KEY constraint failed" in str(e):
                 st.error(
                     f"Erro: Não é possível deletar o tipo com ID {type_id} "
@@ -106,7 +104,4 @@ class TypeRepository:
             return False
         except Exception as e:
             st.error(f"Ocorreu um erro inesperado ao deletar: {e}")
-            return False
-        finally:
-            if 'conn' in locals() and conn:
-                conn.close()
\ No newline at end of file
+            return False
\ No newline at end of file
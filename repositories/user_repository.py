@@ -1,31 +1,67 @@
+import threading
+import time
+
 from repositories.database_repository import DataManager
 from models.user import User
 
 class UserRepository:
+    # Consulta do login. O texto fixo faz cada conexão do pool reaproveitar o statement já
+    # preparado (cache de statements do sqlite3), e a busca usa o índice UNIQUE de user_username.
+    SQL_BY_USERNAME = '''
+    SELECT user_id, user_username, user_password_hash FROM user WHERE user_username = ?
+    '''
+
+    # Nomes de usuário inexistentes consultados há pouco (nome -> expiração): tentativas
+    # repetidas com nomes errados não voltam ao banco. Um cadastro retira o nome da lista; a
+    # validade curta cobre usuários criados por outro processo. O login ainda verifica a senha
+    # contra um hash descartável (`User.verify_dummy`), então o cache não encurta a recusa.
+    NEGATIVE_TTL = 30.0
+    NEGATIVE_MAX_ENTRIES = 1024
+    _missing = {}
+    _missing_lock = threading.Lock()
+
     @staticmethod
     def create_user(username, password):
-        conn = DataManager.get_connection()
-        cursor = conn.cursor()
-        
-        password_hash = User.hash_password(password)
-        cursor.execute('''
-        INSERT INTO user (user_username, user_password_hash)
-        VALUES (?, ?)
-        ''', (username, password_hash))
-        
-        conn.commit()
-        conn.close()
+        with DataManager.connection() as conn:
+            cursor = conn.cursor()
+
+            password_hash = User.hash_password(password)
+            cursor.execute('''
+            INSERT INTO user (user_username, user_password_hash)
+            VALUES (?, ?)
+            ''', (username, password_hash))
+
+            conn.commit()
+
+        with UserRepository._missing_lock:
+            UserRepository._missing.pop(username, None)
 
     @staticmethod
     def get_user_by_username(username):
-        conn = DataManager.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM user WHERE user_username = ?', (username,))
-        row = cursor.fetchone()
-        conn.close()
-        
+        now = time.monotonic()
+        if UserRepository._missing.get(username, 0) > now:
+            return None
+
+        with DataManager.connection() as conn:
+            row = conn.execute(UserRepository.SQL_BY_USERNAME, (username,)).fetchone()
+
         if row:
             return User(user_id=row[0], username=row[1], password_hash=row[2])
+
+        with UserRepository._missing_lock:
+            if len(UserRepository._missing) >= UserRepository.NEGATIVE_MAX_ENTRIES:
+                UserRepository._missing = {
+                    name: expires for name, expires in UserRepository._missing.items() if expires > now
+                }
+                if len(UserRepository._missing) >= UserRepository.NEGATIVE_MAX_ENTRIES:
+                    UserRepository._missing.clear()
+            UserRepository._missing[username] = now + UserRepository.NEGATIVE_TTL
         return None
-    
+
+    @staticmethod
+    def update_password_hash(user_id, password_hash):
+        with DataManager.connection() as conn:
+            conn.execute('''
+            UPDATE user SET user_password_hash = ? WHERE user_id = ?
+            ''', (password_hash, user_id))
+            conn.commit()
@@ -1,66 +1,239 @@
--- Script para criação do banco de dados financial_control
+-- Esquema do banco financial_control, gerado a partir das migrações de sql/migrations com
+-- `python -m repositories.database_repository dump-schema`. Não edite: altere o esquema
+-- criando uma nova migração.
 
--- Tabela de Categorias (category)
-CREATE TABLE IF NOT EXISTS category (
+CREATE TABLE schema_migrations (
+    mig_version INTEGER PRIMARY KEY,
+    mig_name TEXT NOT NULL,
+    mig_checksum TEXT NOT NULL,
+    mig_applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    mig_duration_ms REAL
+);
+
+CREATE TABLE user (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_username TEXT UNIQUE NOT NULL,
+    user_password_hash TEXT NOT NULL,
+    user_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE category (
     cat_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    cat_type TEXT NOT NULL CHECK (cat_type IN ('produto', 'serviço', 'investimento', 'receita', 'despesa')),
-    cat_name TEXT NOT NULL UNIQUE,
-    cat_description TEXT
+    cat_type TEXT NOT NULL CHECK (cat_type IN ('expense', 'income', 'investment')),
+    cat_name TEXT NOT NULL,
+    cat_description TEXT,
+    UNIQUE (cat_type, cat_name)
+);
+
+CREATE TABLE type (
+    type_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type_type TEXT NOT NULL CHECK (type_type IN ('expense', 'income', 'investment')),
+    type_name TEXT NOT NULL,
+    type_description TEXT,
+    type_category_id INTEGER,
+    FOREIGN KEY (type_category_id) REFERENCES category(cat_id) ON DELETE CASCADE,
+    UNIQUE (type_type, type_name)
 );
 
--- Tabela de Pagamentos (payment)
-CREATE TABLE IF NOT EXISTS payment (
+CREATE TABLE payment (
     pay_id INTEGER PRIMARY KEY AUTOINCREMENT,
     pay_name TEXT NOT NULL UNIQUE,
     pay_description TEXT
 );
 
--- Tabela de Produtos (product)
-CREATE TABLE IF NOT EXISTS product (
-    prod_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    prod_name TEXT NOT NULL UNIQUE,
-    prod_description TEXT,
-    prod_category_id INTEGER,
-    FOREIGN KEY (prod_category_id) REFERENCES category(cat_id) ON DELETE CASCADE
-);
-
--- Tabela de Serviços (service)
-CREATE TABLE IF NOT EXISTS service (
-    ser_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    ser_name TEXT NOT NULL UNIQUE,
-    ser_description TEXT,
-    ser_category_id INTEGER,
-    FOREIGN KEY (ser_category_id) REFERENCES category(cat_id) ON DELETE CASCADE
+CREATE TABLE income (
+    inc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inc_date DATE NOT NULL,
+    inc_value REAL NOT NULL,
+    inc_description TEXT NOT NULL,
+    inc_type_id INTEGER,
+    FOREIGN KEY (inc_type_id) REFERENCES type(type_id) ON DELETE CASCADE
 );
 
--- Tabela de Investimentos (investment)
-CREATE TABLE IF NOT EXISTS investment (
+CREATE TABLE investment (
     inv_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    inv_description TEXT NOT NULL,
-    inv_amount REAL NOT NULL,
     inv_date DATE NOT NULL,
-    inv_category_id INTEGER,
-    FOREIGN KEY (inv_category_id) REFERENCES category(cat_id) ON DELETE CASCADE
+    inv_value REAL NOT NULL,
+    inv_description TEXT NOT NULL,
+    inv_type_id INTEGER,
+    inv_return_rate REAL DEFAULT 0.0,
+    inv_maturity_date DATE,
+    FOREIGN KEY (inv_type_id) REFERENCES type(type_id) ON DELETE CASCADE
 );
 
--- Tabela de Receitas (income)
-CREATE TABLE IF NOT EXISTS income (
-    inc_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    inc_description TEXT NOT NULL,
-    inc_amount REAL NOT NULL,
-    inc_date DATE NOT NULL,
-    inc_category_id INTEGER,
-    FOREIGN KEY (inc_category_id) REFERENCES category(cat_id) ON DELETE CASCADE
+CREATE TABLE table_version (
+    tv_table TEXT PRIMARY KEY,
+    tv_version INTEGER NOT NULL DEFAULT 0
 );
 
--- Tabela de Despesas (expense)
-CREATE TABLE IF NOT EXISTS expense (
+CREATE TABLE expense (
     exp_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    exp_description TEXT,
-    exp_amount REAL NOT NULL,
     exp_date DATE NOT NULL,
-    exp_payment_id INTEGER,
-    exp_category_id INTEGER,
-    FOREIGN KEY (exp_category_id) REFERENCES category(cat_id) ON DELETE CASCADE,
-    FOREIGN KEY (exp_payment_id) REFERENCES payment(pay_id) ON DELETE SET NULL
+    exp_value_cents INTEGER NOT NULL,
+    exp_description TEXT NOT NULL,
+    exp_type_id INTEGER,
+    exp_pay_id INTEGER,
+    exp_number_of_installments INTEGER DEFAULT 0,
+    exp_final_date_of_installment DATE,
+    exp_value_total_installment_cents INTEGER NOT NULL,
+    FOREIGN KEY (exp_type_id) REFERENCES type(type_id) ON DELETE CASCADE,
+    FOREIGN KEY (exp_pay_id) REFERENCES payment(pay_id) ON DELETE CASCADE
+);
+
+CREATE TABLE expense_installment (
+    ins_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ins_exp_id INTEGER NOT NULL,
+    ins_number INTEGER NOT NULL,
+    ins_month DATE NOT NULL,
+    ins_value_cents INTEGER NOT NULL,
+    FOREIGN KEY (ins_exp_id) REFERENCES expense(exp_id) ON DELETE CASCADE,
+    UNIQUE (ins_exp_id, ins_number)
+);
+
+CREATE TABLE summary_daily (
+    sd_day DATE NOT NULL,
+    sd_type_id INTEGER NOT NULL,
+    sd_cat_id INTEGER NOT NULL,
+    sd_pay_id INTEGER NOT NULL,
+    sd_credit INTEGER NOT NULL,
+    sd_total_cents INTEGER NOT NULL DEFAULT 0,
+    sd_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit)
+) WITHOUT ROWID;
+
+CREATE TABLE summary_monthly (
+    sm_month DATE NOT NULL,
+    sm_type_id INTEGER NOT NULL,
+    sm_cat_id INTEGER NOT NULL,
+    sm_pay_id INTEGER NOT NULL,
+    sm_credit INTEGER NOT NULL,
+    sm_total_cents INTEGER NOT NULL DEFAULT 0,
+    sm_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sm_month, sm_type_id, sm_cat_id, sm_pay_id, sm_credit)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE expense_fts USING fts5 (
+    exp_description,
+    content = 'expense',
+    content_rowid = 'exp_id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
 );
+
+CREATE INDEX idx_expense_date ON expense (exp_date);
+
+CREATE INDEX idx_expense_type ON expense (exp_type_id);
+
+CREATE INDEX idx_expense_pay ON expense (exp_pay_id);
+
+CREATE INDEX idx_expense_final_date ON expense (exp_final_date_of_installment);
+
+CREATE INDEX idx_expense_installment_month ON expense_installment (ins_month);
+
+CREATE INDEX idx_type_category ON type (type_category_id);
+
+CREATE INDEX idx_income_date ON income (inc_date);
+
+CREATE INDEX idx_income_type ON income (inc_type_id);
+
+CREATE INDEX idx_investment_date ON investment (inv_date);
+
+CREATE INDEX idx_investment_type ON investment (inv_type_id);
+
+CREATE TRIGGER trg_summary_daily_insert AFTER INSERT ON expense BEGIN
+    INSERT INTO summary_daily (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit, sd_total_cents, sd_count)
+    VALUES (
+        NEW.exp_date,
+        COALESCE(NEW.exp_type_id, 0),
+        COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = NEW.exp_type_id), 0),
+        COALESCE(NEW.exp_pay_id, 0),
+        COALESCE(NEW.exp_number_of_installments, 0) > 0,
+        NEW.exp_value_cents,
+        1
+    )
+    ON CONFLICT (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit) DO UPDATE
+    SET sd_total_cents = sd_total_cents + excluded.sd_total_cents, sd_count = sd_count + 1;
+END;
+
+CREATE TRIGGER trg_summary_daily_delete AFTER DELETE ON expense BEGIN
+    UPDATE summary_daily SET sd_total_cents = sd_total_cents - OLD.exp_value_cents, sd_count = sd_count - 1
+    WHERE sd_day = OLD.exp_date
+      AND (sd_type_id, sd_pay_id, sd_credit) = (SELECT
+          COALESCE(OLD.exp_type_id, 0), COALESCE(OLD.exp_pay_id, 0), COALESCE(OLD.exp_number_of_installments, 0) > 0);
+    DELETE FROM summary_daily WHERE sd_day = OLD.exp_date AND sd_count <= 0;
+END;
+
+CREATE TRIGGER trg_summary_daily_update
+AFTER UPDATE OF exp_date, exp_value_cents, exp_type_id, exp_pay_id, exp_number_of_installments ON expense BEGIN
+    UPDATE summary_daily SET sd_total_cents = sd_total_cents - OLD.exp_value_cents, sd_count = sd_count - 1
+    WHERE sd_day = OLD.exp_date
+      AND (sd_type_id, sd_pay_id, sd_credit) = (SELECT
+          COALESCE(OLD.exp_type_id, 0), COALESCE(OLD.exp_pay_id, 0), COALESCE(OLD.exp_number_of_installments, 0) > 0);
+    DELETE FROM summary_daily WHERE sd_day = OLD.exp_date AND sd_count <= 0;
+    INSERT INTO summary_daily (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit, sd_total_cents, sd_count)
+    VALUES (
+        NEW.exp_date,
+        COALESCE(NEW.exp_type_id, 0),
+        COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = NEW.exp_type_id), 0),
+        COALESCE(NEW.exp_pay_id, 0),
+        COALESCE(NEW.exp_number_of_installments, 0) > 0,
+        NEW.exp_value_cents,
+        1
+    )
+    ON CONFLICT (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit) DO UPDATE
+    SET sd_total_cents = sd_total_cents + excluded.sd_total_cents, sd_count = sd_count + 1;
+END;
+
+CREATE TRIGGER trg_summary_monthly_insert AFTER INSERT ON expense_installment BEGIN
+    INSERT INTO summary_monthly (sm_month, sm_type_id, sm_cat_id, sm_pay_id, sm_credit, sm_total_cents, sm_count)
+    SELECT
+        NEW.ins_month,
+        COALESCE(e.exp_type_id, 0),
+        COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = e.exp_type_id), 0),
+        COALESCE(e.exp_pay_id, 0),
+        COALESCE(e.exp_number_of_installments, 0) > 0,
+        NEW.ins_value_cents,
+        1
+    FROM expense e WHERE e.exp_id = NEW.ins_exp_id
+    ON CONFLICT (sm_month, sm_type_id, sm_cat_id, sm_pay_id, sm_credit) DO UPDATE
+    SET sm_total_cents = sm_total_cents + excluded.sm_total_cents, sm_count = sm_count + 1;
+END;
+
+CREATE TRIGGER trg_summary_monthly_delete AFTER DELETE ON expense_installment BEGIN
+    UPDATE summary_monthly SET sm_total_cents = sm_total_cents - OLD.ins_value_cents, sm_count = sm_count - 1
+    WHERE sm_month = OLD.ins_month
+      AND (sm_type_id, sm_pay_id, sm_credit) = (
+          SELECT COALESCE(e.exp_type_id, 0), COALESCE(e.exp_pay_id, 0), COALESCE(e.exp_number_of_installments, 0) > 0
+          FROM expense e WHERE e.exp_id = OLD.ins_exp_id);
+    DELETE FROM summary_monthly WHERE sm_month = OLD.ins_month AND sm_count <= 0;
+END;
+
+CREATE TRIGGER trg_expense_installments_before_update
+BEFORE UPDATE OF exp_date, exp_value_cents, exp_type_id, exp_pay_id, exp_number_of_installments ON expense BEGIN
+    DELETE FROM expense_installment WHERE ins_exp_id = OLD.exp_id;
+END;
+
+CREATE TRIGGER trg_expense_installments_before_delete BEFORE DELETE ON expense BEGIN
+    DELETE FROM expense_installment WHERE ins_exp_id = OLD.exp_id;
+END;
+
+CREATE TRIGGER trg_summary_type_category AFTER UPDATE OF type_category_id ON type BEGIN
+    UPDATE summary_daily SET sd_cat_id = COALESCE(NEW.type_category_id, 0) WHERE sd_type_id = NEW.type_id;
+    UPDATE summary_monthly SET sm_cat_id = COALESCE(NEW.type_category_id, 0) WHERE sm_type_id = NEW.type_id;
+END;
+
+CREATE TRIGGER trg_expense_fts_insert
+AFTER INSERT ON expense BEGIN
+    INSERT INTO expense_fts (rowid, exp_description) VALUES (NEW.exp_id, NEW.exp_description);
+END;
+
+CREATE TRIGGER trg_expense_fts_delete
+AFTER DELETE ON expense BEGIN
+    INSERT INTO expense_fts (expense_fts, rowid, exp_description) VALUES ('delete', OLD.exp_id, OLD.exp_description);
+END;
+
+CREATE TRIGGER trg_expense_fts_update
+AFTER UPDATE OF exp_description ON expense BEGIN
+    INSERT INTO expense_fts (expense_fts, rowid, exp_description) VALUES ('delete', OLD.exp_id, OLD.exp_description);
+    INSERT INTO expense_fts (rowid, exp_description) VALUES (NEW.exp_id, NEW.exp_description);
+END;
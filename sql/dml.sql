@@ -1,39 +1,42 @@
+-- Dados de exemplo para o esquema de sql/ddl.sql (os mesmos cadastros de
+-- DataManager._populate_database, mais algumas despesas, receitas e investimentos).
+-- Valores das despesas em centavos inteiros.
+
 -- Inserindo dados na tabela category (categorias)
 INSERT INTO category (cat_type, cat_name, cat_description) VALUES
-('produto', 'Eletrônicos', 'Produtos eletrônicos como celulares, tablets, etc.'),
-('serviço', 'Consultoria', 'Serviços de consultoria em tecnologia'),
-('investimento', 'Tesouro Direto', 'Investimentos em títulos públicos'),
-('receita', 'Salário', 'Receita proveniente do salário mensal'),
-('despesa', 'Aluguel', 'Despesas relacionadas ao pagamento de aluguel');
+('expense', 'Alimentação', 'Despesas com alimentação e restaurantes'),
+('expense', 'Transporte', 'Despesas com transporte público ou combustível'),
+('income', 'Salário', 'Rendimentos mensais do trabalho'),
+('income', 'Freelance', 'Rendimentos de trabalhos autônomos'),
+('investment', 'Ações', 'Investimento em mercado de ações'),
+('investment', 'Renda Fixa', 'Investimento em títulos de renda fixa');
+
+-- Inserindo dados na tabela type (tipos)
+INSERT INTO type (type_type, type_name, type_description, type_category_id) VALUES
+('expense', 'Supermercado', 'Gastos com compras de supermercado', 1),
+('expense', 'Posto de Gasolina', 'Gastos com combustível', 2),
+('income', 'Bônus', 'Recebimentos extras além do salário', 3),
+('investment', 'Tesouro Direto', 'Investimentos no Tesouro Nacional', 6);
 
 -- Inserindo dados na tabela payment (métodos de pagamento)
 INSERT INTO payment (pay_name, pay_description) VALUES
-('PIX', 'Pagamento instantâneo via PIX'),
-('Dinheiro', 'Pagamento em espécie'),
-('Cartão de Crédito', 'Pagamento com cartão de crédito'),
-('Cartão de Débito', 'Pagamento com cartão de débito');
-
--- Inserindo dados na tabela product (produtos)
-INSERT INTO product (prod_name, prod_description, prod_category_id) VALUES
-('Smartphone', 'Celular modelo X com 128GB de memória', 1),
-('Notebook', 'Laptop com 16GB de RAM e 512GB SSD', 1);
+('Cartão de Crédito', 'Pagamentos feitos com cartão de crédito'),
+('Cartão de Débito', 'Pagamentos feitos com cartão de débito'),
+('Dinheiro', 'Pagamentos realizados em dinheiro'),
+('Transferência Bancária', 'Pagamentos realizados por transferência');
 
--- Inserindo dados na tabela service (serviços)
-INSERT INTO service (ser_name, ser_description, ser_category_id) VALUES
-('Consultoria em TI', 'Serviço de consultoria em tecnologia da informação', 2),
-('Suporte Técnico', 'Serviço de suporte técnico para empresas', 2);
-
--- Inserindo dados na tabela investment (investimentos)
-INSERT INTO investment (inv_description, inv_amount, inv_date, inv_category_id) VALUES
-('Compra de ações', 1000.00, '2024-01-10', 3),
-('Investimento em Tesouro Direto', 500.00, '2024-02-15', 3);
+-- Inserindo dados na tabela expense (despesas). O livro de parcelas, os resumos e o índice de
+-- busca são atualizados pelos triggers; o de parcelas é regravado pelo repositório
+-- (`python -m repositories.database_repository rebuild-installments` após esta carga).
+INSERT INTO expense (exp_date, exp_value_cents, exp_description, exp_type_id, exp_pay_id,
+                     exp_number_of_installments, exp_final_date_of_installment, exp_value_total_installment_cents) VALUES
+('2024-01-05', 35090, 'Compras do mês', 1, 2, 0, NULL, 35090),
+('2024-02-10', 20000, 'Combustível parcelado', 2, 1, 3, '2024-04-10', 60000);
 
 -- Inserindo dados na tabela income (receitas)
-INSERT INTO income (inc_description, inc_amount, inc_date, inc_category_id) VALUES
-('Salário de Janeiro', 5000.00, '2024-01-31', 4),
-('Freelance de Desenvolvimento', 1200.00, '2024-02-10', 4);
+INSERT INTO income (inc_date, inc_value, inc_description, inc_type_id) VALUES
+('2024-01-31', 500.00, 'Bônus de Janeiro', 3);
 
--- Inserindo dados na tabela expense (despesas)
-INSERT INTO expense (exp_description, exp_amount, exp_date, exp_payment_id, exp_category_id) VALUES
-('Aluguel de Janeiro', 1500.00, '2024-01-05', 2, 5),
-('Compra de Smartphone', 2000.00, '2024-02-10', 3, 1);
+-- Inserindo dados na tabela investment (investimentos)
+INSERT INTO investment (inv_date, inv_value, inv_description, inv_type_id, inv_return_rate, inv_maturity_date) VALUES
+('2024-02-15', 500.00, 'Investimento em Tesouro Direto', 4, 0.1, '2029-01-01');
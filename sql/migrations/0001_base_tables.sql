@@ -0,0 +1,63 @@
+-- Tabelas de cadastro, receitas, investimentos e controle de versão dos dados.
+-- A tabela de despesas e as derivadas dela vêm nas migrações seguintes.
+
+CREATE TABLE IF NOT EXISTS user (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_username TEXT UNIQUE NOT NULL,
+    user_password_hash TEXT NOT NULL,
+    user_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS category (
+    cat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cat_type TEXT NOT NULL CHECK (cat_type IN ('expense', 'income', 'investment')),
+    cat_name TEXT NOT NULL,
+    cat_description TEXT,
+    UNIQUE (cat_type, cat_name)
+);
+
+CREATE TABLE IF NOT EXISTS type (
+    type_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type_type TEXT NOT NULL CHECK (type_type IN ('expense', 'income', 'investment')),
+    type_name TEXT NOT NULL,
+    type_description TEXT,
+    type_category_id INTEGER,
+    FOREIGN KEY (type_category_id) REFERENCES category(cat_id) ON DELETE CASCADE,
+    UNIQUE (type_type, type_name)
+);
+
+CREATE TABLE IF NOT EXISTS payment (
+    pay_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pay_name TEXT NOT NULL UNIQUE,
+    pay_description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS income (
+    inc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inc_date DATE NOT NULL,
+    inc_value REAL NOT NULL,
+    inc_description TEXT NOT NULL,
+    inc_type_id INTEGER,
+    FOREIGN KEY (inc_type_id) REFERENCES type(type_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS investment (
+    inv_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inv_date DATE NOT NULL,
+    inv_value REAL NOT NULL,
+    inv_description TEXT NOT NULL,
+    inv_type_id INTEGER,
+    inv_return_rate REAL DEFAULT 0.0,
+    inv_maturity_date DATE,
+    FOREIGN KEY (inv_type_id) REFERENCES type(type_id) ON DELETE CASCADE
+);
+
+-- Versão de dados de cada tabela, incrementada pelos repositórios a cada escrita
+-- (ver DataManager.bump_table_version)
+CREATE TABLE IF NOT EXISTS table_version (
+    tv_table TEXT PRIMARY KEY,
+    tv_version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO table_version (tv_table) VALUES
+    ('category'), ('type'), ('payment'), ('expense'), ('income'), ('investment');
@@ -0,0 +1,74 @@
+"""
+Tabela `expense` com valores em centavos inteiros: somas exatas no SQL e no NumPy (int64), sem
+o acúmulo de erro do REAL. Os repositórios convertem para reais.
+
+Bancos com valores em REAL (exp_value, exp_value_total_installment) são convertidos
+reconstruindo a tabela. As tabelas derivadas (livro de parcelas, resumos e índice de busca) e
+os seus triggers são descartados; as migrações seguintes os recriam a partir das despesas
+convertidas. Os ids e a sequência do AUTOINCREMENT são preservados.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# O DROP TABLE apagaria em cascata as linhas que referenciam as despesas
+FOREIGN_KEYS = False
+
+SQL_EXPENSE = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        exp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        exp_date DATE NOT NULL,
+        exp_value_cents INTEGER NOT NULL,
+        exp_description TEXT NOT NULL,
+        exp_type_id INTEGER,
+        exp_pay_id INTEGER,
+        exp_number_of_installments INTEGER DEFAULT 0,
+        exp_final_date_of_installment DATE,
+        exp_value_total_installment_cents INTEGER NOT NULL,
+        FOREIGN KEY (exp_type_id) REFERENCES type(type_id) ON DELETE CASCADE,
+        FOREIGN KEY (exp_pay_id) REFERENCES payment(pay_id) ON DELETE CASCADE
+    );
+'''
+
+
+def upgrade(cursor):
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(expense);")]
+    if "exp_value" not in columns:
+        cursor.execute(SQL_EXPENSE.format(table="expense"))
+        return
+
+    triggers = cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+        "AND tbl_name IN ('expense', 'expense_installment', 'type');"
+    ).fetchall()
+    for (name,) in triggers:
+        cursor.execute(f"DROP TRIGGER {name};")
+    for table in ("expense_fts", "summary_daily", "summary_monthly", "expense_installment"):
+        cursor.execute(f"DROP TABLE IF EXISTS {table};")
+
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'expense';")
+    sequence = cursor.fetchone()
+
+    cursor.execute(SQL_EXPENSE.format(table="expense_cents"))
+    # Arredonda o valor decimal para centavos antes de multiplicar: ROUND(x * 100) sozinho erra
+    # o meio centavo de valores como 1.005, cujo float é 1.00499... (mesma regra de
+    # utils.money.to_cents)
+    cursor.execute('''
+        INSERT INTO expense_cents (
+            exp_id, exp_date, exp_value_cents, exp_description, exp_type_id, exp_pay_id,
+            exp_number_of_installments, exp_final_date_of_installment, exp_value_total_installment_cents
+        )
+        SELECT
+            exp_id, exp_date, CAST(ROUND(ROUND(exp_value, 2) * 100) AS INTEGER), exp_description, exp_type_id,
+            exp_pay_id, exp_number_of_installments, exp_final_date_of_installment,
+            CAST(ROUND(ROUND(exp_value_total_installment, 2) * 100) AS INTEGER)
+        FROM expense;
+    ''')
+    cursor.execute("DROP TABLE expense;")
+    cursor.execute("ALTER TABLE expense_cents RENAME TO expense;")
+    if sequence:
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'expense';", sequence)
+
+    # Invalida os caches das leituras de despesas (ver `DataManager.bump_table_version`)
+    cursor.execute("UPDATE table_version SET tv_version = tv_version + 1 WHERE tv_table = 'expense';")
+    logger.info("Valores das despesas convertidos para centavos.")
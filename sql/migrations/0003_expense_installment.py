@@ -0,0 +1,47 @@
+"""
+Livro de parcelas: uma linha por despesa por mês de pagamento. Em bancos existentes, é gerado a
+partir das despesas já cadastradas, com a mesma regra de `DataManager.sync_expense_installments`
+(a primeira parcela no mês da compra; despesas à vista geram uma linha), escrita aqui para que a
+migração não dependa do código da aplicação.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+SQL_TABLE = '''
+    CREATE TABLE IF NOT EXISTS expense_installment (
+        ins_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ins_exp_id INTEGER NOT NULL,
+        ins_number INTEGER NOT NULL,
+        ins_month DATE NOT NULL,
+        ins_value_cents INTEGER NOT NULL,
+        FOREIGN KEY (ins_exp_id) REFERENCES expense(exp_id) ON DELETE CASCADE,
+        UNIQUE (ins_exp_id, ins_number)
+    );
+'''
+
+SQL_BACKFILL = '''
+    WITH RECURSIVE seq(n) AS (
+        SELECT 1
+        UNION ALL
+        SELECT n + 1 FROM seq
+        WHERE n < (SELECT MAX(e.exp_number_of_installments) FROM expense e)
+    )
+    INSERT INTO expense_installment (ins_exp_id, ins_number, ins_month, ins_value_cents)
+    SELECT
+        e.exp_id,
+        seq.n,
+        date(e.exp_date, 'start of month', '+' || (seq.n - 1) || ' months'),
+        e.exp_value_cents
+    FROM expense e
+    CROSS JOIN seq ON seq.n <= MAX(COALESCE(e.exp_number_of_installments, 0), 1);
+'''
+
+
+def upgrade(cursor):
+    cursor.execute(SQL_TABLE)
+
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM expense) AND NOT EXISTS (SELECT 1 FROM expense_installment);")
+    if cursor.fetchone()[0]:
+        cursor.execute(SQL_BACKFILL)
+        logger.info("Livro de parcelas gerado a partir das despesas existentes.")
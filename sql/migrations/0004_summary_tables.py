@@ -0,0 +1,184 @@
+"""
+Tabelas de resumo `summary_daily` (compras por dia) e `summary_monthly` (parcelas por mês) e os
+triggers que as mantêm atualizadas a cada escrita em `expense` e `expense_installment`. Em bancos
+existentes, as tabelas são preenchidas a partir dos dados já cadastrados.
+
+O SQL fica todo escrito aqui, sem depender do código da aplicação, para que a migração produza
+sempre o mesmo esquema. A chave dos resumos (tipo, categoria, pagamento, crédito) é a mesma de
+`DataManager.SUMMARY_KEY`, usada por `rebuild_summaries` e `check_summaries`; ao alterá-la,
+recrie os triggers em uma nova migração.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS summary_daily (
+        sd_day DATE NOT NULL,
+        sd_type_id INTEGER NOT NULL,
+        sd_cat_id INTEGER NOT NULL,
+        sd_pay_id INTEGER NOT NULL,
+        sd_credit INTEGER NOT NULL,
+        sd_total_cents INTEGER NOT NULL DEFAULT 0,
+        sd_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit)
+    ) WITHOUT ROWID;
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS summary_monthly (
+        sm_month DATE NOT NULL,
+        sm_type_id INTEGER NOT NULL,
+        sm_cat_id INTEGER NOT NULL,
+        sm_pay_id INTEGER NOT NULL,
+        sm_credit INTEGER NOT NULL,
+        sm_total_cents INTEGER NOT NULL DEFAULT 0,
+        sm_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (sm_month, sm_type_id, sm_cat_id, sm_pay_id, sm_credit)
+    ) WITHOUT ROWID;
+    ''',
+]
+
+TRIGGERS = [
+    # Compras por dia: a despesa em si
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_daily_insert AFTER INSERT ON expense BEGIN
+        INSERT INTO summary_daily (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit, sd_total_cents, sd_count)
+        VALUES (
+            NEW.exp_date,
+            COALESCE(NEW.exp_type_id, 0),
+            COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = NEW.exp_type_id), 0),
+            COALESCE(NEW.exp_pay_id, 0),
+            COALESCE(NEW.exp_number_of_installments, 0) > 0,
+            NEW.exp_value_cents,
+            1
+        )
+        ON CONFLICT (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit) DO UPDATE
+        SET sd_total_cents = sd_total_cents + excluded.sd_total_cents, sd_count = sd_count + 1;
+    END;
+    ''',
+    # Sem a categoria na condição: o tipo já a determina, e ela pode não existir mais
+    # (exclusão em cascata)
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_daily_delete AFTER DELETE ON expense BEGIN
+        UPDATE summary_daily SET sd_total_cents = sd_total_cents - OLD.exp_value_cents, sd_count = sd_count - 1
+        WHERE sd_day = OLD.exp_date
+          AND (sd_type_id, sd_pay_id, sd_credit) = (SELECT
+              COALESCE(OLD.exp_type_id, 0), COALESCE(OLD.exp_pay_id, 0), COALESCE(OLD.exp_number_of_installments, 0) > 0);
+        DELETE FROM summary_daily WHERE sd_day = OLD.exp_date AND sd_count <= 0;
+    END;
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_daily_update
+    AFTER UPDATE OF exp_date, exp_value_cents, exp_type_id, exp_pay_id, exp_number_of_installments ON expense BEGIN
+        UPDATE summary_daily SET sd_total_cents = sd_total_cents - OLD.exp_value_cents, sd_count = sd_count - 1
+        WHERE sd_day = OLD.exp_date
+          AND (sd_type_id, sd_pay_id, sd_credit) = (SELECT
+              COALESCE(OLD.exp_type_id, 0), COALESCE(OLD.exp_pay_id, 0), COALESCE(OLD.exp_number_of_installments, 0) > 0);
+        DELETE FROM summary_daily WHERE sd_day = OLD.exp_date AND sd_count <= 0;
+        INSERT INTO summary_daily (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit, sd_total_cents, sd_count)
+        VALUES (
+            NEW.exp_date,
+            COALESCE(NEW.exp_type_id, 0),
+            COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = NEW.exp_type_id), 0),
+            COALESCE(NEW.exp_pay_id, 0),
+            COALESCE(NEW.exp_number_of_installments, 0) > 0,
+            NEW.exp_value_cents,
+            1
+        )
+        ON CONFLICT (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit) DO UPDATE
+        SET sd_total_cents = sd_total_cents + excluded.sd_total_cents, sd_count = sd_count + 1;
+    END;
+    ''',
+    # Parcelas por mês: cada linha do livro de parcelas
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_monthly_insert AFTER INSERT ON expense_installment BEGIN
+        INSERT INTO summary_monthly (sm_month, sm_type_id, sm_cat_id, sm_pay_id, sm_credit, sm_total_cents, sm_count)
+        SELECT
+            NEW.ins_month,
+            COALESCE(e.exp_type_id, 0),
+            COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = e.exp_type_id), 0),
+            COALESCE(e.exp_pay_id, 0),
+            COALESCE(e.exp_number_of_installments, 0) > 0,
+            NEW.ins_value_cents,
+            1
+        FROM expense e WHERE e.exp_id = NEW.ins_exp_id
+        ON CONFLICT (sm_month, sm_type_id, sm_cat_id, sm_pay_id, sm_credit) DO UPDATE
+        SET sm_total_cents = sm_total_cents + excluded.sm_total_cents, sm_count = sm_count + 1;
+    END;
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_monthly_delete AFTER DELETE ON expense_installment BEGIN
+        UPDATE summary_monthly SET sm_total_cents = sm_total_cents - OLD.ins_value_cents, sm_count = sm_count - 1
+        WHERE sm_month = OLD.ins_month
+          AND (sm_type_id, sm_pay_id, sm_credit) = (
+              SELECT COALESCE(e.exp_type_id, 0), COALESCE(e.exp_pay_id, 0), COALESCE(e.exp_number_of_installments, 0) > 0
+              FROM expense e WHERE e.exp_id = OLD.ins_exp_id);
+        DELETE FROM summary_monthly WHERE sm_month = OLD.ins_month AND sm_count <= 0;
+    END;
+    ''',
+    # As parcelas saem do livro enquanto a despesa ainda tem os valores antigos, para que
+    # o trigger acima desconte do grupo certo. O repositório regrava o livro em seguida.
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_expense_installments_before_update
+    BEFORE UPDATE OF exp_date, exp_value_cents, exp_type_id, exp_pay_id, exp_number_of_installments ON expense BEGIN
+        DELETE FROM expense_installment WHERE ins_exp_id = OLD.exp_id;
+    END;
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_expense_installments_before_delete BEFORE DELETE ON expense BEGIN
+        DELETE FROM expense_installment WHERE ins_exp_id = OLD.exp_id;
+    END;
+    ''',
+    # A categoria faz parte da chave: acompanha a troca de categoria do tipo
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_summary_type_category AFTER UPDATE OF type_category_id ON type BEGIN
+        UPDATE summary_daily SET sd_cat_id = COALESCE(NEW.type_category_id, 0) WHERE sd_type_id = NEW.type_id;
+        UPDATE summary_monthly SET sm_cat_id = COALESCE(NEW.type_category_id, 0) WHERE sm_type_id = NEW.type_id;
+    END;
+    ''',
+]
+
+# Preenchimento inicial, a partir das despesas e do livro de parcelas já cadastrados
+BACKFILL = [
+    '''
+    INSERT INTO summary_daily (sd_day, sd_type_id, sd_cat_id, sd_pay_id, sd_credit, sd_total_cents, sd_count)
+    SELECT
+        e.exp_date,
+        COALESCE(e.exp_type_id, 0),
+        COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = e.exp_type_id), 0),
+        COALESCE(e.exp_pay_id, 0),
+        COALESCE(e.exp_number_of_installments, 0) > 0,
+        SUM(e.exp_value_cents),
+        COUNT(*)
+    FROM expense e
+    GROUP BY 1, 2, 3, 4, 5;
+    ''',
+    '''
+    INSERT INTO summary_monthly (sm_month, sm_type_id, sm_cat_id, sm_pay_id, sm_credit, sm_total_cents, sm_count)
+    SELECT
+        i.ins_month,
+        COALESCE(e.exp_type_id, 0),
+        COALESCE((SELECT t.type_category_id FROM type t WHERE t.type_id = e.exp_type_id), 0),
+        COALESCE(e.exp_pay_id, 0),
+        COALESCE(e.exp_number_of_installments, 0) > 0,
+        SUM(i.ins_value_cents),
+        COUNT(*)
+    FROM expense_installment i
+    JOIN expense e ON i.ins_exp_id = e.exp_id
+    GROUP BY 1, 2, 3, 4, 5;
+    ''',
+]
+
+
+def upgrade(cursor):
+    for statement in TABLES + TRIGGERS:
+        cursor.execute(statement)
+
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM expense) AND NOT EXISTS (SELECT 1 FROM summary_daily);")
+    if cursor.fetchone()[0]:
+        cursor.execute("DELETE FROM summary_daily;")
+        cursor.execute("DELETE FROM summary_monthly;")
+        for statement in BACKFILL:
+            cursor.execute(statement)
+        logger.info("Tabelas de resumo geradas a partir das despesas existentes.")
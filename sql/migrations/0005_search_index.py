@@ -0,0 +1,45 @@
+"""
+Índice FTS5 `expense_fts` das descrições das despesas e os triggers que o mantêm sincronizado
+com `expense`. O índice não guarda cópia do texto (content=expense): as linhas são lidas da
+própria tabela pelo rowid (= exp_id). Na criação, indexa as despesas já cadastradas.
+"""
+
+
+def upgrade(cursor):
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE name = 'expense_fts');")
+    created = not cursor.fetchone()[0]
+
+    # remove_diacritics: "cafe" encontra "Café"; prefix: índices para buscas por prefixo de 2 e 3 letras
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS expense_fts USING fts5 (
+            exp_description,
+            content = 'expense',
+            content_rowid = 'exp_id',
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        );
+    ''')
+
+    triggers = {
+        "trg_expense_fts_insert": '''
+            AFTER INSERT ON expense BEGIN
+                INSERT INTO expense_fts (rowid, exp_description) VALUES (NEW.exp_id, NEW.exp_description);
+            END;
+        ''',
+        "trg_expense_fts_delete": '''
+            AFTER DELETE ON expense BEGIN
+                INSERT INTO expense_fts (expense_fts, rowid, exp_description) VALUES ('delete', OLD.exp_id, OLD.exp_description);
+            END;
+        ''',
+        "trg_expense_fts_update": '''
+            AFTER UPDATE OF exp_description ON expense BEGIN
+                INSERT INTO expense_fts (expense_fts, rowid, exp_description) VALUES ('delete', OLD.exp_id, OLD.exp_description);
+                INSERT INTO expense_fts (rowid, exp_description) VALUES (NEW.exp_id, NEW.exp_description);
+            END;
+        ''',
+    }
+    for name, body in triggers.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    if created:
+        cursor.execute("INSERT INTO expense_fts (expense_fts) VALUES ('rebuild');")
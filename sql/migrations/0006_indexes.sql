@@ -0,0 +1,17 @@
+-- Índices secundários das consultas por período, tipo e pagamento.
+-- A criação roda na transação da migração: com WAL, as leituras continuam durante a
+-- construção dos índices e apenas outras escritas esperam o commit.
+
+CREATE INDEX IF NOT EXISTS idx_expense_date ON expense (exp_date);
+CREATE INDEX IF NOT EXISTS idx_expense_type ON expense (exp_type_id);
+CREATE INDEX IF NOT EXISTS idx_expense_pay ON expense (exp_pay_id);
+CREATE INDEX IF NOT EXISTS idx_expense_final_date ON expense (exp_final_date_of_installment);
+CREATE INDEX IF NOT EXISTS idx_expense_installment_month ON expense_installment (ins_month);
+CREATE INDEX IF NOT EXISTS idx_type_category ON type (type_category_id);
+CREATE INDEX IF NOT EXISTS idx_income_date ON income (inc_date);
+CREATE INDEX IF NOT EXISTS idx_income_type ON income (inc_type_id);
+CREATE INDEX IF NOT EXISTS idx_investment_date ON investment (inv_date);
+CREATE INDEX IF NOT EXISTS idx_investment_type ON investment (inv_type_id);
+
+-- Estatísticas para o planejador de consultas escolher os índices
+ANALYZE;
@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+
+import pytest
+
+from repositories.database_repository import DataManager
+from repositories.expense_repository import ExpenseRepository
+from repositories.migration_runner import MigrationRunner
+
+# Cadastros mínimos para inserir despesas (os mesmos de DataManager._populate_database)
+CATEGORIES = [
+    ('expense', 'Alimentação', 'Despesas com alimentação e restaurantes'),
+    ('expense', 'Transporte', 'Despesas com transporte público ou combustível'),
+]
+TYPES = [
+    ('expense', 'Supermercado', 'Gastos com compras de supermercado', 1),
+    ('expense', 'Posto de Gasolina', 'Gastos com combustível', 2),
+]
+PAYMENTS = [
+    ('Cartão de Crédito', 'Pagamentos feitos com cartão de crédito'),
+    ('Dinheiro', 'Pagamentos realizados em dinheiro'),
+]
+
+
+@contextmanager
+def temporary_database(path):
+    """
+    Aponta o pool do `DataManager` para um banco novo em `path`, criado pelas migrações
+    (`MigrationRunner`) e com os cadastros básicos. Restaura o banco anterior ao sair.
+    """
+    previous = DataManager.DB_PATH
+    DataManager.close_pool()
+    DataManager.DB_PATH = str(path)
+    try:
+        with DataManager.connection() as conn:
+            MigrationRunner().migrate(conn)
+            conn.executemany("INSERT INTO category (cat_type, cat_name, cat_description) VALUES (?, ?, ?);", CATEGORIES)
+            conn.executemany(
+                "INSERT INTO type (type_type, type_name, type_description, type_category_id) VALUES (?, ?, ?, ?);", TYPES
+            )
+            conn.executemany("INSERT INTO payment (pay_name, pay_description) VALUES (?, ?);", PAYMENTS)
+            conn.commit()
+        yield
+    finally:
+        DataManager.close_pool()
+        DataManager.DB_PATH = previous
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Banco temporário vazio (só cadastros), exclusivo do teste."""
+    with temporary_database(tmp_path / "financial_control.db"):
+        yield
+
+
+@pytest.fixture(scope="module")
+def seeded_database(tmp_path_factory):
+    """Banco temporário com 10 mil despesas fictícias (semente fixa), compartilhado pelo módulo."""
+    with temporary_database(tmp_path_factory.mktemp("seeded") / "financial_control.db"):
+        with DataManager.connection() as conn:
+            type_ids = [r[0] for r in conn.execute("SELECT type_id FROM type ORDER BY type_id;")]
+            pay_ids = [r[0] for r in conn.execute("SELECT pay_id FROM payment ORDER BY pay_id;")]
+        ExpenseRepository.bulk_insert_expenses(
+            DataManager._generate_fictitious_expenses(10_000, 42, type_ids, pay_ids)
+        )
+        yield
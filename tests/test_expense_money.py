@@ -0,0 +1,127 @@
+"""
+Ida e volta dos valores das despesas pelo banco: o repositório grava centavos inteiros e
+devolve em reais exatamente o valor digitado, e as somas em centavos não acumulam erro.
+"""
+import random
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from models.expense import Expense
+from repositories.database_repository import DataManager
+from repositories.expense_repository import ExpenseRepository
+from repositories.migration_runner import MigrationRunner
+from utils.money import to_cents
+
+# Valores que não têm representação exata em float (0,10, 0,29...) e extremos
+EDGE_VALUES = [0.01, 0.1, 0.29, 1.005, 19.99, 33.33, 1234.56, 99_999.99, 1_000_000.01, 21_474_836.47]
+
+# Meio centavo: o float de 1.005 é 1.00499..., o de 2.675 é 2.67499...; todos sobem
+HALF_CENTS = [0.005, 0.015, 0.125, 0.145, 0.285, 1.005, 1.015, 2.675, 8.345, 1235.465, 99_999.995, -1.005]
+
+# Tabela de despesas dos bancos anteriores à migração 0002, com valores em REAL
+LEGACY_EXPENSE = """
+    CREATE TABLE expense (
+        exp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        exp_date DATE NOT NULL,
+        exp_value REAL NOT NULL,
+        exp_description TEXT NOT NULL,
+        exp_type_id INTEGER,
+        exp_pay_id INTEGER,
+        exp_number_of_installments INTEGER DEFAULT 0,
+        exp_final_date_of_installment DATE,
+        exp_value_total_installment REAL NOT NULL,
+        FOREIGN KEY (exp_type_id) REFERENCES type(type_id) ON DELETE CASCADE,
+        FOREIGN KEY (exp_pay_id) REFERENCES payment(pay_id) ON DELETE CASCADE
+    );
+"""
+
+
+def expense(value, installments=0):
+    return Expense(
+        exp_date='2024-05-10', exp_value=value, exp_description='Teste', exp_type_id=1, exp_pay_id=1,
+        exp_number_of_installments=installments,
+        exp_value_total_installments=value * max(installments, 1),
+    )
+
+
+def load_values():
+    df = ExpenseRepository.load_expenses(columns=['exp_id', 'exp_value', 'exp_value_total_installment'])
+    return df.sort_values('exp_id')
+
+
+@pytest.fixture
+def values():
+    rng = random.Random(18)
+    return EDGE_VALUES + [rng.randrange(1, 10_000_000) / 100 for _ in range(500)]
+
+
+def test_values_round_trip(database, values):
+    for i, value in enumerate(values):
+        assert ExpenseRepository.save_expense(expense(value, installments=i % 4))
+
+    # Cada valor volta como o float mais próximo do centavo gravado, sem resíduo de conversão
+    loaded = load_values()
+    assert list(loaded['exp_value']) == [to_cents(value) / 100 for value in values]
+    assert list(loaded['exp_value_total_installment']) == [
+        to_cents(value * max(i % 4, 1)) / 100 for i, value in enumerate(values)
+    ]
+    assert list(loaded['exp_value'])[:3] == [0.01, 0.1, 0.29]
+
+
+def test_update_round_trip(database):
+    assert ExpenseRepository.save_expense(expense(10.0))
+    exp_id = int(load_values()['exp_id'].iloc[0])
+
+    updated = expense(0.29, installments=3)
+    updated.exp_id = exp_id
+    assert ExpenseRepository.update_expense(updated)
+
+    row = load_values().iloc[0]
+    assert row['exp_value'] == 0.29
+    assert row['exp_value_total_installment'] == 0.87
+
+
+def test_sums_are_exact(database, values):
+    for value in values:
+        assert ExpenseRepository.save_expense(expense(value))
+
+    exact = sum(Decimal(to_cents(value)) / 100 for value in values)
+    with DataManager.connection() as conn:
+        total_cents, = conn.execute("SELECT SUM(exp_value_cents) FROM expense;").fetchone()
+        summary_cents, = conn.execute("SELECT SUM(sd_total_cents) FROM summary_daily;").fetchone()
+
+    assert isinstance(total_cents, int)
+    assert Decimal(total_cents) / 100 == exact
+    assert summary_cents == total_cents
+
+
+def test_half_cents_round_away_from_zero():
+    assert [to_cents(value) for value in HALF_CENTS] == [
+        1, 2, 13, 15, 29, 101, 102, 268, 835, 123547, 10_000_000, -101
+    ]
+
+
+def test_migration_converts_like_to_cents(tmp_path):
+    """Um valor em REAL convertido pela migração 0002 tem os mesmos centavos que o app grava."""
+    rng = random.Random(2)
+    values = HALF_CENTS + EDGE_VALUES + [rng.randrange(0, 10 ** 8) / 1000 for _ in range(2000)]
+
+    conn = sqlite3.connect(tmp_path / "legacy.db")
+    runner = MigrationRunner()
+    runner.migrate(conn, target=1)
+    conn.execute(LEGACY_EXPENSE)
+    conn.executemany(
+        "INSERT INTO expense (exp_date, exp_value, exp_description, exp_value_total_installment) "
+        "VALUES ('2024-05-10', ?, 'Teste', ?);",
+        [(value, value * 3) for value in values]
+    )
+    conn.commit()
+    runner.migrate(conn)
+
+    rows = conn.execute(
+        "SELECT exp_value_cents, exp_value_total_installment_cents FROM expense ORDER BY exp_id;"
+    ).fetchall()
+    conn.close()
+    assert rows == [(to_cents(value), to_cents(value * 3)) for value in values]
@@ -0,0 +1,88 @@
+"""
+Equivalência do livro de parcelas (`expense_installment`, gerado por
+`DataManager.sync_expense_installments`) com a implementação original, linha a linha
+(`expand_installments_v2`, do dashboard): a primeira parcela cai no mês da compra e cada
+parcela seguinte no mês seguinte; despesas à vista geram uma única linha.
+"""
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+
+from repositories.database_repository import DataManager
+from repositories.expense_repository import ExpenseRepository
+
+
+def expand_installments_v2(row):
+    """Implementação de referência, copiada do dashboard original."""
+    installments = []
+    if row['Parcelas'] > 0:
+        for i in range(row['Parcelas']):
+            installment_date = row['Data'] + pd.DateOffset(months=i)
+            installments.append({'Mes': installment_date, 'Tipo': 'Crédito', 'Valor': row['Valor']})
+    else:
+        installments.append({'Mes': row['Data'], 'Tipo': 'À Vista', 'Valor': row['Valor']})
+    return installments
+
+
+def reference(df):
+    expanded = pd.DataFrame([item for _, row in df.iterrows() for item in expand_installments_v2(row)])
+    expanded['Mes'] = expanded['Mes'].dt.to_period('M')
+    return expanded
+
+
+def random_expenses(rows, seed):
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    return pd.DataFrame({
+        'Data': pd.to_datetime([start + timedelta(days=rng.randrange(6 * 365)) for _ in range(rows)]),
+        'Parcelas': [rng.choice([0, 1, 2, 3, 6, 12, 24]) for _ in range(rows)],
+        'Valor': [rng.randrange(1, 1_000_000) / 100 for _ in range(rows)],
+    })
+
+
+# Fim de mês, virada de ano e à vista: casos em que a regra do primeiro mês costuma falhar
+EDGE_CASES = pd.DataFrame({
+    'Data': pd.to_datetime(['2024-12-15', '2024-01-31', '2023-12-31', '2024-02-29', '2024-06-01', '2024-03-10']),
+    'Parcelas': [2, 3, 12, 1, 0, 24],
+    'Valor': [100.0, 33.33, 10.5, 99.99, 250.0, 0.01],
+})
+
+
+def insert(df):
+    """Grava as despesas de `df` e retorna os valores em centavos, na ordem dos ids."""
+    cents = (df['Valor'] * 100).round().astype('int64')
+    ExpenseRepository.bulk_insert_expenses(
+        (row.Data.date().isoformat(), value, 'Teste', 1, 1, row.Parcelas, None, value * max(row.Parcelas, 1))
+        for row, value in zip(df.itertuples(), cents)
+    )
+    return cents
+
+
+def read_ledger():
+    with DataManager.connection() as conn:
+        return pd.read_sql_query(
+            "SELECT ins_exp_id, ins_number, ins_month, ins_value_cents FROM expense_installment "
+            "ORDER BY ins_exp_id, ins_number;",
+            conn
+        )
+
+
+def test_first_installment_in_purchase_month(database):
+    # Compra em 15/12/2024 em duas parcelas: 12/2024 e 01/2025
+    insert(EDGE_CASES.iloc[[0]])
+    assert list(pd.to_datetime(read_ledger()['ins_month']).dt.strftime('%Y-%m')) == ['2024-12', '2025-01']
+
+
+def test_ledger_matches_v2(database):
+    df = pd.concat([EDGE_CASES, random_expenses(300, seed=2)], ignore_index=True)
+    cents = insert(df)
+    ledger = read_ledger()
+
+    expected = reference(df.assign(Valor=cents))
+    assert list(pd.to_datetime(ledger['ins_month']).dt.to_period('M')) == list(expected['Mes'])
+    assert list(ledger['ins_value_cents']) == list(expected['Valor'])
+    # Numeração 1..n por despesa, na ordem dos ids inseridos
+    assert list(ledger.groupby('ins_exp_id').size()) == [max(n, 1) for n in df['Parcelas']]
+    assert (ledger.groupby('ins_exp_id')['ins_number'].apply(list) ==
+            ledger.groupby('ins_exp_id').size().apply(lambda n: list(range(1, n + 1)))).all()
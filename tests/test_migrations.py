@@ -0,0 +1,31 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from repositories.database_repository import DataManager
+
+ROOT = Path(__file__).resolve().parent.parent
+MIGRATIONS = sorted((ROOT / "sql" / "migrations").glob("*.py"))
+APP_PACKAGES = {"controllers", "models", "repositories", "utils", "pages"}
+
+
+def test_fresh_schema_matches_ddl(database):
+    """O sql/ddl.sql versionado é o esquema gerado pelas migrações num banco novo."""
+    ddl = (ROOT / "sql" / "ddl.sql").read_text(encoding="utf-8")
+    assert ddl.endswith(DataManager.dump_schema())
+
+
+@pytest.mark.parametrize("path", MIGRATIONS, ids=lambda path: path.name)
+def test_migration_is_self_contained(path):
+    """
+    Migrações ficam congeladas: não importam código da aplicação, cujas mudanças futuras
+    alterariam o que uma migração já aplicada faz num banco novo.
+    """
+    imported = set()
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            imported.add(node.module.split(".")[0])
+    assert not imported & APP_PACKAGES
@@ -0,0 +1,82 @@
+"""
+Planos de execução (EXPLAIN QUERY PLAN) das consultas dos repositórios. Todas devem ser
+resolvidas por índices: um SCAN indica que a consulta voltou a percorrer a tabela inteira
+(ex.: índice removido numa migração ou condição reescrita de forma que o SQLite não o usa).
+"""
+import re
+
+import pytest
+
+from repositories.database_repository import DataManager
+from repositories.expense_repository import ExpenseRepository
+from repositories.report_repository import ReportRepository
+
+INICIO, FIM = '2024-01-01', '2024-03-31'
+
+# O MATCH do FTS5 aparece como SCAN da tabela virtual, mas é resolvido pelo índice textual
+FTS_MATCH = re.compile(r"^SCAN expense_fts VIRTUAL TABLE INDEX \d+:M")
+
+EXPENSE_QUERIES = {
+    "periodo": dict(data_inicio=INICIO, data_fim=FIM),
+    "periodo_sem_parcelas_anteriores": dict(data_inicio=INICIO, data_fim=FIM, include_overlapping_installments=False),
+    "periodo_filtros": dict(data_inicio=INICIO, data_fim=FIM, type_ids=[1], pay_ids=[2]),
+    "periodo_categoria": dict(data_inicio=INICIO, data_fim=FIM, cat_ids=[1], columns=['exp_id', 'cat_name']),
+    "keyset": dict(keyset=("(e.exp_date, e.exp_id) < (?, ?)", (FIM, 10)), limit=51),
+    "keyset_crescente": dict(keyset=("(e.exp_date, e.exp_id) > (?, ?)", (INICIO, 10)), order="ASC", limit=51),
+    "keyset_periodo": dict(data_inicio=INICIO, data_fim=FIM,
+                           keyset=("(e.exp_date, e.exp_id) < (?, ?)", ('2024-02-15', 10)), limit=51),
+    "busca": dict(search="merc"),
+    "busca_periodo": dict(search="merc", data_inicio=INICIO, data_fim=FIM),
+}
+
+REPORT_QUERIES = [
+    ("monthly_by_payment_kind", False), ("monthly_by_payment_kind", True),
+    ("monthly_by_type", False), ("monthly_by_type", True),
+    ("by_category_payment_kind", False), ("by_category_payment_kind", True),
+    ("daily_by_type", False), ("daily_by_type", True),
+    ("credit_installments_by_month", None),
+]
+
+
+def query_plan(query, params):
+    with DataManager.connection() as conn:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def scans(plan):
+    return [step for step in plan if step.startswith("SCAN") and not FTS_MATCH.match(step)]
+
+
+@pytest.mark.parametrize("filters", EXPENSE_QUERIES.values(), ids=EXPENSE_QUERIES.keys())
+def test_expense_queries_use_indexes(seeded_database, filters):
+    plan = query_plan(*ExpenseRepository._expenses_query(**filters))
+    assert scans(plan) == [], plan
+
+
+def test_full_history_scans_in_date_order(seeded_database):
+    # Único caminho documentado que percorre a tabela: todo o histórico, sem filtros,
+    # lido na ordem do índice de data (sem ordenação temporária)
+    plan = query_plan(*ExpenseRepository._expenses_query())
+    assert scans(plan) == ["SCAN e USING INDEX idx_expense_date"], plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+@pytest.mark.parametrize("method, cash_only", REPORT_QUERIES)
+def test_report_queries_use_indexes(seeded_database, monkeypatch, method, cash_only):
+    captured = []
+    monkeypatch.setattr(ReportRepository, "_read", staticmethod(lambda query, params: captured.append((query, params))))
+
+    kwargs = {} if cash_only is None else {"cash_only": cash_only}
+    getattr(ReportRepository, method)(INICIO, FIM, **kwargs)
+
+    assert len(captured) == 1
+    plan = query_plan(*captured[0])
+    assert scans(plan) == [], plan
+
+
+def test_every_report_query_is_checked():
+    public = {
+        name for name, value in vars(ReportRepository).items()
+        if isinstance(value, staticmethod) and not name.startswith("_")
+    }
+    assert public == {method for method, _ in REPORT_QUERIES}
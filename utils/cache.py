@@ -0,0 +1,49 @@
+import functools
+
+import streamlit as st
+
+from repositories.database_repository import DataManager
+
+
+def versioned_cache(*tables, **cache_kwargs):
+    """
+    Cache de dados (st.cache_data) invalidado pela versão das tabelas de que a função depende.
+
+    A cada chamada, a versão atual de `tables` (ver `DataManager.bump_table_version`) entra
+    na chave do cache junto com os argumentos. Uma escrita em `expense` invalida apenas as
+    funções que dependem de `expense`; as demais entradas continuam válidas, sem precisar
+    de `st.cache_data.clear()`.
+
+    Uso:
+        @versioned_cache("category")
+        def get_category():
+            ...
+
+    Args:
+        tables (str): Tabelas lidas pela função.
+        cache_kwargs: Repassados ao `st.cache_data` (ttl, max_entries, show_spinner...).
+    """
+    if not tables:
+        raise ValueError("Informe ao menos uma tabela.")
+    # Entradas de versões antigas nunca mais são lidas; limita o acúmulo por padrão
+    cache_kwargs.setdefault("max_entries", 32)
+
+    def decorator(func):
+        def cached(versions, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        # O Streamlit identifica a função pelo módulo e nome qualificado. Sem __wrapped__,
+        # para que ele enxergue a assinatura com `versions`.
+        cached.__module__ = func.__module__
+        cached.__qualname__ = func.__qualname__
+        cached = st.cache_data(**cache_kwargs)(cached)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cached(DataManager.get_table_versions(tables), *args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
+
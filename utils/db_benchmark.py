@@ -0,0 +1,143 @@
+"""
+Benchmark de leituras e escritas concorrentes no banco: compara o journal de rollback padrão
+do SQLite com o perfil de `DataManager.PRAGMAS` (WAL).
+
+Leitores consultam o total de um mês no livro de parcelas, como o dashboard; um escritor
+insere despesas uma a uma com commit, como a página de Despesas. Roda numa cópia do banco,
+que é descartada no fim.
+
+Uso: python -m utils.db_benchmark [segundos] [leitores]
+"""
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from repositories.database_repository import DataManager
+
+# Perfis comparados: o padrão do SQLite (journal de rollback, fsync a cada commit) e o da aplicação
+PROFILES = {
+    "rollback": {"journal_mode": "DELETE", "synchronous": "FULL", "foreign_keys": "ON"},
+    "WAL": DataManager.PRAGMAS,
+}
+
+
+def _connect(path, pragmas):
+    conn = sqlite3.connect(path, timeout=DataManager.TIMEOUT, check_same_thread=False)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value};")
+    return conn
+
+
+def _run_profile(path, pragmas, seconds, readers):
+    setup = _connect(path, pragmas)
+    months = [row[0] for row in setup.execute("SELECT DISTINCT ins_month FROM expense_installment;")]
+    type_id, pay_id = setup.execute(
+        "SELECT exp_type_id, exp_pay_id FROM expense ORDER BY exp_id DESC LIMIT 1;"
+    ).fetchone()
+    setup.close()
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    counts_lock = threading.Lock()
+
+    def count(key):
+        with counts_lock:
+            counts[key] += 1
+
+    def reader(seed):
+        rng = random.Random(seed)
+        conn = _connect(path, pragmas)
+        while not stop.is_set():
+            try:
+                conn.execute(
+                    "SELECT SUM(ins_value_cents) FROM expense_installment WHERE ins_month = ?;",
+                    (rng.choice(months),)
+                ).fetchone()
+                count("reads")
+            except sqlite3.OperationalError:
+                count("errors")
+        conn.close()
+
+    def writer():
+        conn = _connect(path, pragmas)
+        cursor = conn.cursor()
+        while not stop.is_set():
+            try:
+                cursor.execute('''
+                INSERT INTO expense (exp_date, exp_value_cents, exp_description, exp_type_id, exp_pay_id,
+                                     exp_number_of_installments, exp_final_date_of_installment,
+                                     exp_value_total_installment_cents)
+                VALUES (?, 1000, 'Benchmark', ?, ?, 0, NULL, 1000);
+                ''', (date.today().isoformat(), type_id, pay_id))
+                DataManager.sync_expense_installments(cursor, cursor.lastrowid)
+                conn.commit()
+                count("writes")
+            except sqlite3.OperationalError:
+                conn.rollback()
+                count("errors")
+        conn.close()
+
+    threads = [threading.Thread(target=reader, args=(seed,)) for seed in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def run_concurrency_benchmark(db_path=None, seconds=5.0, readers=4):
+    """
+    Mede leituras e escritas por segundo com `readers` leitores e um escritor simultâneos, em
+    cada perfil de `PROFILES`. Cada perfil roda numa cópia nova do banco `db_path`.
+
+    Args:
+        db_path (str): Banco de origem (padrão: `DataManager.DB_PATH`). Precisa ter despesas;
+            gere-as com `python -m repositories.database_repository seed`.
+        seconds (float): Duração de cada perfil.
+        readers (int): Quantidade de threads leitoras.
+
+    Returns:
+        pd.DataFrame: Uma linha por perfil com leituras/s, escritas/s e operações que
+            falharam por lock (`database is locked`).
+    """
+    source = sqlite3.connect(db_path or DataManager.DB_PATH)
+    if not source.execute("SELECT COUNT(*) FROM expense;").fetchone()[0]:
+        source.close()
+        raise ValueError("O banco não tem despesas; gere dados com `python -m repositories.database_repository seed`.")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, pragmas in PROFILES.items():
+            path = str(Path(directory) / f"{name}.db")
+            # A API de backup copia também o que ainda está no WAL do banco de origem
+            copy = sqlite3.connect(path)
+            source.backup(copy)
+            copy.close()
+            counts = _run_profile(path, pragmas, seconds, readers)
+            rows.append({
+                "Perfil": name,
+                "Leituras/s": counts["reads"] / seconds,
+                "Escritas/s": counts["writes"] / seconds,
+                "Falhas por lock": counts["errors"],
+            })
+    source.close()
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import sys
+
+    summary = run_concurrency_benchmark(
+        seconds=float(sys.argv[1]) if len(sys.argv) > 1 else 5.0,
+        readers=int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
+    print(summary.round(1).to_string(index=False))
@@ -0,0 +1,104 @@
+"""
+Benchmark de latência do login sob concorrência: metade das tentativas usa a senha certa e
+metade um usuário inexistente. Os dois casos passam pelo bcrypt no pool de login (ver
+`AuthController._run_in_pool` e `User.verify_dummy`) e devem levar tempos parecidos.
+
+Roda num banco temporário, com os limites de tentativas desativados durante a medição.
+
+Uso: python -m utils.login_benchmark [rodadas]
+"""
+import statistics
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from controllers.auth_controller import AuthController
+from controllers.login_throttle import LoginThrottle
+from repositories.database_repository import DataManager
+from repositories.user_repository import UserRepository
+
+# Quantidades de logins simultâneos medidas
+CONCURRENCY = (1, 4, 16, 32)
+
+USERNAME = "benchmark"
+PASSWORD = "benchmark-senha"
+
+
+def _measure(threads, rounds):
+    results = []
+    results_lock = threading.Lock()
+
+    def worker(i):
+        for j in range(rounds):
+            valid = (i + j) % 2 == 0
+            username = USERNAME if valid else f"inexistente-{threads}-{i}-{j}"
+            start = time.perf_counter()
+            token = AuthController.login(username, PASSWORD, client=f"cliente-{i}")
+            elapsed = time.perf_counter() - start
+            with results_lock:
+                results.append((valid, elapsed, token is AuthController.BUSY))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    total = time.perf_counter() - start
+
+    valid = [elapsed for ok, elapsed, _ in results if ok]
+    invalid = [elapsed for ok, elapsed, _ in results if not ok]
+    return {
+        "Concorrentes": threads,
+        "Total (ms)": total * 1000,
+        "Senha certa p50 (ms)": statistics.median(valid) * 1000,
+        "Senha certa máx. (ms)": max(valid) * 1000,
+        "Inexistente p50 (ms)": statistics.median(invalid) * 1000 if invalid else float("nan"),
+        "Recusados": sum(refused for _, _, refused in results),
+    }
+
+
+def run_login_benchmark(concurrency=CONCURRENCY, rounds=2):
+    """
+    Mede a latência de `AuthController.login` com `concurrency` threads simultâneas, cada uma
+    fazendo `rounds` tentativas alternadas entre a senha certa e um usuário inexistente.
+
+    "Recusados" conta os logins que receberam `AuthController.BUSY`: a fila do pool de login
+    (LOGIN_MAX_PENDING) ficou cheia por mais de LOGIN_TIMEOUT segundos.
+
+    Args:
+        concurrency (tuple): Quantidades de threads medidas.
+        rounds (int): Tentativas por thread.
+
+    Returns:
+        pd.DataFrame: Uma linha por quantidade de threads, com os tempos em ms.
+    """
+    previous = (DataManager.DB_PATH, AuthController._username_throttle, AuthController._client_throttle)
+    with tempfile.TemporaryDirectory() as directory:
+        DataManager.close_pool()
+        DataManager.DB_PATH = str(Path(directory) / "financial_control.db")
+        # Limites que nunca se esgotam durante a medição
+        AuthController._username_throttle = LoginThrottle(max_attempts=10 ** 9, window=timedelta(minutes=15))
+        AuthController._client_throttle = LoginThrottle(max_attempts=10 ** 9, window=timedelta(minutes=15))
+        try:
+            DataManager()
+            UserRepository.create_user(USERNAME, PASSWORD)
+            # Aquece o pool de login, as conexões e o hash descartável antes de medir
+            AuthController.login(USERNAME, PASSWORD)
+            AuthController.login("inexistente", PASSWORD)
+            rows = [_measure(threads, rounds) for threads in concurrency]
+        finally:
+            DataManager.close_pool()
+            DataManager.DB_PATH, AuthController._username_throttle, AuthController._client_throttle = previous
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import sys
+
+    summary = run_login_benchmark(rounds=int(sys.argv[1]) if len(sys.argv) > 1 else 2)
+    print(summary.round(2).to_string(index=False))
@@ -0,0 +1,68 @@
+import math
+from decimal import ROUND_HALF_UP, Decimal
+
+PREFIX = 'R$ '
+
+
+def format_brl(value, prefix=PREFIX):
+    """
+    Formata um número como moeda brasileira. Valores nulos viram string vazia.
+    Exemplo: 1234.56 -> 'R$ 1.234,56'
+    """
+    if value is None or value != value:
+        return ''
+    text = f"{value:,.2f}"
+    if text == '-0.00':
+        text = '0.00'
+    return prefix + text.replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def _number(text):
+    """
+    Converte o texto (já sem 'R$' e separadores de milhar) para float; None se não for um número simples (sem
+    expoente, '_', 'inf' ou 'nan', que o `float` aceitaria).
+    """
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    if not math.isfinite(value) or 'e' in text or 'E' in text or '_' in text:
+        return None
+    return value
+
+
+def parse_brl(text):
+    """
+    Converte uma string em formato monetário brasileiro para float.
+    Exemplo: 'R$ 1.234,56' -> 1234.56
+
+    Raises:
+        ValueError: Se o texto estiver em branco ou não for um valor válido.
+    """
+    text = str(text).replace('R$', '').replace('.', '').replace(',', '.').strip()
+    if not text:
+        raise ValueError('Valor em branco.')
+    value = _number(text)
+    if value is None:
+        raise ValueError(f'Valor inválido: {text}')
+    return value
+
+
+def to_cents(value):
+    """
+    Converte um valor em reais para centavos inteiros. O float é lido como decimal de 15
+    dígitos significativos (o valor digitado, não o binário 1.00499... de 1.005) e arredondado
+    para o centavo mais próximo, com meio centavo para longe do zero: a mesma regra do
+    `ROUND(ROUND(valor, 2) * 100)` do SQLite usado na migração 0002. Valores nulos continuam
+    nulos.
+    Exemplo: 1234.56 -> 123456; 1.005 -> 101
+    """
+    if value is None or value != value:
+        return None
+    return int(Decimal(f"{float(value):.15g}").quantize(Decimal('0.01'), ROUND_HALF_UP) * 100)
+
+
+def from_cents(cents):
+    """Converte centavos inteiros para reais (float). Exemplo: 123456 -> 1234.56"""
+    return None if cents is None else cents / 100
+
@@ -0,0 +1,76 @@
+import streamlit as st
+
+from utils.timing import timed
+
+
+class SectionRegistry:
+    """
+    Seções de uma página (ex.: as abas do dashboard) calculadas sob demanda.
+
+    Com `st.tabs`, o conteúdo de todas as abas é executado a cada rerun, mesmo as que não
+    estão visíveis. Aqui cada seção registra um loader (busca e prepara os dados) e um
+    renderer (desenha); a cada rerun, apenas a seção selecionada é executada e as demais
+    só rodam quando escolhidas.
+
+    Uma seção registrada com `fragment=True` roda em um `st.fragment`: os widgets dela (ex.:
+    filtros) reexecutam apenas a própria seção, sem o restante do script (inicialização do
+    banco, autenticação, seletor). Trocar de seção continua reexecutando a página inteira.
+
+    Uso:
+        sections = SectionRegistry("dashboard_section")
+
+        @sections.register("Despesas", loader=load_expenses)
+        def render_expenses(data):
+            ...
+
+        sections.render()
+    """
+
+    def __init__(self, key):
+        """
+        Args:
+            key (str): Chave do seletor de seções no session_state (guarda a seção escolhida).
+        """
+        self.key = key
+        self._sections = {}
+
+    def register(self, label, loader=None, fragment=False):
+        """
+        Decorador que registra o renderer de uma seção, na ordem de exibição.
+
+        Args:
+            label (str): Nome da seção no seletor.
+            loader (callable): Função sem argumentos que busca os dados da seção. O retorno é
+                passado ao renderer; None interrompe a seção (ex.: após exibir um aviso de
+                cadastro vazio). Sem loader, o renderer é chamado sem argumentos.
+            fragment (bool): Executa loader e renderer em um fragmento isolado.
+        """
+        def decorator(renderer):
+            self._sections[label] = (loader, renderer, fragment)
+            return renderer
+        return decorator
+
+    @property
+    def labels(self):
+        return list(self._sections)
+
+    def render(self):
+        """Exibe o seletor e executa apenas a seção selecionada. Retorna o nome da seção."""
+        label = st.radio("Seção", self.labels, key=self.key, horizontal=True, label_visibility="collapsed")
+        loader, renderer, fragment = self._sections[label]
+
+        def run_section():
+            with timed(label):
+                if loader is None:
+                    renderer()
+                else:
+                    data = loader()
+                    if data is not None:
+                        renderer(data)
+
+        if fragment:
+            # Nos reruns do fragmento, o Streamlit chama de novo este mesmo run_section
+            st.fragment(run_section)()
+        else:
+            run_section()
+        return label
@@ -0,0 +1,160 @@
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pandas as pd
+import streamlit as st
+
+# Instrumentação ligada pela variável de ambiente FC_TIMING=1. Desligada (o padrão em
+# produção), `timed` e `track_interaction` não fazem nada e nada é guardado no session_state.
+ENABLED = os.environ.get("FC_TIMING", "") not in ("", "0")
+
+# Com a instrumentação ligada por FC_TIMING, cada medição também é impressa no console
+ECHO = ENABLED
+
+# Quantidade de medições guardadas por bloco/interação no session_state
+HISTORY = 50
+
+_TIMINGS = "_timings"
+_INTERACTION = "_timing_interaction"
+_DEPTH = "_timing_depth"
+
+
+def track_interaction(name):
+    """
+    Callback de `on_change` que identifica a interação que disparou o próximo rerun (ex.: o
+    filtro alterado). As medições desse rerun são registradas com esse nome.
+
+    Uso:
+        st.checkbox("Exibir pagamentos a prazo", on_change=track_interaction, args=("Exibir a prazo",))
+    """
+    if ENABLED:
+        st.session_state[_INTERACTION] = name
+
+
+@contextmanager
+def timed(label):
+    """
+    Mede o tempo do bloco e registra em st.session_state, por bloco e interação, as últimas
+    `HISTORY` medições (em ms).
+
+    Blocos podem ser aninhados (ex.: o script inteiro e a seção dentro dele). Ao fim do bloco
+    mais externo do rerun, a interação registrada por `track_interaction` é descartada; sem
+    interação, a medição é registrada como "execução".
+
+    Sem FC_TIMING, apenas executa o bloco.
+
+    Uso:
+        with timed("Dashboard"):
+            main()
+    """
+    if not ENABLED:
+        yield
+        return
+
+    state = st.session_state
+    depth = state.get(_DEPTH, 0)
+    state[_DEPTH] = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        state[_DEPTH] = depth
+        interaction = state.get(_INTERACTION, "execução")
+        if depth == 0:
+            state.pop(_INTERACTION, None)
+
+        timings = state.setdefault(_TIMINGS, {})
+        timings.setdefault((label, interaction), deque(maxlen=HISTORY)).append(elapsed)
+        if ECHO:
+            print(f"[tempo] {label} ({interaction}): {elapsed:.1f} ms")
+
+
+def timing_summary(timings=None):
+    """
+    Resume as medições da sessão atual (ou as informadas) em um DataFrame com uma linha por
+    bloco e interação: quantidade de execuções, última, mediana e máxima (em ms).
+    """
+    timings = st.session_state.get(_TIMINGS, {}) if timings is None else timings
+    rows = [
+        {
+            'Bloco': label,
+            'Interação': interaction,
+            'Execuções': len(values),
+            'Última (ms)': values[-1],
+            'Mediana (ms)': pd.Series(values).median(),
+            'Máxima (ms)': max(values),
+        }
+        for (label, interaction), values in timings.items()
+    ]
+    return pd.DataFrame(rows, columns=['Bloco', 'Interação', 'Execuções', 'Última (ms)', 'Mediana (ms)', 'Máxima (ms)'])
+
+
+def show_timings():
+    """Exibe o resumo das medições na barra lateral quando FC_TIMING está ativo."""
+    if ENABLED and st.session_state.get(_TIMINGS):
+        with st.sidebar.expander("Tempos de execução"):
+            st.dataframe(timing_summary().round(1), hide_index=True, use_container_width=True)
+
+
+def run_dashboard_benchmark(script="1_Dashboard.py", user_id=1, repeat=5):
+    """
+    Mede, com o AppTest do Streamlit, a latência de cada interação dos filtros do dashboard
+    de despesas.
+
+    O AppTest sempre executa o script inteiro, então cada interação registra dois tempos: o
+    do bloco "Dashboard" (rerun completo, como era antes dos fragmentos) e o da seção
+    "Despesas" (o que o navegador reexecuta agora, já que os filtros ficam em um fragmento).
+    A diferença é o custo evitado: inicialização do banco, autenticação e página fora da seção.
+    A instrumentação é ligada durante a medição, mesmo sem FC_TIMING.
+
+    Args:
+        script (str): Página do dashboard, relativa ao diretório atual.
+        user_id (int): Usuário do token de acesso usado na sessão de teste.
+        repeat (int): Quantas vezes cada interação é repetida (alternando os valores).
+
+    Returns:
+        pd.DataFrame: Resumo de `timing_summary` com as medições de todas as interações.
+    """
+    from streamlit.testing.v1 import AppTest
+    from controllers.auth_controller import AuthController
+
+    # O AppTest roda o script neste processo: liga a instrumentação só durante a medição
+    global ENABLED
+    previous, ENABLED = ENABLED, True
+    try:
+        at = AppTest.from_file(script, default_timeout=120)
+        at.session_state['auth_token'] = AuthController.create_jwt(user_id)
+        at.session_state['dashboard_section'] = "Despesas"
+        at.run()
+
+        hoje = date.today()
+        # Filtros da seção Despesas e os valores alternados em cada repetição
+        interactions = [
+            ('expense_data_inicio', [hoje - timedelta(days=180), hoje - timedelta(days=365)]),
+            ('expense_data_fim', [hoje - timedelta(days=30), hoje]),
+            ('expense_exibir_prazo', [False, True]),
+        ]
+        for _ in range(repeat):
+            for key, values in interactions:
+                for value in values:
+                    # O on_change do widget (track_interaction) identifica a interação
+                    widget = at.checkbox(key) if isinstance(value, bool) else at.date_input(key)
+                    widget.set_value(value).run()
+                    if at.exception:
+                        raise RuntimeError(at.exception[0].message)
+
+        return timing_summary(at.session_state[_TIMINGS])
+    finally:
+        ENABLED = previous
+
+
+if __name__ == "__main__":
+    # Uso: python -m utils.timing [repetições]
+    import sys
+
+    summary = run_dashboard_benchmark(repeat=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
+    print(summary.round(1).to_string(index=False))